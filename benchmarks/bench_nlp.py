@@ -0,0 +1,280 @@
+# benchmarks/bench_nlp.py
+
+"""
+Benchmark parser NLP (nlp_core) dengan katalog sintetis.
+
+Per ukuran katalog (default 100 / 1k / 10k / 50k SKU):
+  - load_catalog_from_csv, build_alias_index, build_snapshot (semua index)
+  - startup lewat artifact katalog (compile_catalog → load_catalog_file)
+  - memori: retained & peak (tracemalloc) untuk load + index
+  - parse_orders_verbose (tanpa cache): throughput, p50/p95/p99 per utterance,
+    dan p95 per grup corpus (L0–L7, multi-chunk, input panjang)
+  - cakupan: label logic tiap grup harus memuat synth.GROUP_TARGETS
+    (katalog utama + katalog kecil 1 SKU gas untuk L1_GAS_SINGLE)
+
+Hasil dibandingkan dengan baseline (benchmarks/baseline.json).
+Kalau ada metrik yang lebih buruk dari baseline × toleransi, atau ada label
+target yang tidak tercapai → exit code 1.
+
+Contoh (dari root project):
+    python benchmarks/bench_nlp.py                     # semua ukuran, cek baseline
+    python benchmarks/bench_nlp.py --sizes 100,1000    # cepat
+    python benchmarks/bench_nlp.py --save-baseline     # simpan baseline baru
+
+Baseline bergantung mesin: simpan ulang di mesin yang dipakai CI/deploy.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synth import GAS_VARIANTS, GROUP_TARGETS, build_corpus, write_catalog_csv  # noqa: E402
+from modules import nlp_core  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# metrik yang dicek terhadap baseline: (nama, toleransi relatif, slack absolut)
+CHECKED_METRICS = (
+    ("load_csv_ms", 1.5, 5.0),
+    ("alias_index_ms", 1.5, 5.0),
+    ("snapshot_build_ms", 1.5, 5.0),
+    ("artifact_startup_ms", 1.5, 5.0),
+    ("mem_retained_mb", 1.25, 1.0),
+    ("parse_p50_us", 1.5, 20.0),
+    ("parse_p95_us", 1.5, 50.0),
+    ("parse_p99_us", 1.75, 100.0),
+)
+
+
+def _ms(ns):
+    return ns / 1e6
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank persentil dari list yang sudah di-sort."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def _best_of(fn, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        value = fn()
+        dt = time.perf_counter_ns() - t0
+        best = dt if best is None else min(best, dt)
+    return best, value
+
+
+def bench_size(n_sku, workdir, corpus_size, repeat):
+    csv_path = os.path.join(workdir, f"catalog_{n_sku}.csv")
+    brands = write_catalog_csv(csv_path, n_sku)
+    corpus = build_corpus(brands, size=corpus_size)
+    reps = repeat if n_sku <= 10000 else 1
+
+    row = {"sku": n_sku}
+
+    # --- build (waktu) ---
+    t, raw = _best_of(lambda: nlp_core.load_catalog_from_csv(csv_path), reps)
+    row["load_csv_ms"] = _ms(t)
+
+    t, _ = _best_of(lambda: nlp_core.build_alias_index(raw), reps)
+    row["alias_index_ms"] = _ms(t)
+
+    catalog = nlp_core.freeze_catalog(raw)
+    t, snap = _best_of(lambda: nlp_core.build_snapshot(catalog, fingerprint=f"bench:{n_sku}"), reps)
+    row["snapshot_build_ms"] = _ms(t)
+
+    # --- startup via artifact katalog ---
+    nlp_core.compile_catalog(csv_path)
+    t, _ = _best_of(lambda: nlp_core.ENGINE.load_catalog_file(csv_path, force=True), reps)
+    row["artifact_startup_ms"] = _ms(t)
+
+    # --- memori (pass terpisah: tracemalloc memperlambat timing) ---
+    tracemalloc.start()
+    base_cur, _ = tracemalloc.get_traced_memory()
+    mem_cat = nlp_core.freeze_catalog(nlp_core.load_catalog_from_csv(csv_path))
+    mem_snap = nlp_core.build_snapshot(mem_cat, fingerprint="bench:mem")
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    row["mem_retained_mb"] = (cur - base_cur) / 1e6
+    row["mem_peak_mb"] = (peak - base_cur) / 1e6
+    del mem_cat, mem_snap
+
+    # --- parse (tanpa cache) ---
+    parse = nlp_core.parse_orders_verbose
+    for utterances in corpus.values():
+        for u in utterances[:3]:
+            parse(u, catalog, snapshot=snap)  # warm-up
+
+    all_lat = []
+    groups = {}
+    group_labels = {group: set() for group in corpus}
+    t_total = time.perf_counter_ns()
+    for group, utterances in corpus.items():
+        lat = []
+        labels = group_labels[group]
+        for u in utterances:
+            t0 = time.perf_counter_ns()
+            res = parse(u, catalog, snapshot=snap)
+            lat.append((time.perf_counter_ns() - t0) / 1e3)
+            labels.update(r.logic for r in res)
+        lat.sort()
+        groups[group] = {"n": len(lat), "p50_us": percentile(lat, 0.50), "p95_us": percentile(lat, 0.95)}
+        all_lat.extend(lat)
+    t_total = time.perf_counter_ns() - t_total
+
+    all_lat.sort()
+    row["utterances"] = len(all_lat)
+    row["throughput_per_s"] = len(all_lat) / (t_total / 1e9) if t_total else 0.0
+    row["parse_p50_us"] = percentile(all_lat, 0.50)
+    row["parse_p95_us"] = percentile(all_lat, 0.95)
+    row["parse_p99_us"] = percentile(all_lat, 0.99)
+    row["groups"] = groups
+
+    # --- cakupan label per grup (tanpa timing) ---
+    for group, labels in single_gas_labels(workdir, corpus_size).items():
+        group_labels.setdefault(group, set()).update(labels)
+    row["logic_labels"] = sorted(set().union(*group_labels.values()))
+    missing = {}
+    for group, targets in GROUP_TARGETS.items():
+        lost = [t for t in targets if t not in group_labels.get(group, ())]
+        if lost:
+            missing[group] = lost
+    row["coverage_missing"] = missing
+    return row
+
+
+def single_gas_labels(workdir, corpus_size):
+    """
+    {grup: label} dari corpus yang diparse di katalog kecil dengan 1 SKU gas:
+    L1_GAS_SINGLE tidak mungkin muncul kalau katalog punya > 1 SKU gas.
+    """
+    csv_path = os.path.join(workdir, "catalog_gas1.csv")
+    brands = write_catalog_csv(csv_path, 100, gas=GAS_VARIANTS[:1])
+    catalog = nlp_core.freeze_catalog(nlp_core.load_catalog_from_csv(csv_path))
+    snap = nlp_core.build_snapshot(catalog, fingerprint="bench:gas1")
+
+    labels = {}
+    for group, utterances in build_corpus(brands, size=corpus_size).items():
+        hit = labels.setdefault(group, set())
+        for u in utterances:
+            hit.update(r.logic for r in nlp_core.parse_orders_verbose(u, catalog, snapshot=snap))
+    return labels
+
+
+def compare(results, baseline):
+    """List pesan regresi (kosong = aman)."""
+    problems = []
+    base_rows = {str(r["sku"]): r for r in baseline.get("results", [])}
+    for row in results:
+        base = base_rows.get(str(row["sku"]))
+        if not base:
+            continue
+        for metric, tol, slack in CHECKED_METRICS:
+            old, new = base.get(metric), row.get(metric)
+            if old is None or new is None:
+                continue
+            limit = old * tol + slack
+            if new > limit:
+                problems.append(
+                    f"{row['sku']} SKU: {metric} {new:.2f} > batas {limit:.2f} (baseline {old:.2f})"
+                )
+    return problems
+
+
+def print_table(results):
+    cols = [
+        ("sku", "SKU", "{:>7}"),
+        ("load_csv_ms", "csv ms", "{:>9.1f}"),
+        ("snapshot_build_ms", "index ms", "{:>9.1f}"),
+        ("artifact_startup_ms", "artif ms", "{:>9.1f}"),
+        ("mem_retained_mb", "mem MB", "{:>8.1f}"),
+        ("throughput_per_s", "utt/s", "{:>9.0f}"),
+        ("parse_p50_us", "p50 µs", "{:>9.0f}"),
+        ("parse_p95_us", "p95 µs", "{:>9.0f}"),
+        ("parse_p99_us", "p99 µs", "{:>9.0f}"),
+    ]
+    print(" ".join(f"{title:>{len(fmt.format(0))}}" for _, title, fmt in cols))
+    for row in results:
+        print(" ".join(fmt.format(row[key]) for key, _, fmt in cols))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark parser NLP dengan katalog sintetis")
+    ap.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                    help="ukuran katalog (SKU), dipisah koma")
+    ap.add_argument("--corpus-size", type=int, default=400, help="jumlah utterance per katalog (kira-kira)")
+    ap.add_argument("--repeat", type=int, default=3, help="ulangi pengukuran build (ambil tercepat)")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true", help="tulis hasil sebagai baseline baru")
+    ap.add_argument("--json", dest="json_out", help="simpan hasil lengkap ke file JSON")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            print(f"[bench] katalog {n} SKU ...", flush=True)
+            results.append(bench_size(n, workdir, args.corpus_size, args.repeat))
+
+    print()
+    print_table(results)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    uncovered = [
+        f"{row['sku']} SKU: {group} tidak mencapai {', '.join(lost)}"
+        for row in results
+        for group, lost in row["coverage_missing"].items()
+    ]
+    if uncovered:
+        print("\n[CAKUPAN] label target tidak tercapai (cek template di synth.build_corpus):")
+        for p in uncovered:
+            print(f"  - {p}")
+        return 1
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] baseline disimpan: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\n[INFO] baseline belum ada (jalankan dengan --save-baseline)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    problems = compare(results, baseline)
+    if problems:
+        print("\n[REGRESI] lebih lambat / lebih boros dari baseline:")
+        for p in problems:
+            print(f"  - {p}")
+        return 1
+
+    print("\n[OK] tidak ada regresi terhadap baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
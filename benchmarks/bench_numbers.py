@@ -0,0 +1,121 @@
+# benchmarks/bench_numbers.py
+
+"""
+Benchmark + cek hasil parser kata bilangan (nlp_lexer.read_number_words)
+di dalam scan chunk (ChunkLexer.scan).
+
+1) CASES: frasa → qty / varian yang diharapkan (exit 1 kalau ada yang salah)
+2) Waktu scan per chunk: kata bilangan majemuk vs angka polos yang setara
+   (overhead mesin status harus kecil) + throughput read_number_words.
+
+Contoh (dari root project):
+    python benchmarks/bench_numbers.py
+    python benchmarks/bench_numbers.py --rounds 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from modules.nlp_core import NUM_WORDS, SIZE_GROUP  # noqa: E402
+from modules.nlp_lexer import (  # noqa: E402
+    ChunkLexer,
+    number_word_table,
+    read_number_words,
+)
+
+# angka varian seperti katalog asli (600ml, 19l, 3kg, 12kg, ...)
+VARIANT_NUMBERS = {"600", "1500", "1.5", "330", "240", "19", "3", "12", "5.5"}
+
+# (chunk, qty, has_explicit_qty, variant)
+CASES = [
+    ("aqua galon dua", 2, True, "19l"),
+    ("aqua galon dua puluh", 20, True, "19l"),
+    ("lima belas galon aqua", 15, True, "19l"),
+    ("dua belas galon", 12, True, "19l"),          # 12 = angka varian, tapi "galon" = satuan qty
+    ("sebelas botol aqua", 11, True, "1.5ml"),    # "botol" → tebakan varian fragment
+    ("seratus cup aqua", 100, True, "240ml"),
+    ("2 puluh dus aqua", 20, True, None),
+    ("duapuluh lima galon", 25, True, "19l"),
+    ("seratus dua puluh cup", 120, True, "240ml"),
+    ("seribu dua ratus galon", 1200, True, "19l"),
+    ("dua ratus dua puluh lima dus", 225, True, None),
+    ("aqua tiga puluh", 30, True, None),
+    ("aqua enam ratus", None, False, "600ml"),    # angka varian → bukan qty
+    ("sembilan belas", None, False, "19l"),       # 19 = galon
+    ("aqua dua liter", None, False, None),        # kata angka sebelum satuan → bukan qty
+    ("empat puluh kilo", None, False, "40kg"),
+    ("gas sepuluh tiga kilo", 10, True, None),   # 11–19 hanya lewat "belas"
+    ("aqua galon sepuluh dua", 10, True, "19l"),
+]
+
+SCAN_PAIRS = [
+    ("aqua galon dua puluh", "aqua galon 20"),
+    ("lima belas galon aqua", "15 galon aqua"),
+    ("dua ratus dua puluh lima botol", "225 botol"),
+    ("seratus dua puluh cup", "120 cup"),
+    ("aqua botol tiga", "aqua botol 3"),
+]
+
+
+def build_lexer():
+    table = {"600": "600ml", "1500": "1500ml", "1.5": "1.5l", "330": "330ml", "240": "240ml", "19": "19l"}
+    return ChunkLexer(table, VARIANT_NUMBERS, NUM_WORDS, SIZE_GROUP)
+
+
+def check_cases(lexer):
+    errors = []
+    for chunk, qty, explicit, variant in CASES:
+        f = lexer.scan(chunk.split())
+        got = (f["qty"], f["has_explicit_qty"], f["variant"])
+        if got != (qty, explicit, variant):
+            errors.append(f"{chunk!r}: dapat {got}, harap {(qty, explicit, variant)}")
+    return errors
+
+
+def _ns_per_call(fn, arg, rounds):
+    t0 = time.perf_counter_ns()
+    for _ in range(rounds):
+        fn(arg)
+    return (time.perf_counter_ns() - t0) / rounds
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark parser kata bilangan")
+    ap.add_argument("--rounds", type=int, default=5000)
+    args = ap.parse_args(argv)
+
+    lexer = build_lexer()
+    errors = check_cases(lexer)
+    print(f"[cek] {len(CASES) - len(errors)}/{len(CASES)} kasus benar")
+    for e in errors:
+        print(f"  - {e}")
+
+    print(f"\n{'chunk (kata)':34} {'kata µs':>8} {'angka µs':>9} {'rasio':>6}")
+    for words, digits in SCAN_PAIRS:
+        tw = _ns_per_call(lexer.scan, words.split(), args.rounds)
+        td = _ns_per_call(lexer.scan, digits.split(), args.rounds)
+        print(f"{words:34} {tw / 1e3:8.2f} {td / 1e3:9.2f} {tw / td:6.2f}")
+
+    table = number_word_table(NUM_WORDS)
+    phrases = [c[0].split() for c in CASES]
+    rounds = max(1, args.rounds // len(phrases))
+    t0 = time.perf_counter_ns()
+    for _ in range(rounds):
+        for toks in phrases:
+            for i in range(len(toks)):
+                read_number_words(toks, i, table)
+    calls = rounds * sum(len(t) for t in phrases)
+    dt = time.perf_counter_ns() - t0
+    print(f"\nread_number_words: {calls / (dt / 1e9):,.0f} panggilan/detik ({dt / calls:.0f} ns/panggilan)")
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# benchmarks/bench_parse_service.py
+
+"""
+Throughput parse: inline (1 interpreter, GIL) vs ParseService (process pool).
+
+N thread klien (≈ session Streamlit) mem-parse corpus sintetis bersamaan:
+  - inline  : parse_orders_verbose langsung di thread klien
+  - service : ParseService.parse (batch ke worker, timeout → inline)
+
+Hasil per mode: utt/detik, p50/p95 latensi per permintaan (ms), dan
+statistik service (batch rata-rata, pool penuh, timeout).
+
+Contoh (dari root project):
+    python benchmarks/bench_parse_service.py --sku 10000 --workers 4 --clients 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_nlp import percentile  # noqa: E402
+from benchmarks.synth import build_corpus, write_catalog_csv  # noqa: E402
+from modules import nlp_core  # noqa: E402
+from modules.parse_service import ParseService  # noqa: E402
+
+
+def run_clients(parse_one, texts, clients):
+    """Bagi teks ke `clients` thread; return (detik, latensi ms terurut)."""
+    lat = []
+    lock = threading.Lock()
+
+    def client(part):
+        mine = []
+        for t in part:
+            t0 = time.perf_counter()
+            parse_one(t)
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            lat.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(texts[i::clients],)) for i in range(clients)]
+    t0 = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return time.perf_counter() - t0, sorted(lat)
+
+
+def report(name, seconds, lat):
+    print(f"{name:8} {len(lat) / seconds:9.0f} utt/s   p50 {percentile(lat, 0.50):7.2f} ms"
+          f"   p95 {percentile(lat, 0.95):7.2f} ms")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark parse inline vs process pool")
+    ap.add_argument("--sku", type=int, default=10000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--clients", type=int, default=8, help="thread klien bersamaan")
+    ap.add_argument("--corpus-size", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "catalog.csv")
+        brands = write_catalog_csv(csv_path, args.sku)
+        texts = [u for us in build_corpus(brands, size=args.corpus_size).values() for u in us]
+
+        nlp_core.ENGINE.load_catalog_file(csv_path)
+        snap = nlp_core.ENGINE.snapshot
+
+        def inline(t):
+            return nlp_core.parse_orders_verbose(t, snap.catalog, snapshot=snap)
+
+        seconds, lat = run_clients(inline, texts, args.clients)
+        report("inline", seconds, lat)
+
+        service = ParseService(csv_path, workers=args.workers, timeout=5.0)
+        service.start()
+        try:
+            service.parse(texts[0], snap, timeout=60)  # tunggu worker siap
+
+            def pooled(t):
+                return service.parse(t, snap) or inline(t)
+
+            seconds, lat = run_clients(pooled, texts, args.clients)
+            report("service", seconds, lat)
+            stats = service.stats()
+            print(f"\n[service] workers {stats['workers']}, batch rata-rata {stats['avg_batch']:.1f}, "
+                  f"pool penuh {stats['saturated']}, timeout {stats['timeouts']}, error {stats['errors']}")
+        finally:
+            service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
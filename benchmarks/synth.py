@@ -0,0 +1,236 @@
+# benchmarks/synth.py
+
+"""
+Generator data sintetis untuk benchmark NLP.
+
+- write_catalog_csv(path, n_sku) : katalog format asli (header biasa,
+  setiap baris data dibungkus kutip besar, aliases dipisah '|')
+- build_corpus(brands)           : utterance per jalur L0–L7, order
+  multi-chunk ("dan"/"lalu") dan input panjang (adversarial)
+- GROUP_TARGETS                  : label logic yang WAJIB dicapai tiap grup
+  (dicek runner, lihat bench_nlp.bench_size)
+
+Deterministik (random.Random(seed)) supaya hasil antar run sebanding.
+"""
+
+import csv
+import io
+import random
+
+HEADER = ["kategori", "varian", "nama", "harga", "aliases", "satuan", "isi", "brand"]
+
+# (kategori, varian, label nama, harga dasar)
+AIR_VARIANTS = [
+    ("galon", "19l", "Galon", 20000),
+    ("botol", "600ml", "Botol", 3500),
+    ("botol", "1500ml", "Botol", 6000),
+    ("botol", "330ml", "Botol", 2500),
+    ("cup", "240ml", "Cup", 1000),
+    ("dus", "600ml", "Dus", 45000),
+]
+
+GAS_VARIANTS = [
+    ("gas", "3kg", "Gas Elpiji", 22000),
+    ("gas", "12kg", "Gas Elpiji", 210000),
+    ("gas", "5.5kg", "Bright Gas", 95000),
+]
+
+# baris tetap (selalu ada, di depan brand sintetis) supaya SEMUA label L0–L7
+# bisa dicapai corpus: varian tanpa size group (L3), brand dengan botol
+# non-besar (L4 botol), produk tanpa brand dengan alias umum (L6).
+# (kategori, varian, nama, harga, aliases, brand)
+COVERAGE_ROWS = [
+    ("galon", "19l", "Air Isi Ulang 19L", 7000, ["air refill", "isi ulang refill"], ""),
+    ("botol", "750ml", "Segar Botol 750ml", 4000, ["segar 750ml", "segar botol 750ml"], "segar"),
+    ("botol", "1000ml", "Segar Botol 1000ml", 5000, ["segar 1000ml", "segar botol 1000ml"], "segar"),
+    ("botol", "1000ml", "Sejuk Botol 1000ml", 5000, ["sejuk 1000ml", "sejuk botol 1000ml"], "sejuk"),
+    ("dus", "2000ml", "Sejuk Dus 2000ml Isi 6", 48000, ["sejuk dus 2000ml"], "sejuk"),
+    ("dus", "2000ml", "Sejuk Dus 2000ml Isi 12", 90000, ["sejuk karton 2000ml"], "sejuk"),
+]
+
+REAL_BRANDS = ["aqua", "le minerale", "cleo", "club", "vit", "ades", "nestle", "prima"]
+
+_SYLLABLES = ["ka", "ri", "mo", "ta", "su", "ne", "lo", "pa", "di", "ra", "ve", "zu", "qi", "bo", "je"]
+
+
+def brand_names(count, seed=0):
+    """Nama brand unik: brand asli dulu, lalu nama sintetis (2–3 suku kata)."""
+    rnd = random.Random(seed)
+    names = list(REAL_BRANDS[:count])
+    seen = set(names)
+    while len(names) < count:
+        name = "".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 3)))
+        if name in seen:
+            name = f"{name}{len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _aliases(brand, kategori, varian):
+    num = varian.rstrip("mlkg").rstrip("l")
+    if kategori == "galon":
+        return [f"{brand} galon", f"galon {brand}", f"{brand} 19l", f"{brand} isi ulang"]
+    if kategori == "cup":
+        return [f"{brand} cup", f"{brand} gelas", f"{brand} {varian}", f"{brand} cup {num}"]
+    if kategori == "dus":
+        return [f"{brand} dus {num}", f"dus {brand} {varian}", f"{brand} kardus {num}"]
+    return [f"{brand} {varian}", f"{brand} botol {varian}", f"{brand} {num}", f"{brand} botol"]
+
+
+def catalog_rows(n_sku, seed=0, gas=GAS_VARIANTS):
+    """n_sku baris katalog (dict per kolom HEADER). `gas` = varian gas yang dipakai."""
+    rows = [
+        {
+            "kategori": kat, "varian": var, "nama": f"{label} {var.upper()}",
+            "harga": str(price), "aliases": "|".join([f"gas {var}", f"elpiji {var}", label.lower()]),
+            "satuan": "tabung", "isi": "", "brand": "bright" if label.startswith("Bright") else "elpiji",
+        }
+        for kat, var, label, price in gas
+    ]
+    rows += [
+        {
+            "kategori": kat, "varian": var, "nama": nama, "harga": str(price),
+            "aliases": "|".join(aliases), "satuan": kat,
+            "isi": nama.rsplit(" ", 1)[-1] if "Isi" in nama else "", "brand": brand,
+        }
+        for kat, var, nama, price, aliases, brand in COVERAGE_ROWS
+    ]
+
+    n_brands = max(1, (n_sku - len(rows) + len(AIR_VARIANTS) - 1) // len(AIR_VARIANTS))
+    for b, brand in enumerate(brand_names(n_brands, seed)):
+        for kat, var, label, price in AIR_VARIANTS:
+            if len(rows) >= n_sku:
+                break
+            title = brand.title()
+            rows.append({
+                "kategori": kat,
+                "varian": var,
+                "nama": f"{title} {label} {var}" if kat != "galon" else f"Galon {title} {var.upper()}",
+                "harga": str(price + (b % 7) * 500),
+                "aliases": "|".join(_aliases(brand, kat, var)),
+                "satuan": kat,
+                "isi": "24" if kat == "dus" else "",
+                "brand": brand,
+            })
+    return rows[:n_sku]
+
+
+def catalog_csv_text(rows):
+    """Baris → teks CSV format katalog asli (baris data dibungkus kutip luar)."""
+    out = io.StringIO()
+    out.write(",".join(HEADER) + "\n")
+    outer = csv.writer(out, quoting=csv.QUOTE_ALL, lineterminator="\n")
+    for row in rows:
+        inner = io.StringIO()
+        csv.writer(inner, lineterminator="").writerow([row[h] for h in HEADER])
+        outer.writerow([inner.getvalue()])
+    return out.getvalue()
+
+
+def write_catalog_csv(path, n_sku, seed=0, gas=GAS_VARIANTS):
+    rows = catalog_rows(n_sku, seed, gas)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(catalog_csv_text(rows))
+    return sorted({r["brand"] for r in rows if r["kategori"] != "gas" and r["brand"] not in COVERAGE_BRANDS})
+
+
+COVERAGE_BRANDS = {brand for *_, brand in COVERAGE_ROWS}
+
+# label yang wajib muncul per grup corpus. L1_GAS_SINGLE hanya mungkin kalau
+# katalog punya 1 SKU gas → runner juga mem-parse corpus di katalog kecil
+# dengan gas=GAS_VARIANTS[:1].
+GROUP_TARGETS = {
+    "L0_direct_alias": ("L0_DIRECT_ALIAS_SINGLE", "L0_DIRECT_ALIAS_MULTI"),
+    "L1_gas": ("L1_GAS_SINGLE", "L1_GAS_MULTI"),
+    "L2_size_group": ("L2_SIZE_GROUP_AUTO_PICK", "L2_SIZE_GROUP_MULTI"),
+    "L3_varian": ("L3_VARIAN_ONLY_BRAND_FIRST", "L3_VARIAN_ONLY_SINGLE", "L3_VARIAN_ONLY_MULTI"),
+    "L4_botol_packaging": (
+        "L4_BOTOL_SINGLE", "L4_BOTOL_MULTI", "L4_PACKAGING_BRAND_FIRST", "L4_PACKAGING_BRAND_KNOWN",
+    ),
+    "L4C_air_mineral": ("L4C_AIR_MINERAL_BRAND_FIRST",),
+    "L5_brand": ("L5_BRAND_ONLY", "L5_BRAND_AMBIGUOUS"),
+    "L6_L7_kategori": ("L6_ALIAS_UMUM", "L7_KATEGORI"),
+    "no_match": ("NO_MATCH",),
+}
+
+
+def build_corpus(brands, size=400, seed=0):
+    """
+    Return {grup: [utterance, ...]}.
+    Grup = jalur L0–L7 yang DITARGETKAN; label yang wajib tercapai per grup
+    ada di GROUP_TARGETS (dicek runner dari ParseResult.logic).
+    Template pertama tiap grup dipakai berurutan dulu → semua template
+    pasti muncul walau corpus kecil.
+    """
+    rnd = random.Random(seed)
+    pick = lambda: rnd.choice(brands)  # noqa: E731
+    qty = lambda: rnd.choice(["", "2 ", "tiga ", "5 botol ", "dua "])  # noqa: E731
+
+    templates = {
+        "L0_direct_alias": [
+            lambda: f"{qty()}{pick()} 600ml",
+            lambda: f"{pick()} botol",          # alias di beberapa SKU botol
+            lambda: f"{pick()} galon 19l",
+            lambda: f"{pick()} cup 240",
+        ],
+        "L1_gas": [
+            lambda: f"{qty()}gas 3 kg",
+            lambda: "elpiji 12 kilo",
+            lambda: "bright gas",
+        ],
+        "L2_size_group": [
+            lambda: f"{pick()} tanggung",
+            lambda: f"{qty()}{pick()} besar",
+            lambda: "yang kecil",
+        ],
+        "L3_varian": [
+            lambda: "1000 ml",          # 2 brand → pilih brand dulu
+            lambda: f"{qty()}750 ml",    # 1 produk
+            lambda: "2000 ml",          # 1 brand, 2 produk
+        ],
+        "L4_botol_packaging": [
+            lambda: "botol sejuk",      # brand dengan 1 botol (bukan botol besar)
+            lambda: "botol segar",
+            lambda: "satu dus",
+            lambda: f"2 dus {pick()}",
+        ],
+        "L4C_air_mineral": [
+            lambda: "air mineral",
+            lambda: f"{qty()}air mineral",
+        ],
+        "L5_brand": [
+            lambda: f"{pick()}",
+            lambda: f"{pick()} atau {pick()}",
+        ],
+        "L6_L7_kategori": [
+            lambda: "air refill",
+            lambda: "air",
+        ],
+        "no_match": [
+            lambda: "halo selamat pagi",
+            lambda: "terima kasih banyak",
+        ],
+    }
+
+    corpus = {}
+    per_group = max(1, size // (len(templates) + 2))
+    for group, fns in templates.items():
+        corpus[group] = [(fns[i] if i < len(fns) else rnd.choice(fns))() for i in range(per_group)]
+
+    singles = [u for us in corpus.values() for u in us]
+    corpus["multi_chunk"] = [
+        f" {rnd.choice(['dan', 'lalu', 'terus', ','])} ".join(rnd.sample(singles, rnd.randint(2, 4)))
+        for _ in range(per_group)
+    ]
+
+    # adversarial: input panjang, angka beruntun, banyak pemisah
+    vocab = " ".join(singles).split() + ["1", "5", "19", "dan", "lalu"]
+    corpus["adversarial_long"] = [
+        " ".join(rnd.choice(vocab) for _ in range(rnd.choice([64, 128, 256])))
+        for _ in range(max(1, per_group // 4))
+    ] + [
+        " ".join(["1"] * 200),
+        " dan ".join(["aqua"] * 100),
+    ]
+    return corpus
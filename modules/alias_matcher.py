@@ -0,0 +1,191 @@
+# modules/alias_matcher.py
+
+"""
+Multi-pattern matcher untuk alias katalog.
+
+Dibangun SEKALI saat build_alias_index() jalan, lalu dipakai per chunk:
+satu kali scan teks → strong, weak, exact, partial sekaligus.
+
+- Cocok hanya di batas kata (token), jadi alias "le" tidak kena di "lelah".
+- Backend default: Aho-Corasick level token (pure Python).
+- Kalau paket `pyahocorasick` terpasang, dipakai sebagai backend cepat.
+- updated(alias_index): matcher untuk alias_index hasil reload incremental;
+  automaton dipakai ulang kalau tidak ada string alias baru.
+"""
+
+import copy
+
+try:
+    import ahocorasick  # pyahocorasick (opsional)
+    AHOCORASICK_AVAILABLE = True
+except Exception:
+    AHOCORASICK_AVAILABLE = False
+
+
+class AliasMatcher:
+    def __init__(self, alias_index, is_strong, use_accel=None, known_strong=None):
+        """
+        alias_index  : {alias_norm: [catalog_key, ...]}  (hasil build_alias_index)
+        is_strong    : fungsi alias_norm -> bool (alias punya info varian?)
+        use_accel    : None = otomatis (pakai pyahocorasick kalau ada)
+        known_strong : opsional {alias_norm: bool} hasil matcher lama (tanpa hitung ulang)
+        """
+        known_strong = known_strong or {}
+        self.is_strong = is_strong
+        self.use_accel = use_accel
+        self.aliases = list(alias_index.keys())
+        self.alias_keys = [tuple(alias_index[a]) for a in self.aliases]
+        self.alias_strong = [
+            known_strong[a] if a in known_strong else bool(is_strong(a))
+            for a in self.aliases
+        ]
+        self.alias_id = {a: i for i, a in enumerate(self.aliases)}
+
+        # index n-gram token alias → dipakai untuk "teks ada di dalam alias"
+        # contoh alias "aqua galon 19l" → ("aqua",), ("aqua","galon"), ("galon","19l"), ...
+        self.sub_index = {}
+        for aid, alias in enumerate(self.aliases):
+            toks = tuple(alias.split())
+            for i in range(len(toks)):
+                for j in range(i + 1, len(toks) + 1):
+                    self.sub_index.setdefault(toks[i:j], []).append(aid)
+
+        if use_accel is None:
+            use_accel = AHOCORASICK_AVAILABLE
+        self.backend = "pyahocorasick" if (use_accel and AHOCORASICK_AVAILABLE) else "python"
+
+        if self.backend == "pyahocorasick":
+            self._build_accel()
+        else:
+            self._build_token_automaton()
+
+    def updated(self, alias_index, changed=None):
+        """
+        Matcher untuk alias_index baru (matcher ini TIDAK diubah).
+        changed : opsional alias yang key-nya berubah (default: cek semua).
+
+        - Tidak ada string alias baru (key per alias berubah / alias hilang):
+          automaton + sub_index dipakai bersama, cukup ganti alias_keys.
+          Alias yang hilang tetap di automaton dengan key kosong.
+        - Ada alias baru: build ulang, flag strong alias lama dipakai ulang.
+        """
+        check = alias_index if changed is None else changed
+        if all(a in self.alias_id for a in check):
+            new = copy.copy(self)
+            if changed is None:
+                new.alias_keys = [tuple(alias_index.get(a, ())) for a in self.aliases]
+            else:
+                new.alias_keys = list(self.alias_keys)
+                for a in changed:
+                    new.alias_keys[self.alias_id[a]] = tuple(alias_index.get(a, ()))
+            return new
+
+        known = dict(zip(self.aliases, self.alias_strong))
+        return AliasMatcher(alias_index, self.is_strong, self.use_accel, known_strong=known)
+
+    # ------------------------------------------------------------
+    # BUILD
+    # ------------------------------------------------------------
+    def _build_token_automaton(self):
+        # goto[state] = {token: next_state}, out[state] = [alias_id, ...]
+        goto = [{}]
+        out = [[]]
+
+        for aid, alias in enumerate(self.aliases):
+            state = 0
+            for tok in alias.split():
+                nxt = goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][tok] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(aid)
+
+        # failure link (BFS), output digabung sepanjang fail link
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for tok, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and tok not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(tok, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def _build_accel(self):
+        auto = ahocorasick.Automaton()
+        for aid, alias in enumerate(self.aliases):
+            # spasi di kiri-kanan = batas kata
+            auto.add_word(f" {alias} ", aid)
+        auto.make_automaton()
+        self._auto = auto
+
+    # ------------------------------------------------------------
+    # SEARCH
+    # ------------------------------------------------------------
+    def _scan(self, tokens):
+        """Kembalikan alias_id yang muncul utuh (per token) di dalam teks."""
+        if self.backend == "pyahocorasick":
+            if not self.aliases:
+                return []
+            return [aid for _, aid in self._auto.iter(" " + " ".join(tokens) + " ")]
+
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        state = 0
+        for tok in tokens:
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            if out[state]:
+                found.extend(out[state])
+        return found
+
+    def match(self, text_norm):
+        """
+        Satu kali scan untuk teks yang SUDAH dinormalisasi.
+
+        Return dict:
+          - strong  : key dari alias (dengan info varian) yang ada di teks
+          - weak    : key dari alias umum (tanpa info varian) yang ada di teks
+          - exact   : key dari alias yang sama persis dengan teks
+          - partial : key dari alias yang ada di teks ATAU teks ada di alias
+        """
+        tokens = (text_norm or "").split()
+        if not tokens:
+            return {"strong": [], "weak": [], "exact": [], "partial": []}
+
+        strong, weak, partial = {}, {}, {}
+
+        for aid in self._scan(tokens):
+            keys = self.alias_keys[aid]
+            bucket = strong if self.alias_strong[aid] else weak
+            for k in keys:
+                bucket[k] = None
+                partial[k] = None
+
+        # teks (utuh) merupakan potongan token dari alias
+        for aid in self.sub_index.get(tuple(tokens), ()):
+            for k in self.alias_keys[aid]:
+                partial[k] = None
+
+        aid = self.alias_id.get(" ".join(tokens))
+        exact = list(self.alias_keys[aid]) if aid is not None else []
+
+        return {
+            "strong": list(strong),
+            "weak": list(weak),
+            "exact": exact,
+            "partial": list(partial),
+        }
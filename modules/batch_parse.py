@@ -0,0 +1,172 @@
+# modules/batch_parse.py
+
+"""
+Parse banyak utterance sekaligus (replay offline, evaluasi perubahan katalog).
+Tanpa Streamlit / session_state.
+
+- parse_orders_batch(texts, ...) : generator → list ParseResult per teks,
+                                   URUTAN SAMA dengan input
+- iter_utterances(lines)         : baca baris JSONL ({"text": ..., "id": ...})
+                                   atau teks polos
+- CLI                            : stdin / file → JSONL di stdout
+
+Dengan workers > 1, teks dibagi ke process pool. Katalog dimuat SEKALI di
+proses induk (artifact .nlpcat kalau ada). Worker mendapat sumber yang sama
+dengan snapshot induk: file katalog (ENGINE.catalog_path) atau, kalau katalog
+di-register dari memori, salinan katalog itu → hasil sama dengan parse
+serial, baik start method fork maupun spawn (macOS / Windows).
+
+Contoh (dari root project):
+    python -m modules.batch_parse orders.jsonl --workers 4 > hasil.jsonl
+    cat log.txt | python -m modules.batch_parse - --catalog catalog_depo78_clean.csv
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+from modules.nlp_core import ENGINE, parse_orders_verbose, _json_default
+
+DEFAULT_CATALOG = "catalog_depo78_clean.csv"
+
+
+# ================================================================
+#                       WORKER (PROCESS POOL)
+# ================================================================
+
+def _init_worker(catalog_path, catalog=None, fingerprint=None):
+    # fork: snapshot induk sudah ada → no-op (fingerprint sama)
+    if catalog_path:
+        ENGINE.load_catalog_file(catalog_path)
+    elif catalog is not None:
+        ENGINE.register_catalog(catalog, fingerprint=fingerprint)
+
+
+def _parse_one(text):
+    snap = ENGINE.snapshot
+    return parse_orders_verbose(text, snap.catalog, snapshot=snap)
+
+
+def _parse_one_record(item):
+    """(id, text) → 1 baris JSON (string) — serialisasi di worker, bukan di induk."""
+    ident, text = item
+    record = {"id": ident, "text": text}
+    try:
+        record["results"] = [r.to_dict() for r in _parse_one(text)]
+    except Exception as e:  # 1 teks rusak tidak menghentikan batch
+        record["error"] = f"{type(e).__name__}: {e}"
+    return json.dumps(record, ensure_ascii=False, default=_json_default)
+
+
+def _worker_initargs():
+    """Sumber snapshot ENGINE untuk worker: path file, atau salinan katalog (register dari memori)."""
+    snap = ENGINE.snapshot
+    if ENGINE.catalog_path:
+        return (ENGINE.catalog_path,)
+    return (None, dict(snap.catalog), snap.fingerprint)
+
+
+def _run(func, items, workers=None, catalog_path=None, chunksize=32, context=None):
+    """
+    map berurutan: inline kalau workers <= 1, selain itu process pool.
+    context : start method multiprocessing ("fork" / "spawn" / ...), default bawaan platform.
+    """
+    if catalog_path:
+        ENGINE.load_catalog_file(catalog_path)
+    if not ENGINE.snapshot.catalog:
+        raise RuntimeError("[ERROR] katalog belum dimuat (isi catalog_path / register_catalog dulu)")
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return map(func, items)
+
+    ctx = multiprocessing.get_context(context)
+    return _pool_imap(ctx, workers, _worker_initargs(), func, items, chunksize)
+
+
+def _pool_imap(ctx, workers, initargs, func, items, chunksize):
+    with ctx.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        # imap → hasil keluar sesuai urutan input, streaming (tidak tunggu semua)
+        yield from pool.imap(func, items, chunksize=chunksize)
+
+
+# ================================================================
+#                            API
+# ================================================================
+
+def parse_orders_batch(texts, workers=None, catalog_path=None, chunksize=32, context=None):
+    """
+    Iterator: untuk setiap teks (urutan input) → list ParseResult
+    (sama dengan parse_orders_verbose).
+
+    workers      : jumlah proses (default cpu_count; 1 = inline, tanpa pool)
+    catalog_path : CSV katalog; None = pakai snapshot ENGINE yang sudah di-register
+                   (worker ikut memakai katalog yang sama)
+    context      : start method multiprocessing (default bawaan platform)
+    """
+    return _run(_parse_one, texts, workers=workers, catalog_path=catalog_path,
+                chunksize=chunksize, context=context)
+
+
+def iter_utterances(lines):
+    """
+    Baris input → (id, text).
+    - JSONL: {"text": "..."} (atau "utterance"), "id" opsional
+    - selain itu: 1 baris = 1 utterance
+    Baris kosong dilewati; id default = nomor urut (0-based).
+    """
+    n = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        ident, text = n, line
+        if line.startswith("{"):
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                obj = None
+            if isinstance(obj, dict):
+                text = obj.get("text", obj.get("utterance", ""))
+                ident = obj.get("id", n)
+        yield ident, text
+        n += 1
+
+
+def _iter_input_lines(paths):
+    for path in paths or ["-"]:
+        if path == "-":
+            yield from sys.stdin
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield from f
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parse batch utterance → JSONL (urutan input)")
+    ap.add_argument("inputs", nargs="*", help="file JSONL / teks (default: stdin, '-' = stdin)")
+    ap.add_argument("--catalog", default=DEFAULT_CATALOG, help="CSV katalog")
+    ap.add_argument("--workers", type=int, default=None, help="jumlah proses (default: cpu_count)")
+    ap.add_argument("--chunksize", type=int, default=32, help="utterance per kiriman ke worker")
+    ap.add_argument("-o", "--output", help="file output (default: stdout)")
+    args = ap.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        items = iter_utterances(_iter_input_lines(args.inputs))
+        for line in _run(_parse_one_record, items, workers=args.workers,
+                         catalog_path=args.catalog, chunksize=args.chunksize):
+            out.write(line + "\n")
+    except (FileNotFoundError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# modules/catalog_artifact.py
+
+"""
+Artifact katalog hasil "compile" (lihat nlp_core.compile_catalog).
+
+CSV katalog (format kutip ganda) di-parse, divalidasi & dinormalisasi SEKALI,
+lalu disimpan sebagai file biner berversi di samping CSV:
+
+    catalog_depo78_clean.csv  →  catalog_depo78_clean.nlpcat
+
+Isi artifact (payload):
+  - source          : path, mtime_ns, size, sha1 CSV asal
+  - catalog         : {key: meta} (sama dengan load_catalog_from_csv)
+  - alias_index     : alias_norm → [keys]
+  - variant_numbers : angka varian
+  - variant_table   : angka polos → varian (untuk ChunkLexer)
+  - normalized      : key → (nama_norm, (alias_norm, ...))
+
+Startup cukup 1x baca file. Kalau artifact tidak ada, versinya beda,
+atau CSV sudah berubah → pemanggil fallback ke parsing CSV.
+
+Compile dari command line (dari root project):
+    python -m modules.catalog_artifact catalog_depo78_clean.csv [--strict]
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+
+ARTIFACT_MAGIC = b"D78NLPCAT"
+# naikkan kalau struktur payload berubah → artifact lama otomatis diabaikan
+ARTIFACT_VERSION = 1
+ARTIFACT_EXT = ".nlpcat"
+
+_HEADER_LEN = len(ARTIFACT_MAGIC) + 2
+
+
+def artifact_path_for(csv_path):
+    """catalog.csv → catalog.nlpcat (folder yang sama)."""
+    return os.path.splitext(csv_path)[0] + ARTIFACT_EXT
+
+
+def source_info(csv_path):
+    """Identitas CSV asal: path, mtime_ns, size, sha1 isi."""
+    st = os.stat(csv_path)
+    with open(csv_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return {
+        "path": os.path.abspath(csv_path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": digest,
+    }
+
+
+def is_fresh(payload, csv_path):
+    """
+    Artifact masih sesuai CSV?
+    - mtime + size sama → ya (tanpa baca isi CSV)
+    - kalau beda, bandingkan sha1 isi (mis. file di-copy ulang tanpa perubahan)
+    """
+    src = payload.get("source") or {}
+    if not os.path.exists(csv_path):
+        # deploy tanpa CSV: artifact jadi satu-satunya sumber
+        return True
+
+    st = os.stat(csv_path)
+    if src.get("mtime_ns") == st.st_mtime_ns and src.get("size") == st.st_size:
+        return True
+    return src.get("sha1") == source_info(csv_path)["sha1"]
+
+
+def write_artifact(path, payload):
+    """Tulis artifact secara atomik (tmp → rename)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(ARTIFACT_MAGIC)
+        f.write(ARTIFACT_VERSION.to_bytes(2, "big"))
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+def read_artifact(path):
+    """
+    Baca artifact. Return payload (dict) atau None kalau file tidak ada,
+    bukan artifact katalog, atau versinya tidak cocok.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:len(ARTIFACT_MAGIC)] != ARTIFACT_MAGIC:
+        return None
+    version = int.from_bytes(data[len(ARTIFACT_MAGIC):_HEADER_LEN], "big")
+    if version != ARTIFACT_VERSION:
+        return None
+
+    try:
+        return pickle.loads(data[_HEADER_LEN:])
+    except Exception:
+        # artifact rusak → pemanggil fallback ke CSV
+        return None
+
+
+def load_fresh_artifact(csv_path):
+    """Payload artifact untuk csv_path kalau ada & masih segar, selain itu None."""
+    payload = read_artifact(artifact_path_for(csv_path))
+    if payload is None or not is_fresh(payload, csv_path):
+        return None
+    return payload
+
+
+def main(argv=None):
+    # import di sini: nlp_core juga meng-import modul ini
+    from modules.nlp_core import compile_catalog, resolve_catalog_path
+
+    args = list(sys.argv[1:] if argv is None else argv)
+    strict = "--strict" in args
+    args = [a for a in args if a != "--strict"]
+    csv_path = resolve_catalog_path(args[0] if args else "catalog_depo78_clean.csv")
+    out_path = args[1] if len(args) > 1 else None
+
+    try:
+        out_path, warnings = compile_catalog(csv_path, out_path, strict=strict)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    for w in warnings:
+        print(f"[WARN] {w}")
+    print(f"[OK] artifact katalog ditulis: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
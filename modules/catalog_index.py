@@ -0,0 +1,459 @@
+# modules/catalog_index.py
+
+"""
+CatalogIndex: facet katalog yang dibangun SEKALI di register_catalog().
+
+Semua cabang parse_orders_verbose cukup lookup dict / irisan set,
+tidak perlu scan seluruh katalog per chunk.
+
+Setiap item katalog dapat ID integer kecil (urutan CSV). Semua facet
+menyimpan ID (set/tuple int), bukan string nama produk:
+  - brand    → ids
+  - kategori → ids
+  - varian   → ids
+  - size_group (pola di varian/nama) → ids
+  - flag: botol, cup, kemasan (botol/cup/ml), galon, air
+  - inverted index token (nama + aliases) → ids, token set per item,
+    token pertama nama (untuk skor kandidat)
+
+Kolom item juga disimpan kolumnar (names, prices, brand_ids, variant_ids).
+Method publik menerima/mengembalikan key katalog (string) supaya
+hasil parse & session tetap sama; method *_ids bekerja langsung di ID.
+
+Urutan hasil selalu mengikuti urutan katalog (CSV) = urutan ID.
+
+Hot reload: updated(catalog, changed, removed) → index BARU yang berbagi
+facet tak tersentuh dengan index lama (copy-on-write); item yang dihapus
+jadi tombstone (key None) supaya ID item lain tidak bergeser.
+"""
+
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+
+
+class CatalogItem(Mapping):
+    """
+    Record item katalog (read-only, __slots__).
+    Bisa dipakai seperti dict: item["nama"], item.get("harga", 0).
+    """
+    FIELDS = ("kategori", "varian", "nama", "harga", "brand", "aliases")
+    __slots__ = ("id",) + FIELDS
+
+    def __init__(self, item_id, kategori="", varian="", nama="", harga=0, brand="", aliases=()):
+        set_ = object.__setattr__
+        set_(self, "id", item_id)
+        set_(self, "kategori", kategori)
+        set_(self, "varian", varian)
+        set_(self, "nama", nama)
+        set_(self, "harga", harga)
+        set_(self, "brand", brand)
+        set_(self, "aliases", tuple(aliases))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CatalogItem read-only")
+
+    def __getitem__(self, field):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __reduce__(self):
+        return (CatalogItem, (self.id,) + tuple(getattr(self, f) for f in self.FIELDS))
+
+    def __repr__(self):
+        return f"CatalogItem({self.id}, {self.nama!r})"
+
+
+def compact_catalog(catalog):
+    """
+    {key: meta dict} → {key: CatalogItem} dengan ID = urutan katalog.
+    Item dengan kolom di luar CatalogItem.FIELDS dibiarkan apa adanya.
+    """
+    out = {}
+    fields = set(CatalogItem.FIELDS)
+    for i, (key, meta) in enumerate(catalog.items()):
+        if isinstance(meta, CatalogItem) or not set(meta) <= fields:
+            out[key] = meta
+        else:
+            out[key] = CatalogItem(i, **meta)
+    return out
+
+
+def _intern(table, names, value):
+    """value → ID kecil (dibuat kalau belum ada)."""
+    vid = table.get(value)
+    if vid is None:
+        vid = table[value] = len(names)
+        names.append(value)
+    return vid
+
+
+ItemFacets = namedtuple("ItemFacets", [
+    "brand",          # brand (lower)
+    "kategori",
+    "varian",
+    "alias_norms",    # tuple alias ternormalisasi
+    "tokens",         # frozenset token nama + aliases
+    "first_name",     # token pertama nama
+    "size_patterns",  # ((group, pola), ...) yang cocok di varian/nama
+    "flags",          # frozenset flag (botol/cup/kemasan/galon/air)
+])
+
+
+def item_facets(meta, size_groups, normalize, normalized=None):
+    """
+    Semua keanggotaan facet 1 item (dihitung sekali per item).
+    normalized : opsional (nama_norm, (alias_norm, ...)) dari artifact.
+    """
+    brand = (meta.get("brand") or "").strip().lower()
+    kat = (meta.get("kategori") or "").strip().lower()
+    var = (meta.get("varian") or "").strip().lower()
+    if normalized is not None:
+        nama, alias_norms = normalized
+    else:
+        nama = normalize(meta.get("nama") or "")
+        alias_norms = [normalize(a) for a in meta.get("aliases", [])]
+
+    # token nama + aliases (ternormalisasi), juga potongan "1.5" → "1","5"
+    # supaya setara dengan pencarian regex \b..\b di teks gabungan
+    toks = set()
+    for text in [nama, *alias_norms]:
+        for t in text.split():
+            toks.add(t)
+            if "." in t:
+                toks.update(p for p in t.split(".") if p)
+    name_toks = nama.split()
+
+    patterns = []
+    for group, cfg in size_groups.items():
+        for p in cfg.get("patterns", []):
+            if p in var or p in nama:
+                patterns.append((group, p))
+
+    flags = set()
+    is_botol = kat == "botol" or "botol" in nama
+    is_cup = kat == "cup" or "cup" in nama or "gelas" in nama
+    if is_botol:
+        flags.add("botol")
+    if is_cup:
+        flags.add("cup")
+    # air kemasan (non-galon): botol/cup atau ukuran ml
+    if is_botol or is_cup or "ml" in var or "ml" in nama:
+        flags.add("kemasan")
+    if "galon" in kat or "19l" in var or "galon" in nama:
+        flags.add("galon")
+    if kat in {"botol", "cup", "galon"} or is_botol or is_cup or "galon" in nama:
+        flags.add("air")
+
+    return ItemFacets(
+        brand=brand,
+        kategori=kat,
+        varian=var,
+        alias_norms=tuple(alias_norms),
+        tokens=frozenset(toks),
+        first_name=name_toks[0] if name_toks else "",
+        size_patterns=tuple(patterns),
+        flags=frozenset(flags),
+    )
+
+
+def _memberships(e):
+    """(nama facet, nilai facet) tempat item ber-entry `e` terdaftar."""
+    if e.brand:
+        yield "by_brand", e.brand
+    yield "by_kategori", e.kategori
+    yield "by_varian", e.varian
+    for group in dict.fromkeys(g for g, _ in e.size_patterns):
+        yield "by_size_group", group
+    for gp in e.size_patterns:
+        yield "by_size_pattern", gp
+    for t in e.tokens:
+        yield "token_index", t
+    for f in e.flags:
+        yield "flags", f
+
+
+def option_label(meta):
+    """Label opsi produk untuk UI: "Nama — Rp 12,000"."""
+    return f"{meta.get('nama', '(unknown)')} — Rp {int(meta.get('harga') or 0):,}"
+
+
+class CatalogIndex:
+    FLAGS = ("botol", "cup", "kemasan", "galon", "air")
+    FACETS = ("by_brand", "by_kategori", "by_varian", "by_size_group", "by_size_pattern", "token_index")
+
+    def __init__(self, catalog, size_groups, normalize, normalized=None):
+        """
+        normalized : opsional {key: (nama_norm, (alias_norm, ...))}
+                     (dari artifact katalog) → tanpa normalize ulang
+        """
+        self.catalog = catalog
+        self.size_groups = size_groups
+        self.normalize = normalize
+        # ID → key, key → ID
+        self.keys = list(catalog.keys())
+        self.id_of = {k: i for i, k in enumerate(self.keys)}
+        n = len(self.keys)
+
+        # kolom (kolumnar)
+        self.names = [None] * n
+        self.prices = array("q", [0] * n)
+        self.labels = [None] * n          # label opsi UI (option_label)
+        self.brand_names = [""]           # brand ID 0 = tanpa brand
+        self.variant_names = []
+        self.brand_ids = array("l", [0] * n)
+        self.variant_ids = array("l", [0] * n)
+        brand_table = {"": 0}
+        variant_table = {}
+
+        facets = {name: {} for name in self.FACETS}
+        facets["by_size_group"] = {g: [] for g in size_groups}
+        flags = {f: set() for f in self.FLAGS}
+        self.entries = [None] * n
+        self.item_tokens = [frozenset()] * n
+        self.first_name = [""] * n
+
+        for i, (k, meta) in enumerate(catalog.items()):
+            e = item_facets(meta, size_groups, normalize,
+                            normalized[k] if normalized is not None else None)
+            self.entries[i] = e
+            self.names[i] = meta.get("nama")
+            self.prices[i] = int(meta.get("harga") or 0)
+            self.labels[i] = option_label(meta)
+            self.brand_ids[i] = _intern(brand_table, self.brand_names, e.brand)
+            self.variant_ids[i] = _intern(variant_table, self.variant_names, e.varian)
+            self.item_tokens[i] = e.tokens
+            self.first_name[i] = e.first_name
+
+            for facet, value in _memberships(e):
+                if facet == "flags":
+                    flags[value].add(i)
+                else:
+                    facets[facet].setdefault(value, []).append(i)
+
+        # facet → tuple ID (urut katalog)
+        for name, d in facets.items():
+            setattr(self, name, {value: tuple(ids) for value, ids in d.items()})
+        self.flags = {f: frozenset(ids) for f, ids in flags.items()}
+
+        self.brands = sorted(self.by_brand)
+        self.brand_id_sets = {b: frozenset(ids) for b, ids in self.by_brand.items()}
+        self._brands_having = {}
+
+    # ------------------------------------------------------------
+    # UPDATE INCREMENTAL (copy-on-write)
+    # ------------------------------------------------------------
+    def updated(self, catalog, changed, removed=()):
+        """
+        Index baru untuk katalog yang hanya berubah sebagian; index lama
+        TIDAK diubah (masih dipakai parse yang sedang jalan).
+
+        changed : {id: key} item yang isinya berubah / item baru
+                  (item baru = ID lanjutan setelah ID terakhir)
+        removed : ID item yang dihapus (slot ID dibiarkan kosong)
+
+        Hanya facet yang tersentuh item tsb yang disalin ulang; kolom &
+        label item lain dipakai bersama.
+        """
+        new = object.__new__(CatalogIndex)
+        new.catalog = catalog
+        new.size_groups = self.size_groups
+        new.normalize = self.normalize
+
+        new.keys = list(self.keys)
+        new.id_of = dict(self.id_of)
+        new.names = list(self.names)
+        new.prices = array("q", self.prices)
+        new.labels = list(self.labels)
+        new.brand_ids = array("l", self.brand_ids)
+        new.variant_ids = array("l", self.variant_ids)
+        new.entries = list(self.entries)
+        new.item_tokens = list(self.item_tokens)
+        new.first_name = list(self.first_name)
+        new.brand_names = list(self.brand_names)
+        new.variant_names = list(self.variant_names)
+        brand_table = {b: i for i, b in enumerate(new.brand_names)}
+        variant_table = {v: i for i, v in enumerate(new.variant_names)}
+
+        grow = max(changed, default=-1) + 1 - len(new.keys)
+        if grow > 0:
+            new.keys.extend([None] * grow)
+            new.names.extend([None] * grow)
+            new.prices.extend([0] * grow)
+            new.labels.extend([None] * grow)
+            new.brand_ids.extend([0] * grow)
+            new.variant_ids.extend([0] * grow)
+            new.entries.extend([None] * grow)
+            new.item_tokens.extend([frozenset()] * grow)
+            new.first_name.extend([""] * grow)
+
+        delta = {}   # (facet, nilai) → (ID keluar, ID masuk)
+
+        def _move(e, i, slot):
+            for m in _memberships(e):
+                delta.setdefault(m, (set(), set()))[slot].add(i)
+
+        for i in removed:
+            if self.entries[i] is not None:
+                _move(self.entries[i], i, 0)
+            new.id_of.pop(new.keys[i], None)
+            new.keys[i] = None
+            new.names[i] = new.labels[i] = new.entries[i] = None
+            new.prices[i] = new.brand_ids[i] = new.variant_ids[i] = 0
+            new.item_tokens[i] = frozenset()
+            new.first_name[i] = ""
+
+        for i, key in changed.items():
+            meta = catalog[key]
+            old = self.entries[i] if i < len(self.entries) else None
+            e = item_facets(meta, self.size_groups, self.normalize)
+            if old is not None:
+                _move(old, i, 0)
+            _move(e, i, 1)
+
+            new.keys[i] = key
+            new.id_of[key] = i
+            new.entries[i] = e
+            new.names[i] = meta.get("nama")
+            new.prices[i] = int(meta.get("harga") or 0)
+            new.labels[i] = option_label(meta)
+            new.brand_ids[i] = _intern(brand_table, new.brand_names, e.brand)
+            new.variant_ids[i] = _intern(variant_table, new.variant_names, e.varian)
+            new.item_tokens[i] = e.tokens
+            new.first_name[i] = e.first_name
+
+        touched = {}
+        for (facet, value), (out_ids, in_ids) in delta.items():
+            gone, came = out_ids - in_ids, in_ids - out_ids
+            if not gone and not came:
+                continue
+            if facet not in touched:
+                touched[facet] = dict(getattr(self, facet))
+            d = touched[facet]
+            ids = (set(d.get(value, ())) - gone) | came
+            if facet == "flags":
+                d[value] = frozenset(ids)
+            elif ids or facet == "by_size_group":
+                d[value] = tuple(sorted(ids))
+            else:
+                d.pop(value, None)
+
+        for facet in self.FACETS + ("flags",):
+            setattr(new, facet, touched.get(facet, getattr(self, facet)))
+
+        if "by_brand" in touched:
+            new.brands = sorted(new.by_brand)
+            new.brand_id_sets = {
+                b: self.brand_id_sets[b] if self.by_brand.get(b) is ids else frozenset(ids)
+                for b, ids in new.by_brand.items()
+            }
+        else:
+            new.brands = self.brands
+            new.brand_id_sets = self.brand_id_sets
+        new._brands_having = {}
+        return new
+
+    # ------------------------------------------------------------
+    # ID ↔ KEY
+    # ------------------------------------------------------------
+    def ids_of(self, keys):
+        """keys → set ID (key yang tidak ada di katalog dibuang)."""
+        id_of = self.id_of
+        return {id_of[k] for k in keys if k in id_of}
+
+    def keys_of(self, ids):
+        """ID (urut) → list key."""
+        keys = self.keys
+        return [keys[i] for i in ids]
+
+    def brand_of(self, key):
+        i = self.id_of.get(key)
+        return self.brand_names[self.brand_ids[i]] if i is not None else ""
+
+    # ------------------------------------------------------------
+    # HELPER (ID)
+    # ------------------------------------------------------------
+    def select_ids(self, ids, include=(), exclude=()):
+        """ids ∩ semua flag `include` − flag `exclude` (set ID)."""
+        s = set(ids)
+        for f in include:
+            s &= self.flags[f]
+        for f in exclude:
+            s -= self.flags[f]
+        return s
+
+    def ids_by_brand(self, brand):
+        return self.by_brand.get((brand or "").strip().lower(), ())
+
+    # ------------------------------------------------------------
+    # HELPER (key)
+    # ------------------------------------------------------------
+    def ordered(self, keys):
+        """Urutkan keys (set/list) sesuai urutan katalog, buang yang tidak ada."""
+        return self.keys_of(sorted(self.ids_of(keys)))
+
+    def select(self, keys, include=(), exclude=()):
+        """keys ∩ semua flag `include` − flag `exclude` (urut katalog)."""
+        return self.keys_of(sorted(self.select_ids(self.ids_of(keys), include, exclude)))
+
+    def keys_by_brand(self, brand, include=(), exclude=()):
+        ids = self.ids_by_brand(brand)
+        if include or exclude:
+            ids = sorted(self.select_ids(ids, include, exclude))
+        return self.keys_of(ids)
+
+    def keys_by_kategori(self, kategori):
+        return self.keys_of(self.by_kategori.get((kategori or "").strip().lower(), ()))
+
+    def keys_by_varian(self, varian, kategori=None):
+        ids = self.by_varian.get((varian or "").strip().lower(), ())
+        if kategori:
+            kat_ids = set(self.by_kategori.get((kategori or "").strip().lower(), ()))
+            ids = [i for i in ids if i in kat_ids]
+        return self.keys_of(ids)
+
+    def keys_by_token(self, token):
+        return self.keys_of(self.token_index.get(token, ()))
+
+    def keys_by_size_group(self, group):
+        return self.keys_of(self.by_size_group.get(group, ()))
+
+    def keys_by_size_pattern(self, group, pattern):
+        return self.keys_of(self.by_size_pattern.get((group, pattern), ()))
+
+    def option_label(self, key):
+        """Label opsi UI untuk key katalog (dibangun sekali per item)."""
+        i = self.id_of.get(key)
+        return self.labels[i] if i is not None else None
+
+    def token_score(self, key, token_set):
+        """Jumlah token user yang ada di nama/aliases + bonus 2 kalau cocok token pertama nama."""
+        i = self.id_of.get(key)
+        if i is None:
+            return 0
+        score = len(self.item_tokens[i] & token_set)
+        if self.first_name[i] in token_set:
+            score += 2
+        return score
+
+    def brands_of(self, keys):
+        """Brand unik (sorted) dari daftar keys."""
+        names, bids = self.brand_names, self.brand_ids
+        return sorted({names[bids[i]] for i in self.ids_of(keys) if bids[i]})
+
+    def brands_having(self, include=(), exclude=()):
+        """Brand yang punya minimal 1 produk dengan flag tsb (memo per index)."""
+        memo_key = (tuple(include), tuple(exclude))
+        if memo_key not in self._brands_having:
+            pool = self.select_ids(range(len(self.keys)), include, exclude)
+            self._brands_having[memo_key] = [
+                b for b in self.brands if not self.brand_id_sets[b].isdisjoint(pool)
+            ]
+        return list(self._brands_having[memo_key])
@@ -0,0 +1,123 @@
+# modules/fuzzy_index.py
+
+"""
+Index fuzzy (salah eja / salah dengar STT) untuk token katalog.
+
+Dibangun SEKALI per snapshot katalog dari kosakata brand + token nama/aliases,
+lalu dipakai parser HANYA kalau pencocokan exact tidak menemukan apa-apa:
+    "akua"   → "aqua"
+    "clep"   → "cleo"
+    "minerl" → "minerale"
+
+Cara kerja:
+  - trigram karakter (pad "^^" + kata + "$$") → daftar term (inverted index)
+  - q-gram filter: kata dengan jarak edit ≤ k pasti berbagi minimal
+    |trigram query| − 3k trigram → hanya term itu yang dicek
+  - verifikasi Levenshtein terbatas (berhenti begitu jarak > k)
+
+Biaya lookup ~ panjang posting list trigram query (bukan ukuran katalog).
+Hasil lookup di-memo (kesalahan STT cenderung berulang).
+"""
+
+PAD_LEFT = "^^"
+PAD_RIGHT = "$$"
+MEMO_MAX = 4096
+
+
+def trigrams(word):
+    s = f"{PAD_LEFT}{word}{PAD_RIGHT}"
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def max_distance(word):
+    """Toleransi jarak edit per panjang kata (kata pendek terlalu mudah salah cocok)."""
+    n = len(word)
+    if n < 4:
+        return 0
+    if n < 7:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a, b, k):
+    """Jarak edit a↔b, atau k+1 kalau pasti > k (berhenti lebih awal)."""
+    if abs(len(a) - len(b)) > k:
+        return k + 1
+    if a == b:
+        return 0
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j, cb in enumerate(b, start=1):
+            cost = 0 if ca == cb else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > k:
+            return k + 1
+        prev = cur
+    return prev[-1] if prev[-1] <= k else k + 1
+
+
+class FuzzyIndex:
+    def __init__(self, terms, preferred=()):
+        """
+        terms     : iterable kata (sudah dinormalisasi), urutan = prioritas saat seri
+        preferred : kata yang didahulukan saat jarak sama (mis. nama brand)
+        """
+        self.terms = list(dict.fromkeys(t for t in terms if t))
+        self.vocab = frozenset(self.terms)
+        self.preferred = frozenset(preferred)
+
+        grams = {}
+        for tid, term in enumerate(self.terms):
+            for g in trigrams(term):
+                grams.setdefault(g, []).append(tid)
+        self.grams = {g: tuple(ids) for g, ids in grams.items()}
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.terms)
+
+    def lookup(self, word, k=None):
+        """Term terdekat (jarak ≤ k) atau None. Kata yang sudah ada di kosakata → dirinya."""
+        if word in self.vocab:
+            return word
+        if k is None:
+            k = max_distance(word)
+        if k <= 0:
+            return None
+
+        memo_key = (word, k)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        q = trigrams(word)
+        need = len(q) - 3 * k
+        counts = {}
+        for g in q:
+            for tid in self.grams.get(g, ()):
+                counts[tid] = counts.get(tid, 0) + 1
+
+        terms, preferred = self.terms, self.preferred
+        best, best_rank = None, None
+        n = len(word)
+        for tid, c in counts.items():
+            if c < need:
+                continue
+            term = terms[tid]
+            if abs(len(term) - n) > k:
+                continue
+            d = bounded_levenshtein(word, term, k)
+            if d > k:
+                continue
+            rank = (d, term not in preferred, tid)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = term, rank
+
+        if len(self._memo) >= MEMO_MAX:
+            self._memo.clear()
+        self._memo[memo_key] = best
+        return best
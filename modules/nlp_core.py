@@ -4,11 +4,44 @@ import re
 import csv
 import os
 import io
+import json
+import hashlib
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from modules.alias_matcher import AliasMatcher
+from modules.fuzzy_index import FuzzyIndex
+from modules.phrase_table import PhraseTable
+from modules.phonetic_index import PhoneticIndex
+from modules.nlp_lexer import ChunkLexer, variant_table_from_catalog, resolve_qty, SCALE_WORDS, CONTAINER_WORDS
+from modules.catalog_index import CatalogIndex, CatalogItem, compact_catalog
+from modules.parse_cache import ParseCache, freeze
+from modules.parse_budget import ParseBudget
+from modules.parse_result import ParseResult
+from modules.rule_table import Rule, RuleTable
+from modules.parse_profiler import ParseProfiler, lazy_feature
+from modules.catalog_artifact import (
+    artifact_path_for,
+    load_fresh_artifact,
+    source_info,
+    write_artifact,
+)
+from collections.abc import Mapping
+
+log = logging.getLogger(__name__)
 
 # ================================================================
 #                  GLOBAL CATALOG (untuk versi web)
 # ================================================================
-GLOBAL_CATALOG = {}
+# Katalog, index, lexer & frasa TIDAK lagi disimpan di global yang bisa
+# di-rebind. Semuanya ada di ENGINE.snapshot (lihat bagian NLP ENGINE);
+# GLOBAL_CATALOG / ALIAS_INDEX / VOICE_PHRASES dst. tetap bisa dibaca
+# lewat module __getattr__ (read-only).
+
+# cache hasil parse (LRU, dibagi semua session dalam 1 proses)
+PARSE_CACHE = ParseCache(maxsize=2048)
 
 # ================================================================
 #                        KONSTANTA UMUM
@@ -119,15 +152,18 @@ ALIAS_VARIANT_WORDS |= {
 
 ALIAS_VARIANT_WORDS |= PACKAGING_WORDS
 
-# Alias index global
-ALIAS_INDEX = {}
+# kata fungsi / angka (+ skala belas/puluh/ratus/ribu) / satuan / wadah:
+# TIDAK pernah dikoreksi fuzzy, dan juga TIDAK pernah jadi target koreksi
+# ("belas" tidak boleh jadi "gelas", "langsung" tidak boleh jadi "tanggung")
+FUZZY_SKIP_WORDS = frozenset(
+    STOPWORDS | set(NUM_WORDS) | set(SCALE_WORDS) | ALIAS_VARIANT_WORDS | GENERIC_VARIANT_WORDS | CONTAINER_WORDS
+    | {"dan", "lalu", "terus", "yang", "air", "mineral", "isi", "ulang", "pcs", "buah"}
+)
 
-CATALOG_VARIANT_NUMBERS = set()
 # ================================================================
 #                        VOICE PHRASE LOADER
 # ================================================================
 
-VOICE_PHRASES = {}
 CURRENT_LANG = "id"
 FALLBACK_LANG = "id"
 
@@ -172,20 +208,28 @@ def load_voice_phrases(path):
     return phrases
 
 
-def init_voice_phrases_or_exit(path="voice_phrases.csv"):
-    global VOICE_PHRASES
-    VOICE_PHRASES = load_voice_phrases(path)
-    return VOICE_PHRASES
+def init_voice_phrases_or_exit(path="voice_phrases.csv", force=False):
+    """
+    Muat voice_phrases.csv ke snapshot ENGINE (read-only, 1x per proses).
+    Tidak dibaca ulang selama file tidak berubah (mtime + size), kecuali force=True.
+    """
+    return ENGINE.load_phrases(path, force=force)
+
+# key yang dipanggil UI → argumen yang dikirim ke say_phrase.
+# Dicek saat voice_phrases dimuat (PhraseTable.check): key hilang /
+# placeholder tanpa argumen langsung ketahuan, bukan saat checkout.
+PHRASE_CALL_SITES = {
+    "welcome_user": {"nama"},
+    "item_added": {"name", "qty"},
+    "order_summary": set(),
+    "payment_received": set(),
+    "clear_cart": set(),
+}
+
 
 def _lookup_phrase(key, lang):
-    if (key, lang) in VOICE_PHRASES:
-        return VOICE_PHRASES[(key, lang)], lang
-    if (key, FALLBACK_LANG) in VOICE_PHRASES:
-        return VOICE_PHRASES[(key, FALLBACK_LANG)], FALLBACK_LANG
-    for (k, l), text in VOICE_PHRASES.items():
-        if k == key:
-            return text, l
-    return None, None
+    tpl, resolved = ENGINE.snapshot.phrases.resolve(key, lang)
+    return (tpl.text, resolved) if tpl is not None else (None, None)
 
 
 def say_phrase(key, mode="text", lang=None, **kwargs):
@@ -195,49 +239,88 @@ def say_phrase(key, mode="text", lang=None, **kwargs):
     """
     use_lang = (lang or CURRENT_LANG).lower()
 
-    txt, resolved = _lookup_phrase(key, use_lang)
-    if txt is None:
-        return None
-
-    try:
-        txt_fmt = txt.format(**kwargs) if kwargs else txt
-    except Exception:
-        txt_fmt = txt
-
-    return txt_fmt
+    # template sudah dikompilasi saat load → lookup dict + join
+    return ENGINE.snapshot.phrases.render(key, use_lang, kwargs)
 
 
 # ================================================================
 #                  LOADER KATALOG CSV + ALIAS INDEX
 # ================================================================
 
-def build_alias_index(catalog):
-    global ALIAS_INDEX
-    ALIAS_INDEX = {}
+def build_alias_index(catalog, normalized=None):
+    """
+    alias ternormalisasi → [catalog_key, ...] (tidak mengubah state global).
+    `normalized` (opsional, dari normalize_catalog_text / artifact) → tanpa normalize ulang.
+    """
+    alias_index = {}
 
     for key, meta in catalog.items():
-        for alias in meta.get("aliases", []):
-            alias_norm = normalize(alias)
+        if normalized is not None:
+            alias_norms = normalized[key][1]
+        else:
+            alias_norms = [normalize(a) for a in meta.get("aliases", [])]
+        for alias_norm in alias_norms:
             if alias_norm:
-                ALIAS_INDEX.setdefault(alias_norm, []).append(key)
+                keys = alias_index.setdefault(alias_norm, [])
+                if key not in keys:
+                    keys.append(key)
 
-    return ALIAS_INDEX
+    return alias_index
 
 
-def load_catalog_from_csv(path):
+def build_alias_matcher(alias_index):
+    # compile sekali: semua alias → 1 automaton (scan linear per chunk)
+    return AliasMatcher(alias_index, is_strong=alias_has_variant_info)
+
+
+def _correction_vocab(index):
     """
-    Memuat katalog dari catalog_depo78_clean.csv dengan format khusus:
+    Target koreksi = token brand + token nama/aliases (tanpa angka) → (terms, brand_tokens).
+    Kata wadah/ukuran (galon, cup, gelas, botol, tanggung, besar, ...) bukan target:
+    hasil koreksi dipakai sebagai sinyal brand.
+    """
+    brand_tokens = [t for b in index.brands for t in b.split() if t not in FUZZY_SKIP_WORDS]
+    terms = brand_tokens + [
+        t for t in index.token_index
+        if len(t) >= 3 and t not in FUZZY_SKIP_WORDS and not any(ch.isdigit() for ch in t)
+    ]
+    return terms, brand_tokens
 
-    - Header normal:
-        kategori,varian,nama,harga,aliases,satuan,isi,brand
-    - Setiap baris data DIBUNGKUS tanda kutip besar, misalnya:
-        "galon,19l,Galon Aqua 19L,22000,""aqua galon 19l|galon aqua 19l|..."",galon,,aqua"
 
-    Karena itu, kita perlu parsing 2x:
-        1) csv.reader untuk melepas kutip luar → dapat 1 string
-        2) csv.reader lagi untuk memecah menjadi 8 kolom sesuai header
+def build_fuzzy_index(index):
+    """Kosakata katalog → FuzzyIndex (token brand didahulukan kalau jarak edit seri)."""
+    terms, brand_tokens = _correction_vocab(index)
+    return FuzzyIndex(terms, preferred=brand_tokens)
+
+
+def build_phonetic_index(index):
+    """Kosakata katalog → PhoneticIndex (kunci fonetik → term, brand didahulukan)."""
+    terms, brand_tokens = _correction_vocab(index)
+    return PhoneticIndex(terms, preferred=brand_tokens)
+
+
+def correct_unknown_tokens(tokens, fuzzy=None, phonetic=None):
     """
+    Token yang tidak dikenal katalog → term katalog terdekat:
+      1) kunci fonetik (hash, O(1))  : "brait" → "bright", "kleo" → "cleo"
+      2) trigram + jarak edit        : "aqwa" → "aqua"
+    Kata fungsi/angka/satuan (FUZZY_SKIP_WORDS) & token yang sudah dikenal dibiarkan.
+    """
+    vocab = fuzzy.vocab if fuzzy is not None else (phonetic.vocab if phonetic is not None else ())
+    out = []
+    for t in tokens:
+        if t in vocab or t in FUZZY_SKIP_WORDS or any(ch.isdigit() for ch in t):
+            out.append(t)
+            continue
+        fixed = phonetic.lookup(t) if phonetic is not None else None
+        if fixed is None and fuzzy is not None:
+            fixed = fuzzy.lookup(t)
+        out.append(fixed or t)
+    return out
 
+
+def resolve_catalog_path(path):
+    """Path relatif dihitung dari root project (satu folder di atas /modules)."""
     # Lokasi file ini (modules/nlp_core.py)
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -246,15 +329,18 @@ def load_catalog_from_csv(path):
 
     # Bangun path absolut final
     if os.path.isabs(path):
-        abs_path = path
-    else:
-        abs_path = os.path.join(root_dir, path)
+        return path
+    return os.path.join(root_dir, path)
 
-    if not os.path.exists(abs_path):
-        raise FileNotFoundError(f"[ERROR] Katalog tidak ditemukan pada path: {abs_path}")
 
-    catalog = {}
+CATALOG_REQUIRED_COLUMNS = ("kategori", "varian", "nama", "harga", "aliases", "brand")
+
 
+def _iter_catalog_rows(abs_path):
+    """
+    Baca CSV katalog baris per baris (format kutip ganda, lihat load_catalog_from_csv).
+    Yield (no_baris, headers, cols) — cols TIDAK di-pad.
+    """
     with open(abs_path, encoding="utf-8") as f:
         # --- Baca header dan buang BOM ---
         header_line = f.readline().strip()
@@ -262,7 +348,7 @@ def load_catalog_from_csv(path):
         headers = [h.strip() for h in header_line.split(",")]
         # headers = ['kategori','varian','nama','harga','aliases','satuan','isi','brand']
 
-        for raw_line in f:
+        for lineno, raw_line in enumerate(f, start=2):
             raw_line = raw_line.strip()
             if not raw_line:
                 continue
@@ -276,138 +362,194 @@ def load_catalog_from_csv(path):
             # 2) Pecah lagi string itu menjadi field-field sebenarnya
             cols = next(csv.reader([inner_line]))
 
-            # Kalau jumlah kolom kurang dari header, pad dengan string kosong
-            if len(cols) < len(headers):
-                cols += [""] * (len(headers) - len(cols))
+            yield lineno, headers, cols
 
-            row = dict(zip(headers, cols))
 
-            # Gunakan 'nama' sebagai key (di file ini tidak ada kolom 'key')
-            key = row.get("key") or row.get("id") or row.get("nama")
-            if not key:
-                continue
+def _catalog_row(headers, cols):
+    """Kolom mentah → (key, meta) ternormalisasi, atau (None, None) kalau tanpa key."""
+    # Kalau jumlah kolom kurang dari header, pad dengan string kosong
+    if len(cols) < len(headers):
+        cols = cols + [""] * (len(headers) - len(cols))
 
-            # Aliases dipisah dengan '|'
-            aliases = []
-            if "aliases" in row and row["aliases"]:
-                aliases = [a.strip() for a in row["aliases"].split("|")]
-
-            # Harga → int aman
-            harga_str = row.get("harga") or "0"
-            try:
-                harga = int(harga_str)
-            except ValueError:
-                harga = 0
-
-            catalog[key] = {
-                "kategori": (row.get("kategori") or "").strip().lower(),
-                "varian": (row.get("varian") or "").strip().lower(),
-                "nama": (row.get("nama") or "").strip(),
-                "harga": harga,
-                "brand": (row.get("brand") or "").strip().lower(),
-                "aliases": aliases,
-            }
+    row = dict(zip(headers, cols))
+
+    # Gunakan 'nama' sebagai key (di file ini tidak ada kolom 'key')
+    key = row.get("key") or row.get("id") or row.get("nama")
+    if not key:
+        return None, None
+
+    # Aliases dipisah dengan '|'
+    aliases = []
+    if "aliases" in row and row["aliases"]:
+        aliases = [a.strip() for a in row["aliases"].split("|")]
+
+    # Harga → int aman
+    harga_str = row.get("harga") or "0"
+    try:
+        harga = int(harga_str)
+    except ValueError:
+        harga = 0
+
+    return key, {
+        "kategori": (row.get("kategori") or "").strip().lower(),
+        "varian": (row.get("varian") or "").strip().lower(),
+        "nama": (row.get("nama") or "").strip(),
+        "harga": harga,
+        "brand": (row.get("brand") or "").strip().lower(),
+        "aliases": aliases,
+    }
+
+
+def load_catalog_from_csv(path):
+    """
+    Memuat katalog dari catalog_depo78_clean.csv dengan format khusus:
+
+    - Header normal:
+        kategori,varian,nama,harga,aliases,satuan,isi,brand
+    - Setiap baris data DIBUNGKUS tanda kutip besar, misalnya:
+        "galon,19l,Galon Aqua 19L,22000,""aqua galon 19l|galon aqua 19l|..."",galon,,aqua"
+
+    Karena itu, kita perlu parsing 2x:
+        1) csv.reader untuk melepas kutip luar → dapat 1 string
+        2) csv.reader lagi untuk memecah menjadi 8 kolom sesuai header
+
+    Untuk startup cepat pakai artifact hasil compile_catalog(); fungsi ini
+    tetap jadi fallback kalau artifact tidak ada / basi.
+    """
+
+    abs_path = resolve_catalog_path(path)
+
+    if not os.path.exists(abs_path):
+        raise FileNotFoundError(f"[ERROR] Katalog tidak ditemukan pada path: {abs_path}")
+
+    catalog = {}
+
+    for _, headers, cols in _iter_catalog_rows(abs_path):
+        key, meta = _catalog_row(headers, cols)
+        if key:
+            catalog[key] = meta
 
     return catalog
 
-# ================================================================
-#                  NLP CORE — DETEKSI VARIAN, BRAND, ALIAS
-# ================================================================
 
-def detect_variant(tokens):
-    joined = " ".join(tokens).replace(",", " ")
-
-    # --- KG (3kg, 12kg, 3 kilo, dll)
-    m = re.search(r"(\d+(?:\.\d+)?)\s*(kg|kilo|kilogram)\b", joined)
-    if m:
-        raw = m.group(1)
-        if raw.endswith(".0"):
-            raw = raw[:-2]
-        return f"{raw}kg"
-
-    # --- Liter (1.5l, 1l, 19l)
-    m = re.search(r"(\d+(?:\.\d+)?)\s*(l|liter|ltr)\b", joined)
-    if m:
-        raw = m.group(1).replace(",", ".")
-        return f"{raw}l"
-
-    # --- ML (330ml, 600ml)
-    m = re.search(r"(\d+)\s*(ml|mililiter)\b", joined)
-    if m:
-        return f"{m.group(1)}ml"
-
-    # --- Galon (varian khusus air)
-    if re.search(r"\b(galon|19l|19|isi ulang)\b", joined):
-        return "19l"
-
-    # --- 1.5 liter varian
-    if re.search(r"\b(1,5ml|1.5ml|1/5ml|1,5|1.5|1/5)\b", joined):
-        return "1.5ml"
-
-    # --- 600ml
-    if re.search(r"\b(600ml|600)\b", joined):
-        return "600ml"
-
-    # --- 500ml
-    if re.search(r"\b(500ml|500)\b", joined):
-        return "500ml"
-
-    # --- 400ml
-    if re.search(r"\b(400ml|400)\b", joined):
-        return "400ml"
-
-    # --- 330ml
-    if re.search(r"\b(330ml|330)\b", joined):
-        return "330ml"
-
-    # --- 240ml
-    if re.search(r"\b(240ml|240)\b", joined):
-        return "240ml"
+def validate_catalog_csv(path):
+    """
+    Cek CSV katalog sebelum di-compile.
+    Return (errors, warnings): list pesan "baris N: ...".
+    - errors   : kolom wajib hilang, baris tanpa nama, harga bukan angka
+    - warnings : key dobel (baris terakhir menang), kolom berlebih, alias kosong
+    """
+    abs_path = resolve_catalog_path(path)
+    if not os.path.exists(abs_path):
+        raise FileNotFoundError(f"[ERROR] Katalog tidak ditemukan pada path: {abs_path}")
 
-    return None
+    errors, warnings = [], []
+    seen = {}
+    header_checked = False
+
+    for lineno, headers, cols in _iter_catalog_rows(abs_path):
+        if not header_checked:
+            missing = [c for c in CATALOG_REQUIRED_COLUMNS if c not in headers]
+            if missing:
+                errors.append(f"header: kolom wajib tidak ada {missing}")
+                break
+            header_checked = True
+
+        if len(cols) > len(headers):
+            warnings.append(f"baris {lineno}: {len(cols)} kolom, header hanya {len(headers)}")
+
+        row = dict(zip(headers, cols))
+        key, meta = _catalog_row(headers, cols)
+        if not key:
+            errors.append(f"baris {lineno}: kolom nama kosong")
+            continue
 
+        harga = (row.get("harga") or "").strip()
+        if harga and not harga.isdigit():
+            errors.append(f"baris {lineno}: harga bukan angka ({harga!r})")
 
-def detect_size_group(tokens):
-    for group, cfg in SIZE_GROUP.items():
-        if any(w in tokens for w in cfg["words"]):
-            return group
-    return None
+        if key in seen:
+            warnings.append(f"baris {lineno}: key {key!r} dobel (baris {seen[key]})")
+        seen[key] = lineno
 
+        if any(not a for a in meta["aliases"]):
+            warnings.append(f"baris {lineno}: ada alias kosong di {key!r}")
 
-def guess_variant_from_fragment(tokens):
-    s = " ".join(tokens)
+    if not header_checked and not errors:
+        errors.append("katalog kosong (tidak ada baris data)")
+    return errors, warnings
 
-    if re.search(r"\b(gal|galon|19)\b", s):
-        return "19l"
 
-    if re.search(r"\b(bot|botol|1\.5|1,5|1/5)\b", s):
-        return "1.5ml"
+def normalize_catalog_text(catalog):
+    """key → (nama_norm, (alias_norm, ...)) — dipakai alias index & CatalogIndex."""
+    return {
+        key: (
+            normalize(meta.get("nama") or ""),
+            tuple(normalize(a) for a in meta.get("aliases", [])),
+        )
+        for key, meta in catalog.items()
+    }
 
-    if re.search(r"\b(bot|botol|600)\b", s):
-        return "600ml"
 
-    if re.search(r"\b(bot|botol|500)\b", s):
-        return "500ml"
+def compile_catalog(csv_path, out_path=None, strict=False):
+    """
+    Validasi + normalisasi CSV katalog, precompute tabel register_catalog,
+    lalu tulis artifact biner (lihat modules/catalog_artifact.py).
 
-    if re.search(r"\b(bot|botol|400)\b", s):
-        return "400ml"
+    Return (out_path, warnings). Error validasi → ValueError
+    (strict=True: warning juga dianggap error).
+    """
+    abs_path = resolve_catalog_path(csv_path)
+    errors, warnings = validate_catalog_csv(abs_path)
+    if strict:
+        errors, warnings = errors + warnings, []
+    if errors:
+        raise ValueError(
+            "[ERROR] Katalog tidak valid:\n" + "\n".join(f"  - {e}" for e in errors)
+        )
 
-    if re.search(r"\b(bot|botol|330)\b", s):
-        return "330ml"
+    catalog = load_catalog_from_csv(abs_path)
+    normalized = normalize_catalog_text(catalog)
 
-    if re.search(r"\b(cup|gelas|240)\b", s):
-        return "240ml"
+    payload = {
+        "source": source_info(abs_path),
+        "catalog": catalog,
+        "alias_index": build_alias_index(catalog, normalized),
+        "variant_numbers": sorted(build_variant_numbers_from_catalog(catalog)),
+        "variant_table": variant_table_from_catalog(catalog, defaults=VARIANT_TO_SIZE_GROUP),
+        "normalized": normalized,
+    }
 
-    return None
+    out_path = out_path or artifact_path_for(abs_path)
+    write_artifact(out_path, payload)
+    return out_path, warnings
+
+# ================================================================
+#                  NLP CORE — DETEKSI VARIAN, BRAND, ALIAS
+# ================================================================
+
+def scan_chunk(tokens, lexer=None):
+    """
+    1x scan lexer untuk chunk → fitur varian, size group, kategori, qty.
+    (lihat ChunkLexer.scan)
+    """
+    return (lexer or ENGINE.snapshot.lexer).scan(tokens)
+
+
+def detect_variant(tokens):
+    return scan_chunk(tokens)["detected_variant"]
+
+
+def detect_size_group(tokens):
+    return scan_chunk(tokens)["size_group"]
+
+
+def guess_variant_from_fragment(tokens):
+    return scan_chunk(tokens)["variant"]
 
 
 def guess_category(tokens):
-    s = " ".join(tokens)
-    if re.search(r"\b(gas|elpiji|lpg|bright|tabung|kg)\b", s):
-        return "gas"
-    if re.search(r"\b(air|galon|aqua|minerale|mineral|le|mineral|botol|dus|cup|gelas)\b", s):
-        return "air"
-    return None
+    return scan_chunk(tokens)["category"]
 
 
 def extract_brand_tokens(tokens):
@@ -440,39 +582,62 @@ def extract_brand_tokens(tokens):
     return out
 
 
-def find_brand_candidates(tokens, catalog):
+def find_brand_candidates(tokens, catalog, index=None, fuzzy=None, phonetic=None):
     toks_norm = [normalize(t) for t in tokens]
-    brand_tokens = extract_brand_tokens(toks_norm)
-    if not brand_tokens:
-        return []
+    if index is None:
+        index = get_catalog_index(catalog)
+        snap = ENGINE.snapshot
+        if snap.index is index and fuzzy is None and phonetic is None:
+            fuzzy, phonetic = snap.fuzzy, snap.phonetic
+    return brand_candidates_normalized(toks_norm, index, fuzzy, phonetic)
 
+
+def _brand_ids_exact(brand_tokens, idx):
     candidates = []
     seen = set()
 
     # 1) cocok dengan brand exact
     for bt in brand_tokens:
-        for k, meta in catalog.items():
-            b = (meta.get("brand") or "").strip().lower()
-            if b == bt and k not in seen:
-                seen.add(k)
-                candidates.append(k)
-
-    if candidates:
-        return candidates
+        for i in idx.by_brand.get(bt, ()):
+            if i not in seen:
+                seen.add(i)
+                candidates.append(i)
 
-    # 2) cari pada nama + aliases
-    for bt in brand_tokens:
-        patt = re.compile(r"\b" + re.escape(bt) + r"\b")
-        for k, meta in catalog.items():
-            hay = " ".join([normalize(meta.get("nama", ""))] +
-                           [normalize(a) for a in meta.get("aliases", [])])
-            if patt.search(hay) and k not in seen:
-                seen.add(k)
-                candidates.append(k)
+    if not candidates:
+        # 2) cari pada nama + aliases (inverted index token)
+        for bt in brand_tokens:
+            for i in idx.token_index.get(bt, ()):
+                if i not in seen:
+                    seen.add(i)
+                    candidates.append(i)
 
     return candidates
 
 
+def _brand_lookup(toks_norm, idx, fuzzy=None, phonetic=None):
+    """(keys, corrected): corrected=True kalau brand hanya ketemu lewat koreksi fuzzy/fonetik."""
+    brand_tokens = extract_brand_tokens(toks_norm)
+    if not brand_tokens:
+        return [], False
+
+    candidates = _brand_ids_exact(brand_tokens, idx)
+    corrected = False
+
+    if not candidates and (fuzzy is not None or phonetic is not None):
+        # 3) salah eja / salah dengar STT ("akua" → "aqua"): koreksi token, ulangi 1) & 2)
+        fixed = correct_unknown_tokens(brand_tokens, fuzzy, phonetic)
+        if fixed != brand_tokens:
+            candidates = _brand_ids_exact(fixed, idx)
+            corrected = bool(candidates)
+
+    return idx.keys_of(candidates), corrected
+
+
+def brand_candidates_normalized(toks_norm, idx, fuzzy=None, phonetic=None):
+    """find_brand_candidates untuk token yang SUDAH dinormalisasi."""
+    return _brand_lookup(toks_norm, idx, fuzzy, phonetic)[0]
+
+
 def alias_has_variant_info(alias_str):
     s = normalize(alias_str)
     if not s:
@@ -488,17 +653,17 @@ def alias_has_variant_info(alias_str):
     return False
 
 
-def find_alias_candidates_from_text(text_norm):
-    strong, weak = set(), set()
+def match_aliases(text_norm, matcher=None):
+    """
+    Satu kali scan alias untuk chunk (lihat AliasMatcher.match).
+    Return dict: strong, weak, exact, partial.
+    """
+    return (matcher or ENGINE.snapshot.matcher).match(text_norm)
 
-    for alias_norm, keys in ALIAS_INDEX.items():
-        if alias_norm in text_norm:
-            if alias_has_variant_info(alias_norm):
-                strong.update(keys)
-            else:
-                weak.update(keys)
 
-    return list(strong), list(weak)
+def find_alias_candidates_from_text(text_norm):
+    hits = match_aliases(text_norm)
+    return hits["strong"], hits["weak"]
 
 
 def find_direct_alias_hits(text_norm):
@@ -506,55 +671,16 @@ def find_direct_alias_hits(text_norm):
     if not text_norm:
         return []
 
-    exact = set()
-    partial = set()
-
-    for alias_norm, keys in ALIAS_INDEX.items():
-        if text_norm == alias_norm:
-            exact.update(keys)
-
-    if exact:
-        return list(exact)
-
-    for alias_norm, keys in ALIAS_INDEX.items():
-        if alias_norm in text_norm or text_norm in alias_norm:
-            partial.update(keys)
-
-    return list(partial)
+    hits = match_aliases(text_norm)
+    return hits["exact"] or hits["partial"]
 
 
 def expand_quantity(tokens):
-    UNIT_VARIAN = {"kg", "kilo", "kilogram", "l", "liter", "ltr", "ml", "mililiter"}
-    QTY_UNITS = {"tabung", "galon", "botol", "dus", "karton",
-                 "pack", "buah", "pcs", "pcs.", "cup", "gelas"}
-
-    s = " ".join(tokens)
-
-    # explicit "3 botol"
-    m = re.search(r"\b(\d+)\s*(" + "|".join(QTY_UNITS) + r")\b", s)
-    if m:
-        try:
-            return max(1, int(m.group(1)))
-        except Exception:
-            pass
-
-    # strip variant-number combos
-    s_wo = re.sub(r"\b\d+(?:\.\d+)?\s*(kg|kilo|kilogram|l|liter|ltr|ml|mililiter)\b", " ", s)
-    s_wo = re.sub(r"\s+", " ", s_wo).strip()
-    toks = s_wo.split()
-
-    for i, t in enumerate(toks):
-        if t.isdigit():
-            n = int(t)
-            nxt = toks[i + 1] if i + 1 < len(toks) else ""
-            if nxt in UNIT_VARIAN:
-                continue
-            return n
-
-    m2 = re.search(r"\b(\d+)\b", s_wo)
-    if m2:
-        return max(1, int(m2.group(1)))
-
+    feats = scan_chunk(tokens)
+    if feats["unit_qty"] is not None:
+        return max(1, feats["unit_qty"])
+    if feats["first_int"] is not None:
+        return feats["first_int"]
     return 1
 
 def detect_explicit_qty(tokens, variant=None, variant_numbers=None):
@@ -565,62 +691,13 @@ def detect_explicit_qty(tokens, variant=None, variant_numbers=None):
     - Angka varian (600/330/240 dst), dengan atau tanpa 'ml', HARUS dianggap VARIAN, bukan qty.
     - qty hanya diambil jika eksplisit dan bukan varian.
     """
-    UNIT_VARIAN = {"kg", "kilo", "kilogram", "l", "liter", "ltr", "ml", "mililiter"}
-    QTY_UNITS = {"tabung", "galon", "botol", "dus", "karton", "pack", "buah", "pcs", "pcs.", "cup", "gelas"}
-
-    # angka varian dari katalog (prioritas dataset)
-    var_nums = set(variant_numbers or set())
-    # fallback hard safety (kalau belum kebangun)
-    if not var_nums:
-        var_nums |= {"1500", "600", "500", "400", "350", "330", "240", "19", "1.5"}
+    lexer = ENGINE.snapshot.lexer
+    feats = scan_chunk(tokens, lexer)
 
-    s = " ".join(tokens)
+    # angka varian dari katalog (prioritas dataset), fallback ke tabel lexer
+    var_nums = set(variant_numbers or set()) or lexer.variant_numbers
 
-    # 1) pola eksplisit qty dengan satuan qty: "3 botol", "2 dus", dst
-    m = re.search(r"\b(\d+)\s*(" + "|".join(QTY_UNITS) + r")\b", s)
-    if m:
-        n = int(m.group(1))
-        return (max(1, n), True)
-
-    # normalisasi varian yang sudah terdeteksi
-    v = (variant or "").strip().lower()  # contoh: "600ml", "3kg", "1.5ml", "19l"
-
-    # buang pola varian yang pakai unit (600ml, 3kg, 1.5l, dst)
-    s_wo = re.sub(r"\b\d+(?:\.\d+)?\s*(kg|kilo|kilogram|l|liter|ltr|ml|mililiter)\b", " ", s)
-    s_wo = re.sub(r"\s+", " ", s_wo).strip()
-
-    parts = s_wo.split()
-
-    # 2) angka digit: ambil sebagai qty HANYA jika bukan varian
-    for t in parts:
-        # skip decimal untuk qty (qty harus integer)
-        if re.fullmatch(r"\d+\.\d+", t):
-            # kalau decimal ini varian (mis 1.5) -> abaikan (bukan qty)
-            continue
-
-        if t.isdigit():
-            # ✅ jika angka ini termasuk varian dari katalog -> bukan qty
-            if t in var_nums:
-                continue
-
-            # ✅ jika varian sudah terdeteksi dan angka ini bagian dari varian -> bukan qty
-            # contoh v="600ml" dan t="600"
-            if v and (t in v):
-                continue
-
-            return (max(1, int(t)), True)
-
-    # 3) kata angka: "dua", "tiga", dst (ini boleh jadi qty)
-    # tapi jika user bilang "dua liter" itu varian (skip)
-    for i, t in enumerate(tokens):
-        if t in NUM_WORDS:
-            nxt = tokens[i + 1] if i + 1 < len(tokens) else ""
-            if nxt in UNIT_VARIAN:
-                continue
-            return (max(1, int(NUM_WORDS[t])), True)
-
-    # tidak ada qty eksplisit
-    return (None, False)
+    return resolve_qty(feats["unit_qty"], feats["ints"], feats["word_qty"], variant, var_nums)
 
 def select_best_candidate(candidates, variant, category, tokens, catalog):
     if not candidates:
@@ -638,838 +715,831 @@ def select_best_candidate(candidates, variant, category, tokens, catalog):
     if len(exacts) > 1:
         candidates = exacts
 
+    idx = get_catalog_index(catalog)
     token_set = set(tokens)
-    scored = []
-
-    for k in candidates:
-        meta = catalog[k]
-        hay = " ".join([normalize(meta.get("nama", ""))] +
-                       [normalize(a) for a in meta.get("aliases", [])])
-        score = sum(1 for t in token_set if t in hay)
-
-        name_first = normalize(meta.get("nama", "")).split()[0]
-        if name_first in token_set:
-            score += 2
-
-        scored.append((score, k))
+    scored = [(idx.token_score(k, token_set), k) for k in candidates]
 
     scored.sort(key=lambda x: (-x[0], x[1]))
 
     return scored[0][1] if scored and scored[0][0] > 0 else candidates[0]
 
-def find_all_keys_for_varian(category, varian, catalog):
+def get_catalog_index(catalog):
+    """
+    Index untuk catalog ini: pakai index snapshot ENGINE kalau catalog sama
+    dengan yang di-register, kalau tidak bangun index baru (mis. catalog ad-hoc).
+    """
+    snap = ENGINE.snapshot
+    if snap.catalog is catalog:
+        return snap.index
+    return CatalogIndex(catalog or {}, SIZE_GROUP, normalize)
+
+
+def find_all_keys_for_varian(category, varian, catalog, index=None):
     """
     Ambil semua produk dengan varian tertentu.
     Jika pakai kategori tapi tidak ketemu, fallback abaikan kategori.
     """
-    results = []
-    for k, meta in catalog.items():
-        if (meta.get("varian") or "").lower() == (varian or "").lower() and (not category or meta.get("kategori") == category):
-            results.append(k)
+    idx = index if index is not None else get_catalog_index(catalog)
+    results = idx.keys_by_varian(varian, kategori=category)
 
     if not results and category:
-        for k, meta in catalog.items():
-            if (meta.get("varian") or "").lower() == (varian or "").lower():
-                results.append(k)
+        results = idx.keys_by_varian(varian)
     return results
 
 
 def find_products_by_size_group(size_group, catalog):
     patterns = SIZE_GROUP[size_group]["patterns"]
+    idx = get_catalog_index(catalog)
     results = []
-    for k, meta in catalog.items():
-        varian = (meta.get("varian") or "").lower()
+    for k in idx.keys_by_size_group(size_group):
+        varian = (catalog[k].get("varian") or "").lower()
         if any(p in varian for p in patterns):
             results.append(k)
     return results
 
 # ================================================================
-#           NLP CORE — PARSER UTAMA (MULTI-ITEM ORDER)
+#           NLP CORE — ANALISIS CHUNK (FITUR LAZY)
 # ================================================================
 
-def parse_orders_verbose(text, catalog):
+class ChunkAnalysis:
     """
-    Porting LOGIC PRIORITAS CP12 (CLI) ke WEB.
+    Analisis 1 chunk: token dinormalisasi SEKALI (dari teks utterance),
+    fitur mahal dihitung saat pertama dibaca lalu disimpan.
 
-    Output per-chunk:
-    - Jika sudah jelas: chosen_item terisi
-    - Jika ambigu / perlu tanya: chosen_item None + need_action terisi
+    - feats (scan lexer)                  → variant, size_group, category, qty
+    - brand_keys / brands_hit / explicit_brand  (facet brand + token index)
+    - alias_hits / strongs / weaks / direct      (1x scan AliasMatcher)
+    - brand_corrected / alias_corrected          (hit hanya lewat koreksi fuzzy/fonetik)
 
-    need_action.type:
-      - "choose_item"             -> tampilkan list produk untuk dipilih user
-      - "choose_brand_then_item"  -> user pilih brand dulu, lalu pilih produk (dengan filter tertentu)
+    Cabang parser yang sudah memutuskan lebih awal (mis. LOGIC 1 gas)
+    tidak membayar fitur yang tidak dibacanya.
+
+    start_timing() → waktu hitung tiap fitur dicatat (profiler / trace).
+    max_candidates (ParseBudget) → candidates_all / options dipotong,
+    truncated = "candidates".
     """
 
-    def _uniq(seq):
-        return list(dict.fromkeys(seq))
+    timing = False
+    max_candidates = None
+    truncated = None
 
-    def _as_options(keys):
-        opts = []
-        for k in keys:
-            if k not in catalog:
-                continue
-            m = catalog[k]
-            opts.append({
-                "key": k,
-                "label": f"{m.get('nama')} (Rp {m.get('harga',0):,})",
-                "nama": m.get("nama"),
-                "harga": m.get("harga", 0),
-                "brand": (m.get("brand") or "").lower(),
-                "kategori": (m.get("kategori") or "").lower(),
-                "varian": (m.get("varian") or "").lower(),
-            })
-        return opts
-
-    def _keys_by_brand(brand_value):
-        b = (brand_value or "").lower().strip()
-        if not b:
-            return []
-        return [k for k, m in catalog.items() if (m.get("brand") or "").lower().strip() == b]
-
-    def _filter_no_galon(keys):
-        out = []
-        for k in keys:
-            m = catalog.get(k, {})
-            kat = (m.get("kategori") or "").lower()
-            var = (m.get("varian") or "").lower()
-            nama = normalize(m.get("nama") or "")
-            # buang galon/19l
-            if "galon" in kat or var == "19l" or "19l" in var or "galon" in nama:
-                continue
-            out.append(k)
-        return out
-
-    def _filter_botol_only(keys):
-        out = []
-        for k in keys:
-            m = catalog.get(k, {})
-            kat = (m.get("kategori") or "").lower()
-            nama = normalize(m.get("nama") or "")
-            if kat == "botol" or "botol" in nama:
-                out.append(k)
-        return out
-
-    def _filter_botol_or_cup(keys):
-        out = []
-        for k in keys:
-            m = catalog.get(k, {})
-            kat = (m.get("kategori") or "").lower()
-            var = (m.get("varian") or "").lower()
-            nama = normalize(m.get("nama") or "")
-
-            # ✅ kandidat air kemasan (non-galon):
-            # - kategori botol/cup
-            # - atau nama mengandung botol/cup/gelas
-            # - atau varian berisi ukuran ml (mis: 600ml, 1500ml, 330ml) yang umumnya botol/cup
-            is_pack = (
-                kat in {"botol", "cup"}
-                or ("botol" in nama)
-                or ("cup" in nama)
-                or ("gelas" in nama)
-                or ("ml" in var)
-                or ("ml" in nama)
-            )
+    def __init__(self, chunk_tokens, snapshot, catalog, text=""):
+        self.text = text
+        self.chunk_tokens = chunk_tokens
+        self.raw_chunk = " ".join(chunk_tokens)
+        # buang stopword (mirip CP12)
+        self.tokens = [w for w in chunk_tokens if w and w not in STOPWORDS]
+        self.token_set = set(self.tokens)
+        self.s_chunk = " ".join(self.tokens)
+        self.snapshot = snapshot
+        self.index = snapshot.index
+        self.catalog = catalog
+
+    def start_timing(self):
+        self.timing = True
+        self.feature_ns = 0
+        self.feature_depth = 0
+        self.feature_log = []
+
+    # ---------- lexer ----------
+    @lazy_feature
+    def feats(self):
+        # 1x scan: varian, size group, kategori, qty
+        return scan_chunk(self.tokens, self.snapshot.lexer)
+
+    @property
+    def variant(self):
+        return self.feats["variant"]
+
+    @property
+    def category(self):
+        return self.feats["category"]
+
+    @property
+    def qty(self):
+        return self.feats["qty"]
+
+    @property
+    def has_explicit_qty(self):
+        return self.feats["has_explicit_qty"]
+
+    @lazy_feature
+    def size_group(self):
+        # ✅ SAMAKAN LOGIKA: kalau user bilang "air 600/330/240/1.5/19"
+        # dan tidak menyebut kata "tanggung/cup/kecil/galon", kita tetap isi size_group.
+        sg = self.feats["size_group"]
+        if (not sg) and self.variant:
+            # umumnya untuk air kemasan
+            sg = size_group_from_variant(self.variant) or sg
+        return sg
+
+    # ---------- flag token ----------
+    @lazy_feature
+    def has_packaging(self):
+        return any(t in PACKAGING_WORDS for t in self.token_set)
+
+    @property
+    def has_botol(self):
+        return "botol" in self.token_set
+
+    @lazy_feature
+    def has_gas_hint(self):
+        return any(t in {"gas", "elpiji", "lpg", "bright"} for t in self.token_set) or (self.category == "gas")
+
+    @lazy_feature
+    def has_specific(self):
+        # ada angka/varian/gas/galon/botol/cup/packaging
+        has_digit = any(t.isdigit() for t in self.tokens)
+        has_container = any(t in {"galon", "botol", "cup", "gelas"} for t in self.token_set)
+        return bool(self.variant) or has_digit or self.has_packaging or has_container or self.has_gas_hint
+
+    # ---------- brand ----------
+    @lazy_feature
+    def brand_lookup(self):
+        # brand candidates (produk-produk yang match brand token) + asal koreksi
+        snap = self.snapshot
+        keys, corrected = _brand_lookup(self.tokens, self.index, snap.fuzzy, snap.phonetic)
+        return [k for k in keys if k in self.catalog], corrected
+
+    @property
+    def brand_keys(self):
+        return self.brand_lookup[0]
+
+    @property
+    def brand_corrected(self):
+        return self.brand_lookup[1]
+
+    @lazy_feature
+    def brands_hit(self):
+        return self.index.brands_of(self.brand_keys)
+
+    @lazy_feature
+    def explicit_brand(self):
+        hit = self.brands_hit
+        return hit[0] if len(hit) == 1 else None
+
+    # ---------- alias ----------
+    @lazy_feature
+    def alias_scan(self):
+        # alias strong/weak + direct alias (1x scan) + asal koreksi
+        snap = self.snapshot
+        hits = match_aliases(self.s_chunk, snap.matcher)
+        if snap.fuzzy is not None and not (hits["strong"] or hits["weak"] or hits["partial"]):
+            # tidak ada alias yang cocok → coba lagi dengan token hasil koreksi fonetik/fuzzy
+            fixed = correct_unknown_tokens(self.tokens, snap.fuzzy, snap.phonetic)
+            if fixed != self.tokens:
+                return match_aliases(" ".join(fixed), snap.matcher), True
+        return hits, False
+
+    @property
+    def alias_hits(self):
+        return self.alias_scan[0]
+
+    @property
+    def alias_corrected(self):
+        return self.alias_scan[1]
+
+    @lazy_feature
+    def strongs(self):
+        return [k for k in self.alias_hits["strong"] if k in self.catalog]
+
+    @lazy_feature
+    def weaks(self):
+        return [k for k in self.alias_hits["weak"] if k in self.catalog]
+
+    @lazy_feature
+    def direct(self):
+        hits = self.alias_hits["exact"] or self.alias_hits["partial"]
+        return list(dict.fromkeys(k for k in hits if k in self.catalog))
 
-            if is_pack:
-                out.append(k)
-        return out
-
-    def _all_brands():
-        s = set()
-        for m in catalog.values():
-            b = (m.get("brand") or "").strip().lower()
-            if b:
-                s.add(b)
-        return sorted(s)
-
-    def _brands_from_keys(keys):
-        s = set()
-        for k in keys:
-            b = (catalog.get(k, {}).get("brand") or "").strip().lower()
-            if b:
-                s.add(b)
-        return sorted(s)
 
-    text_norm = normalize(text)
-    if not text_norm:
-        return []
+# ================================================================
+#           NLP CORE — TABEL RULE L0–L7 (RESOLUSI CHUNK)
+# ================================================================
+# Urutan default = urutan prioritas CP12. Ubah RULE_ORDER (list nama rule)
+# untuk mengevaluasi rule murah / sering hit lebih dulu; tabel dikompilasi
+# ulang di snapshot berikutnya (register_catalog / reload).
 
-    # split chunk mirip CP12: "dan", koma, lalu, terus
-    tokens_all = text_norm.split()
-    chunks, cur = [], []
-    for t in tokens_all:
-        if t in {"dan", ",", "terus", "lalu"}:
-            if cur:
-                chunks.append(cur)
-                cur = []
-        else:
-            cur.append(t)
-    if cur:
-        chunks.append(cur)
-    if not chunks:
-        chunks = [tokens_all]
+RULE_ORDER = None
 
-    results = []
+# instrumentasi per label logic (opt-in, lihat enable_profiling)
+PROFILER = ParseProfiler()
 
-    ALL_BRANDS = set(_all_brands())
 
-    for chunk_tokens in chunks:
-        if not chunk_tokens:
-            continue
+def enable_profiling(enabled=True):
+    """Nyalakan/matikan pencatatan latensi per label logic (default mati)."""
+    PROFILER.enabled = bool(enabled)
 
-        # buang stopword (mirip CP12)
-        tokens = [w for w in chunk_tokens if w and w not in STOPWORDS]
-        token_set = set(tokens)
-        s_chunk = " ".join(tokens)
-
-        variant = detect_variant(tokens) or guess_variant_from_fragment(tokens)
-        size_group = detect_size_group(tokens)
-        category = guess_category(tokens)
-        qty, has_explicit_qty = detect_explicit_qty(
-            tokens,
-            variant=variant,
-            variant_numbers=CATALOG_VARIANT_NUMBERS
+
+def profiling_stats():
+    """Jumlah panggilan + histogram latensi (features/candidates/options/total) per label logic."""
+    return PROFILER.stats()
+
+
+def reset_profiling():
+    PROFILER.reset()
+
+
+def _as_options(keys, catalog):
+    # opsi = key katalog saja; label/harga dibaca UI dari katalog bersama
+    return [k for k in keys if k in catalog]
+
+
+def _cap(ca, keys):
+    # batas ukuran kandidat (ParseBudget.max_candidates)
+    cap = ca.max_candidates
+    if cap and len(keys) > cap:
+        ca.truncated = "candidates"
+        return keys[:cap]
+    return keys
+
+
+def _uniq(seq):
+    return list(dict.fromkeys(seq))
+
+
+def _result(ca, logic, candidates=(), chosen=None, need=None, kategori=None, chunk=None):
+    """Hasil 1 chunk (dibekukan jadi ParseResult di akhir parse)."""
+    return {
+        "text": ca.text,
+        "chunk": chunk if chunk is not None else ca.raw_chunk,
+        "kategori": kategori if kategori is not None else ca.category,
+        "variant": ca.variant,
+        "size_group": ca.size_group,
+        "qty": ca.qty,
+        "has_explicit_qty": ca.has_explicit_qty,
+        "candidates_all": _cap(ca, candidates),
+        "chosen_key": chosen,
+        "chosen_item": ca.catalog[chosen] if chosen is not None else None,
+        "need_action": need,
+        "logic": logic,
+    }
+
+
+def _need_item(ca, title, keys):
+    return {"type": "choose_item", "title": title, "options": _cap(ca, _as_options(keys, ca.catalog))}
+
+
+def _need_brand_first(title, brands, flt):
+    return {"type": "choose_brand_then_item", "title": title, "brand_options": brands, "filter": flt}
+
+
+def _no_candidates(ca):
+    return ()
+
+
+def _need_corrected_brand(ca, logic, keys):
+    """
+    Hit yang hanya ketemu lewat koreksi fuzzy/fonetik TIDAK boleh auto pick:
+    tanya brand dulu (brand hasil koreksi di urutan pertama).
+    """
+    guessed = ca.index.brands_of(keys)
+    brands = _uniq(guessed + ca.index.brands_having())
+    label = ", ".join(guessed) or "?"
+    return _result(
+        ca, logic, keys,
+        need=_need_brand_first(
+            f"Maksud Anda brand '{label}'? Pilih brand dulu:",
+            brands,
+            {"mode": "brand_only"},
+        ),
+    )
+
+
+# -----------------------------
+# LOGIC 0 — DIRECT ALIAS (PRIORITAS TERTINGGI, TAPI HARUS SPESIFIK)
+# -----------------------------
+def _l0_when(ca):
+    # paksa packaging lebih prioritas daripada direct alias kalau brand belum jelas
+    # (cek ini dulu → scan alias hanya kalau memang dipakai)
+    if ca.has_packaging and (not ca.explicit_brand):
+        return False
+    # DIRECT ALIAS hanya boleh jalan kalau chunk "spesifik"
+    # Kalau tidak spesifik (contoh: "aqua tanggung", "aqua sedang", "aqua") → jangan pakai direct alias
+    return ca.has_specific
+
+
+def _l0_candidates(ca):
+    return ca.direct
+
+
+def _l0_action(ca, direct):
+    if len(direct) == 1 and ca.alias_corrected:
+        return _need_corrected_brand(ca, "L0_DIRECT_ALIAS_CORRECTED", direct)
+    if len(direct) == 1:
+        return _result(ca, "L0_DIRECT_ALIAS_SINGLE", direct, chosen=direct[0], chunk=ca.s_chunk)
+    if len(direct) > 1:
+        return _result(
+            ca, "L0_DIRECT_ALIAS_MULTI", direct, chunk=ca.s_chunk,
+            need=_need_item(ca, "Saya menemukan beberapa produk yang cocok. Pilih salah satu:", direct),
         )
+    return None
 
 
-        # ✅ SAMAKAN LOGIKA: kalau user bilang "air 600/330/240/1.5/19"
-        # dan tidak menyebut kata "tanggung/cup/kecil/galon", kita tetap isi size_group.
-        if (not size_group) and variant:
-            # umumnya untuk air kemasan
-            sg_from_var = size_group_from_variant(variant)
-            if sg_from_var:
-                size_group = sg_from_var
-
-        # brand candidates (produk-produk yang match brand token)
-        brand_keys = find_brand_candidates(tokens, catalog)
-        brand_keys = [k for k in brand_keys if k in catalog]
-        brands_hit = _brands_from_keys(brand_keys)
-
-        explicit_brand = brands_hit[0] if len(brands_hit) == 1 else None
-
-        # alias strong/weak
-        strongs, weaks = find_alias_candidates_from_text(s_chunk)
-
-
-        # alias strong/weak
-        strongs, weaks = find_alias_candidates_from_text(s_chunk)
-        strongs = [k for k in strongs if k in catalog]
-        weaks = [k for k in weaks if k in catalog]
-
-        # direct alias
-        direct = find_direct_alias_hits(s_chunk)
-        direct = [k for k in direct if k in catalog]
-
-        # flags
-        has_packaging = any(t in PACKAGING_WORDS for t in token_set)
-        has_botol = ("botol" in token_set)
-        has_gas_hint = any(t in {"gas", "elpiji", "lpg", "bright"} for t in token_set) or (category == "gas")
-
-        # sebelum blok: if direct:  (LOGIC 0)
-        # paksa packaging lebih prioritas daripada direct alias kalau brand belum jelas
-        if has_packaging and (not explicit_brand):
-            direct = []   # matikan direct alias supaya jatuh ke LOGIC packaging
-
-        # -----------------------------
-        # LOGIC 0 — DIRECT ALIAS (PRIORITAS TERTINGGI, TAPI HARUS SPESIFIK)
-        # -----------------------------
-        if direct:
-            # DIRECT ALIAS hanya boleh jalan kalau chunk "spesifik"
-            # (misal ada angka/varian/gas/galon/botol/cup/packaging)
-            has_digit = any(t.isdigit() for t in tokens)
-            has_packaging = any(t in PACKAGING_WORDS for t in token_set)
-            has_container = any(t in {"galon", "botol", "cup", "gelas"} for t in token_set)
-            has_gas_hint = any(t in {"gas", "elpiji", "lpg", "bright"} for t in token_set) or (category == "gas")
-            # variant sudah kamu deteksi dari detect_variant()/guess_variant
-            has_specific = bool(variant) or has_digit or has_packaging or has_container or has_gas_hint
-
-            # Kalau tidak spesifik (contoh: "aqua tanggung", "aqua sedang", "aqua") → jangan pakai direct alias
-            if not has_specific:
-                direct = []  # force skip ke logic berikutnya
-            else:
-                direct = list(dict.fromkeys([k for k in direct if k in catalog]))
-
-                if len(direct) == 1:
-                    chosen = direct[0]
-                    results.append({
-                        "text": text,
-                        "chunk": s_chunk,
-                        "kategori": category,
-                        "variant": variant,
-                        "size_group": size_group,
-                        "qty": qty,
-                        "has_explicit_qty": has_explicit_qty,
-                        "candidates_all": direct,
-                        "chosen_key": chosen,
-                        "chosen_item": catalog[chosen],
-                        "need_action": None,
-                        "logic": "L0_DIRECT_ALIAS_SINGLE",
-                    })
-                    continue
-
-                if len(direct) > 1:
-                    results.append({
-                        "text": text,
-                        "chunk": s_chunk,
-                        "kategori": category,
-                        "variant": variant,
-                        "size_group": size_group,
-                        "qty": qty,
-                        "has_explicit_qty": has_explicit_qty,
-                        "candidates_all": direct,
-                        "chosen_key": None,
-                        "chosen_item": None,
-                        "need_action": {
-                            "type": "choose_item",
-                            "title": "Saya menemukan beberapa produk yang cocok. Pilih salah satu:",
-                            "options": direct,
-                        },
-                        "logic": "L0_DIRECT_ALIAS_MULTI",
-                    })
-                    continue
-
-        # -----------------------------
-        # LOGIC 1 — GAS
-        # -----------------------------
-        if has_gas_hint:
-            gas_keys = [k for k, m in catalog.items() if (m.get("kategori") or "").lower() == "gas"]
-            gas_keys = _uniq(gas_keys)
-
-            if len(gas_keys) == 1:
-                chosen = gas_keys[0]
-                results.append({
-                    "text": text,
-                    "chunk": " ".join(chunk_tokens),
-                    "kategori": "gas",
-                    "variant": variant,
-                    "size_group": size_group,
-                    "qty": qty,
-                    "has_explicit_qty": has_explicit_qty,
-                    "candidates_all": gas_keys,
-                    "chosen_key": chosen,
-                    "chosen_item": catalog.get(chosen),
-                    "need_action": None,
-                    "logic": "L1_GAS_SINGLE",
-                })
-                continue
+# -----------------------------
+# LOGIC 1 — GAS
+# -----------------------------
+def _l1_when(ca):
+    return ca.has_gas_hint
 
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": "gas",
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": gas_keys,
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_item",
-                    "title": "Mau gas yang mana?",
-                    "options": _as_options(gas_keys),
-                },
-                "logic": "L1_GAS_MULTI",
-            })
-            continue
 
-        # -----------------------------
-        # LOGIC 2 — SIZE GROUP (CP12 + AUTO PICK jika brand jelas)
-        # -----------------------------
-        if size_group:
-            patterns = SIZE_GROUP[size_group]["patterns"]  # contoh medium: ["600","500"]
-
-            # tentukan brand_name jika brand terdeteksi
-            brand_name = None
-            if brand_keys:
-                brand_name = (catalog[brand_keys[0]].get("brand") or "").strip().lower()
-
-            sg_keys = []
-            for k, meta in catalog.items():
-                # kalau brand diketahui → filter per brand
-                if brand_name:
-                    b = (meta.get("brand") or "").strip().lower()
-                    if b != brand_name:
-                        continue
-
-                var = (meta.get("varian") or "").strip().lower()
-                nama = normalize(meta.get("nama") or "")
-
-                if any(p in var for p in patterns) or any(p in nama for p in patterns):
-                    sg_keys.append(k)
-
-            sg_keys = list(dict.fromkeys(sg_keys))
-
-            if sg_keys:
-                # ✅ AUTO PICK jika brand jelas:
-                # pilih berdasarkan urutan patterns (misal ["600","500"] → cari 600 dulu)
-                if brand_name:
-                    picked = None
-                    for ptn in patterns:
-                        for k in sg_keys:
-                            meta = catalog.get(k, {})
-                            var = (meta.get("varian") or "").lower()
-                            nama = normalize(meta.get("nama") or "")
-                            if (ptn in var) or (ptn in nama):
-                                picked = k
-                                break
-                        if picked:
-                            break
-
-                    if picked:
-                        results.append({
-                            "text": text,
-                            "chunk": s_chunk,
-                            "kategori": category,
-                            "variant": variant,
-                            "size_group": size_group,
-                            "qty": qty,
-                            "has_explicit_qty": has_explicit_qty,
-                            "candidates_all": sg_keys,
-                            "chosen_key": picked,
-                            "chosen_item": catalog[picked],
-                            "need_action": None,
-                            "logic": "L2_SIZE_GROUP_AUTO_PICK",
-                        })
-                        continue
-                    # kalau gagal auto-pick (harusnya jarang), fallback ke choose_item
-
-                # kalau brand tidak jelas → baru minta pilih
-                if len(sg_keys) == 1:
-                    chosen = sg_keys[0]
-                    results.append({
-                        "text": text,
-                        "chunk": s_chunk,
-                        "kategori": category,
-                        "variant": variant,
-                        "size_group": size_group,
-                        "qty": qty,
-                        "has_explicit_qty": has_explicit_qty,
-                        "candidates_all": sg_keys,
-                        "chosen_key": chosen,
-                        "chosen_item": catalog[chosen],
-                        "need_action": None,
-                        "logic": "L2_SIZE_GROUP_SINGLE"
-                    })
-                else:
-                    results.append({
-                        "text": text,
-                        "chunk": s_chunk,
-                        "kategori": category,
-                        "variant": variant,
-                        "size_group": size_group,
-                        "qty": qty,
-                        "has_explicit_qty": has_explicit_qty,
-                        "candidates_all": sg_keys,
-                        "chosen_key": None,
-                        "chosen_item": None,
-                        "need_action": {
-                            "type": "choose_item",
-                            "title": f"Anda menyebut ukuran '{size_group}'. Pilih produk yang Anda maksud:",
-                            "options": sg_keys,
-                        },
-                        "logic": "L2_SIZE_GROUP_MULTI"
-                    })
-                continue
+def _l1_candidates(ca):
+    return ca.index.keys_by_kategori("gas")
 
-        # -----------------------------
-        # LOGIC 3 — VARIAN SAJA
-        # -----------------------------
-        # kondisi: varian ada, tapi brand tidak jelas
-        if variant and not explicit_brand and not brands_hit:
-            var_keys = find_all_keys_for_varian(category, variant, catalog)
-            var_keys = [k for k in var_keys if k in catalog]
-            var_keys = _uniq(var_keys)
-
-            # kalau varian ketemu banyak brand -> pilih brand dulu (CLI-like)
-            brands_var = _brands_from_keys(var_keys)
-            if len(brands_var) > 1:
-                results.append({
-                    "text": text,
-                    "chunk": " ".join(chunk_tokens),
-                    "kategori": category,
-                    "variant": variant,
-                    "size_group": size_group,
-                    "qty": qty,
-                    "has_explicit_qty": has_explicit_qty,
-                    "candidates_all": var_keys,
-                    "chosen_key": None,
-                    "chosen_item": None,
-                    "need_action": {
-                        "type": "choose_brand_then_item",
-                        "title": f"Varian '{variant}' ada di beberapa brand. Pilih brand dulu:",
-                        "brand_options": brands_var,
-                        "filter": {
-                            "mode": "varian_only",
-                            "variant": variant,
-                            "category": category,
-                        },
-                    },
-                    "logic": "L3_VARIAN_ONLY_BRAND_FIRST",
-                })
-                continue
 
-            if len(var_keys) == 1:
-                chosen = var_keys[0]
-                results.append({
-                    "text": text,
-                    "chunk": " ".join(chunk_tokens),
-                    "kategori": category,
-                    "variant": variant,
-                    "size_group": size_group,
-                    "qty": qty,
-                    "has_explicit_qty": has_explicit_qty,
-                    "candidates_all": var_keys,
-                    "chosen_key": chosen,
-                    "chosen_item": catalog.get(chosen),
-                    "need_action": None,
-                    "logic": "L3_VARIAN_ONLY_SINGLE",
-                })
-                continue
+def _l1_action(ca, gas_keys):
+    if len(gas_keys) == 1:
+        return _result(ca, "L1_GAS_SINGLE", gas_keys, chosen=gas_keys[0], kategori="gas")
+    return _result(
+        ca, "L1_GAS_MULTI", gas_keys, kategori="gas",
+        need=_need_item(ca, "Mau gas yang mana?", gas_keys),
+    )
 
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": var_keys,
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_item",
-                    "title": f"Pilih produk untuk varian '{variant}':",
-                    "options": _as_options(var_keys),
-                },
-                "logic": "L3_VARIAN_ONLY_MULTI",
-            })
-            continue
 
-        # -----------------------------
-        # LOGIC 4 — BOTOL / PACKAGING
-        # -----------------------------
-        # A) "botol" -> 2 tahap: pilih brand lalu varian botol (tanpa cup/galon)
-        if has_botol:
-            if explicit_brand:
-                keys = _keys_by_brand(explicit_brand)
-                keys = _filter_botol_only(keys)
-                keys = _uniq(keys)
-
-                if len(keys) == 1:
-                    chosen = keys[0]
-                    results.append({
-                        "text": text,
-                        "chunk": " ".join(chunk_tokens),
-                        "kategori": category,
-                        "variant": variant,
-                        "size_group": size_group,
-                        "qty": qty,
-                        "has_explicit_qty": has_explicit_qty,
-                        "candidates_all": keys,
-                        "chosen_key": chosen,
-                        "chosen_item": catalog.get(chosen),
-                        "need_action": None,
-                        "logic": "L4_BOTOL_SINGLE",
-                    })
-                    continue
-
-                results.append({
-                    "text": text,
-                    "chunk": " ".join(chunk_tokens),
-                    "kategori": category,
-                    "variant": variant,
-                    "size_group": size_group,
-                    "qty": qty,
-                    "has_explicit_qty": has_explicit_qty,
-                    "candidates_all": keys,
-                    "chosen_key": None,
-                    "chosen_item": None,
-                    "need_action": {
-                        "type": "choose_item",
-                        "title": f"Pilih varian botol untuk brand '{explicit_brand}':",
-                        "options": _as_options(keys),
-                    },
-                    "logic": "L4_BOTOL_MULTI",
-                })
-                continue
+# -----------------------------
+# LOGIC 2 — SIZE GROUP (CP12 + AUTO PICK jika brand jelas)
+# -----------------------------
+def _l2_when(ca):
+    return bool(ca.size_group)
 
-            # brand belum jelas -> pilih brand dulu (yang punya botol)
-            brand_list = []
-            for b in _all_brands():
-                keys_b = _filter_botol_only(_keys_by_brand(b))
-                if keys_b:
-                    brand_list.append(b)
-
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": [],
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_brand_then_item",
-                    "title": "Anda mau brand botol yang mana?",
-                    "brand_options": brand_list,
-                    "filter": {"mode": "botol_only"},
-                },
-                "logic": "L4_BOTOL_BRAND_FIRST",
-            })
-            continue
 
-        # B) PACKAGING WORDS: dus/kardus/box -> brand tsb, varian botol & cup, TANPA GALON
-        if has_packaging:
-            if explicit_brand:
-                keys = _keys_by_brand(explicit_brand)
-                keys = _filter_botol_or_cup(keys)
-                keys = _filter_no_galon(keys)
-                keys = _uniq(keys)
-
-                results.append({
-                    "text": text,
-                    "chunk": " ".join(chunk_tokens),
-                    "kategori": category,
-                    "variant": variant,
-                    "size_group": size_group,
-                    "qty": qty,
-                    "has_explicit_qty": has_explicit_qty,
-                    "candidates_all": keys,
-                    "chosen_key": None,
-                    "chosen_item": None,
-                    "need_action": {
-                        "type": "choose_item",
-                        "title": f"Anda menyebut kemasan dus/kardus. Pilih varian botol/cup untuk brand '{explicit_brand}' (tanpa galon):",
-                        "options": _as_options(keys),
-                    },
-                    "logic": "L4_PACKAGING_BRAND_KNOWN",
+def _l2_candidates(ca):
+    """(sg_keys, picked): produk size group (∩ brand kalau diketahui) + auto pick."""
+    idx = ca.index
+    size_group = ca.size_group
+    patterns = SIZE_GROUP[size_group]["patterns"]  # contoh medium: ["600","500"]
+
+    # tentukan brand_name jika brand terdeteksi
+    brand_name = None
+    if ca.brand_keys:
+        brand_name = (ca.catalog[ca.brand_keys[0]].get("brand") or "").strip().lower()
+
+    # produk yang varian/namanya cocok pola size group
+    # (kalau brand diketahui → irisan dengan facet brand)
+    sg_ids = idx.by_size_group.get(size_group, ())
+    if brand_name:
+        brand_ids = idx.brand_id_sets.get(brand_name, frozenset())
+        sg_ids = [i for i in sg_ids if i in brand_ids]
+
+    # ✅ AUTO PICK jika brand jelas:
+    # pilih berdasarkan urutan patterns (misal ["600","500"] → cari 600 dulu)
+    picked = None
+    if brand_name and sg_ids:
+        sg_set = set(sg_ids)
+        for ptn in patterns:
+            for i in idx.by_size_pattern.get((size_group, ptn), ()):
+                if i in sg_set:
+                    picked = idx.keys[i]
+                    break
+            if picked:
+                break
+
+    return idx.keys_of(sg_ids), picked
+
+
+def _l2_action(ca, cands):
+    sg_keys, picked = cands
+    if not sg_keys:
+        return None
+
+    if ca.brand_corrected and (picked or len(sg_keys) == 1):
+        return _need_corrected_brand(ca, "L2_SIZE_GROUP_CORRECTED", sg_keys)
+    if picked:
+        return _result(ca, "L2_SIZE_GROUP_AUTO_PICK", sg_keys, chosen=picked, chunk=ca.s_chunk)
+    # kalau gagal auto-pick / brand tidak jelas → baru minta pilih
+    if len(sg_keys) == 1:
+        return _result(ca, "L2_SIZE_GROUP_SINGLE", sg_keys, chosen=sg_keys[0], chunk=ca.s_chunk)
+    return _result(
+        ca, "L2_SIZE_GROUP_MULTI", sg_keys, chunk=ca.s_chunk,
+        need=_need_item(ca, f"Anda menyebut ukuran '{ca.size_group}'. Pilih produk yang Anda maksud:", sg_keys),
+    )
+
+
+# -----------------------------
+# LOGIC 3 — VARIAN SAJA
+# -----------------------------
+def _l3_when(ca):
+    # kondisi: varian ada, tapi brand tidak jelas
+    return bool(ca.variant) and not ca.explicit_brand and not ca.brands_hit
+
+
+def _l3_candidates(ca):
+    var_keys = find_all_keys_for_varian(ca.category, ca.variant, ca.catalog, ca.index)
+    return _uniq(k for k in var_keys if k in ca.catalog)
+
+
+def _l3_action(ca, var_keys):
+    variant = ca.variant
+
+    # kalau varian ketemu banyak brand -> pilih brand dulu (CLI-like)
+    brands_var = ca.index.brands_of(var_keys)
+    if len(brands_var) > 1:
+        return _result(
+            ca, "L3_VARIAN_ONLY_BRAND_FIRST", var_keys,
+            need=_need_brand_first(
+                f"Varian '{variant}' ada di beberapa brand. Pilih brand dulu:",
+                brands_var,
+                {"mode": "varian_only", "variant": variant, "category": ca.category},
+            ),
+        )
+
+    if len(var_keys) == 1:
+        return _result(ca, "L3_VARIAN_ONLY_SINGLE", var_keys, chosen=var_keys[0])
+
+    return _result(
+        ca, "L3_VARIAN_ONLY_MULTI", var_keys,
+        need=_need_item(ca, f"Pilih produk untuk varian '{variant}':", var_keys),
+    )
+
+
+# -----------------------------
+# LOGIC 4 — BOTOL / PACKAGING
+# -----------------------------
+# A) "botol" -> 2 tahap: pilih brand lalu varian botol (tanpa cup/galon)
+def _l4_botol_when(ca):
+    return ca.has_botol
+
+
+def _l4_botol_candidates(ca):
+    if not ca.explicit_brand:
+        return None
+    return ca.index.keys_by_brand(ca.explicit_brand, include=("botol",))
+
+
+def _l4_botol_action(ca, keys):
+    if keys is None:
+        # brand belum jelas -> pilih brand dulu (yang punya botol)
+        return _result(
+            ca, "L4_BOTOL_BRAND_FIRST", [],
+            need=_need_brand_first(
+                "Anda mau brand botol yang mana?",
+                ca.index.brands_having(include=("botol",)),
+                {"mode": "botol_only"},
+            ),
+        )
+
+    if len(keys) == 1 and ca.brand_corrected:
+        return _need_corrected_brand(ca, "L4_BOTOL_CORRECTED", keys)
+    if len(keys) == 1:
+        return _result(ca, "L4_BOTOL_SINGLE", keys, chosen=keys[0])
+    return _result(
+        ca, "L4_BOTOL_MULTI", keys,
+        need=_need_item(ca, f"Pilih varian botol untuk brand '{ca.explicit_brand}':", keys),
+    )
+
+
+# B) PACKAGING WORDS: dus/kardus/box -> brand tsb, varian botol & cup, TANPA GALON
+def _l4_packaging_when(ca):
+    return ca.has_packaging
+
+
+def _l4_packaging_candidates(ca):
+    if not ca.explicit_brand:
+        return None
+    # ✅ kandidat air kemasan (non-galon): kategori botol/cup, nama botol/cup/gelas,
+    # atau varian ukuran ml
+    return ca.index.keys_by_brand(ca.explicit_brand, include=("kemasan",), exclude=("galon",))
+
+
+def _l4_packaging_action(ca, keys):
+    if keys is None:
+        # brand belum ada -> pilih brand dulu
+        idx = ca.index
+        brand_list = idx.brands_having(include=("kemasan",), exclude=("galon",))
+
+        # fallback kalau filter terlalu ketat / data kategori tidak konsisten
+        if not brand_list:
+            brand_list = idx.brands_having(exclude=("galon",))  # tanpa botol_or_cup
+
+        return _result(
+            ca, "L4_PACKAGING_BRAND_FIRST", [],
+            need=_need_brand_first(
+                "Kemasan dus/kardus/box untuk brand apa?",
+                brand_list,
+                {"mode": "packaging_no_galon"},
+            ),
+        )
+
+    return _result(
+        ca, "L4_PACKAGING_BRAND_KNOWN", keys,
+        need=_need_item(
+            ca,
+            f"Anda menyebut kemasan dus/kardus. Pilih varian botol/cup untuk brand '{ca.explicit_brand}' (tanpa galon):",
+            keys,
+        ),
+    )
+
+
+# -----------------------------
+# LOGIC 4C — "AIR MINERAL" GENERIC -> PILIH BRAND DULU
+# (perlakuan sama seperti dus/kardus: brand -> varian -> qty)
+# -----------------------------
+def _l4c_when(ca):
+    is_air_mineral = ("air" in ca.token_set and "mineral" in ca.token_set)
+    return is_air_mineral and (not ca.explicit_brand) and (not ca.variant) and (not ca.size_group)
+
+
+def _l4c_candidates(ca):
+    # ambil brand yang punya produk air
+    # (definisi "produk air": kategori botol/cup/galon, bukan gas → flag "air")
+    return ca.index.brands_having(include=("air",))
+
+
+def _l4c_action(ca, brand_list):
+    return _result(
+        ca, "L4C_AIR_MINERAL_BRAND_FIRST", [], kategori="air",
+        need=_need_brand_first(
+            "Anda mau **brand air mineral** yang mana?",
+            brand_list,
+            {"mode": "air_all"},   # mode baru utk UI
+        ),
+    )
+
+
+# -----------------------------
+# LOGIC 5 — BRAND ONLY
+# -----------------------------
+def _l5_when(ca):
+    return bool(ca.explicit_brand) and not ca.variant and not ca.size_group
+
+
+def _l5_candidates(ca):
+    return _uniq(ca.index.keys_by_brand(ca.explicit_brand))
+
+
+def _l5_action(ca, keys):
+    # CLI: brand-only tidak auto pilih
+    return _result(
+        ca, "L5_BRAND_ONLY", keys,
+        need=_need_item(ca, f"Anda menyebut brand '{ca.explicit_brand}'. Pilih varian/produk yang Anda maksud:", keys),
+    )
+
+
+# Jika token brand ambigu (lebih dari 1 brand ketemu)
+def _l5_ambiguous_when(ca):
+    return len(ca.brands_hit) > 1 and not ca.variant and not ca.size_group
+
+
+def _l5_ambiguous_action(ca, _):
+    return _result(
+        ca, "L5_BRAND_AMBIGUOUS", [],
+        need=_need_brand_first(
+            "Saya menemukan beberapa kemungkinan brand. Pilih brand dulu:",
+            ca.brands_hit,
+            {"mode": "brand_only"},
+        ),
+    )
+
+
+# -----------------------------
+# LOGIC 6 — ALIAS UMUM (WEAK)
+# -----------------------------
+def _l6_when(ca):
+    return bool(ca.weaks)
+
+
+def _l6_candidates(ca):
+    return _uniq(ca.weaks)
+
+
+def _l6_action(ca, keys):
+    return _result(ca, "L6_ALIAS_UMUM", keys, need=_need_item(ca, "Maksud Anda yang mana?", keys))
+
+
+# -----------------------------
+# LOGIC 7 — KATEGORI
+# -----------------------------
+def _l7_when(ca):
+    return bool(ca.category)
+
+
+def _l7_candidates(ca):
+    return ca.index.keys_by_kategori(ca.category)
+
+
+def _l7_action(ca, keys):
+    return _result(
+        ca, "L7_KATEGORI", keys,
+        need=_need_item(ca, f"Anda menyebut kategori '{ca.category}'. Pilih produk:", keys),
+    )
+
+
+# -----------------------------
+# FALLBACK: strong alias (kalau ada) / atau pool kosong
+# -----------------------------
+def _fallback_strong_when(ca):
+    return bool(ca.strongs)
+
+
+def _fallback_strong_candidates(ca):
+    return _uniq(ca.strongs)
+
+
+def _fallback_strong_action(ca, keys):
+    return _result(
+        ca, "FALLBACK_STRONG_ALIAS", keys,
+        need=_need_item(ca, "Saya menemukan beberapa kemungkinan. Pilih salah satu:", keys),
+    )
+
+
+def _always(ca):
+    return True
+
+
+def _no_match_action(ca, _):
+    return _result(ca, "NO_MATCH", [])
+
+
+DEFAULT_RULES = (
+    Rule("L0_DIRECT_ALIAS", _l0_when, _l0_candidates, _l0_action),
+    Rule("L1_GAS", _l1_when, _l1_candidates, _l1_action),
+    Rule("L2_SIZE_GROUP", _l2_when, _l2_candidates, _l2_action),
+    Rule("L3_VARIAN_ONLY", _l3_when, _l3_candidates, _l3_action),
+    Rule("L4_BOTOL", _l4_botol_when, _l4_botol_candidates, _l4_botol_action),
+    Rule("L4_PACKAGING", _l4_packaging_when, _l4_packaging_candidates, _l4_packaging_action),
+    Rule("L4C_AIR_MINERAL", _l4c_when, _l4c_candidates, _l4c_action),
+    Rule("L5_BRAND_ONLY", _l5_when, _l5_candidates, _l5_action),
+    Rule("L5_BRAND_AMBIGUOUS", _l5_ambiguous_when, _no_candidates, _l5_ambiguous_action),
+    Rule("L6_ALIAS_UMUM", _l6_when, _l6_candidates, _l6_action),
+    Rule("L7_KATEGORI", _l7_when, _l7_candidates, _l7_action),
+    Rule("FALLBACK_STRONG_ALIAS", _fallback_strong_when, _fallback_strong_candidates, _fallback_strong_action),
+    Rule("NO_MATCH", _always, _no_candidates, _no_match_action),
+)
+
+
+def compile_rules(order=None, previous=None):
+    """Tabel rule untuk 1 snapshot; `previous` = tabel lama → statistik hit/waktu dilanjutkan."""
+    return RuleTable(DEFAULT_RULES, order=order if order is not None else RULE_ORDER, previous=previous)
+
+
+def rule_stats():
+    """
+    Hit count & waktu per rule untuk snapshot aktif (urutan evaluasi).
+    Hanya dicatat selama profiling aktif (enable_profiling) atau trace=True;
+    dilanjutkan melewati reload katalog (incremental maupun full).
+    """
+    return ENGINE.snapshot.rules.stats()
+
+
+# ================================================================
+#           NLP CORE — PARSER UTAMA (MULTI-ITEM ORDER)
+# ================================================================
+
+CHUNK_SEPARATORS = frozenset({"dan", ",", "terus", "lalu"})
+
+# batas biaya per parse (token / chunk / kandidat / deadline), lihat parse_budget.py
+PARSE_BUDGET = ParseBudget()
+
+
+def configure_parse_budget(**caps):
+    """Ubah batas parse (max_tokens, max_chunks, max_candidates, deadline_ms; 0/None = tanpa batas)."""
+    PARSE_BUDGET.configure(**caps)
+    # hasil di-cache bergantung pada batas → buang
+    ENGINE.cache.clear()
+    return PARSE_BUDGET.caps()
+
+
+def parse_budget_stats():
+    """Batas aktif + counter parse yang terpotong per alasan."""
+    return PARSE_BUDGET.stats()
+
+
+def split_chunks(text_norm):
+    """split chunk mirip CP12: "dan", koma, lalu, terus"""
+    tokens_all = text_norm.split()
+    chunks, cur = [], []
+    for t in tokens_all:
+        if t in CHUNK_SEPARATORS:
+            if cur:
+                chunks.append(cur)
+                cur = []
+        else:
+            cur.append(t)
+    if cur:
+        chunks.append(cur)
+    if not chunks:
+        chunks = [tokens_all]
+    return chunks
+
+
+def _plan_chunks(text_norm, budget):
+    """Chunk yang di-parse setelah batas token/chunk + alasan potong (atau None)."""
+    cut = None
+    if budget.max_tokens and text_norm.count(" ") >= budget.max_tokens:
+        tokens = text_norm.split()
+        if len(tokens) > budget.max_tokens:
+            text_norm = " ".join(tokens[:budget.max_tokens])
+            cut = "tokens"
+    chunks = [c for c in split_chunks(text_norm) if c]
+    if budget.max_chunks and len(chunks) > budget.max_chunks:
+        chunks = chunks[:budget.max_chunks]
+        cut = cut or "chunks"
+    return chunks, cut
+
+
+def _truncation(ca, last, cut, deadline):
+    """(alasan truncate hasil chunk ini atau None, berhenti setelah chunk ini?)"""
+    if last and cut:
+        return cut, True
+    if not last and deadline is not None and time.perf_counter() > deadline:
+        return "deadline", True
+    return ca.truncated, False
+
+
+def iter_orders_verbose(text, catalog, snapshot=None, stop_when=None, budget=None, trace=None,
+                        profile=True):
+    """
+    Versi generator parse_orders_verbose: yield ParseResult per chunk
+    SEGERA setelah chunk itu selesai di-resolve (chunk berikutnya belum diproses).
+
+    stop_when : opsional predikat(ParseResult) → True = berhenti setelah hasil ini
+                (mis. lambda r: r.need_action is not None → stop di chunk
+                pertama yang perlu pilihan user).
+    Pemanggil juga boleh berhenti kapan saja (break / close generator):
+    chunk sisanya tidak pernah di-parse.
+    budget    : ParseBudget (default PARSE_BUDGET); batas tercapai → hasil
+                terakhir diberi truncated = alasan, lalu berhenti.
+    trace     : opsional list → diisi 1 dict per chunk (jalur keputusan,
+                lihat parse_orders_verbose(trace=True)).
+    profile   : False → tidak dicatat ke PROFILER walau profiling aktif
+                (parse tambahan di luar request user, mis. shadow parser).
+    """
+    # ambil snapshot SEKALI → konsisten walau ada reload di thread lain
+    snap = snapshot or snapshot_for(catalog)
+    budget = PARSE_BUDGET if budget is None else budget
+    t_start = time.perf_counter()
+
+    text_norm = normalize(text)
+    if not text_norm:
+        return
+
+    chunks, cut = _plan_chunks(text_norm, budget)
+    deadline = budget.deadline(t_start)
+    budget.count_parse()
+    truncated = False
+
+    profiler = PROFILER if profile and PROFILER.enabled else None
+    for n, chunk_tokens in enumerate(chunks, 1):
+        # resolusi L0–L7: rule pertama yang menghasilkan keputusan (lihat DEFAULT_RULES)
+        ca = ChunkAnalysis(chunk_tokens, snap, catalog, text)
+        ca.max_candidates = budget.max_candidates
+        if profiler is None and trace is None:
+            r = snap.rules.evaluate(ca)
+        else:
+            ca.start_timing()
+            steps = [] if trace is not None else None
+            t0 = time.perf_counter_ns()
+            r = snap.rules.evaluate_traced(ca, profiler=profiler, trace=steps)
+            if trace is not None:
+                trace.append({
+                    "chunk": ca.raw_chunk,
+                    "logic": r["logic"],
+                    "total_us": (time.perf_counter_ns() - t0) / 1e3,
+                    "steps": steps,
                 })
-                continue
 
-            # brand belum ada -> pilih brand dulu
-            brand_list = []
-            for b in _all_brands():
-                keys_b = _filter_no_galon(_filter_botol_or_cup(_keys_by_brand(b)))
-                if keys_b:
-                    brand_list.append(b)
-                    
-            # fallback kalau filter terlalu ketat / data kategori tidak konsisten
-            if not brand_list:
-                for b in _all_brands():
-                    keys_b = _filter_no_galon(_keys_by_brand(b))  # tanpa botol_or_cup
-                    if keys_b:
-                        brand_list.append(b)
-
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": [],
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_brand_then_item",
-                    "title": "Kemasan dus/kardus/box untuk brand apa?",
-                    "brand_options": brand_list,
-                    "filter": {"mode": "packaging_no_galon"},
-                },
-                "logic": "L4_PACKAGING_BRAND_FIRST",
-            })
-            continue
+        reason, stop = _truncation(ca, n == len(chunks), cut, deadline)
+        if reason:
+            budget.hit(reason, first=not truncated)
+            truncated = True
+            r["truncated"] = reason
+        result = ParseResult(**r)
 
-        # -----------------------------
-        # LOGIC 4C — "AIR MINERAL" GENERIC -> PILIH BRAND DULU
-        # (perlakuan sama seperti dus/kardus: brand -> varian -> qty)
-        # -----------------------------
-        is_air_mineral = ("air" in token_set and "mineral" in token_set)
-
-        if is_air_mineral and (not explicit_brand) and (not variant) and (not size_group):
-            # definisi "produk air": kategori botol/cup/galon (bukan gas)
-            def _is_air_product(meta):
-                kat = (meta.get("kategori") or "").lower()
-                nama = normalize(meta.get("nama") or "")
-                return (kat in {"botol", "cup", "galon"}) or ("galon" in nama) or ("botol" in nama) or ("cup" in nama) or ("gelas" in nama)
-
-            # ambil brand yang punya produk air
-            brand_list = []
-            for b in _all_brands():
-                keys_b = _keys_by_brand(b)
-                keys_b = [k for k in keys_b if _is_air_product(catalog.get(k, {}))]
-                if keys_b:
-                    brand_list.append(b)
-
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": "air",
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": [],
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_brand_then_item",
-                    "title": "Anda mau **brand air mineral** yang mana?",
-                    "brand_options": brand_list,
-                    "filter": {"mode": "air_all"},   # mode baru utk UI
-                },
-                "logic": "L4C_AIR_MINERAL_BRAND_FIRST",
-            })
-            continue
+        yield result
+        if stop or (stop_when is not None and stop_when(result)):
+            return
 
-        # -----------------------------
-        # LOGIC 5 — BRAND ONLY
-        # -----------------------------
-        if explicit_brand and not variant and not size_group:
-            keys = _keys_by_brand(explicit_brand)
-            keys = _uniq(keys)
-
-            # CLI: brand-only tidak auto pilih
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": keys,
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_item",
-                    "title": f"Anda menyebut brand '{explicit_brand}'. Pilih varian/produk yang Anda maksud:",
-                    "options": _as_options(keys),
-                },
-                "logic": "L5_BRAND_ONLY",
-            })
-            continue
 
-        # Jika token brand ambigu (lebih dari 1 brand ketemu)
-        if len(brands_hit) > 1 and not variant and not size_group:
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": [],
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_brand_then_item",
-                    "title": "Saya menemukan beberapa kemungkinan brand. Pilih brand dulu:",
-                    "brand_options": brands_hit,
-                    "filter": {"mode": "brand_only"},
-                },
-                "logic": "L5_BRAND_AMBIGUOUS",
-            })
-            continue
+def parse_orders_verbose(text, catalog, snapshot=None, trace=False, budget=None, profile=True):
+    """
+    Porting LOGIC PRIORITAS CP12 (CLI) ke WEB.
 
-        # -----------------------------
-        # LOGIC 6 — ALIAS UMUM (WEAK)
-        # -----------------------------
-        if weaks:
-            keys = _uniq(weaks)
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": keys,
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_item",
-                    "title": "Maksud Anda yang mana?",
-                    "options": _as_options(keys),
-                },
-                "logic": "L6_ALIAS_UMUM",
-            })
-            continue
+    Output per-chunk (list ParseResult, read-only, bisa dibaca seperti dict):
+    - Jika sudah jelas: chosen_item terisi
+    - Jika ambigu / perlu tanya: chosen_item None + need_action (NeedAction) terisi
+      need_action.options = tuple key katalog
 
-        # -----------------------------
-        # LOGIC 7 — KATEGORI
-        # -----------------------------
-        if category:
-            keys = [k for k, m in catalog.items() if (m.get("kategori") or "").lower() == category]
-            keys = _uniq(keys)
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": keys,
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_item",
-                    "title": f"Anda menyebut kategori '{category}'. Pilih produk:",
-                    "options": _as_options(keys),
-                },
-                "logic": "L7_KATEGORI",
-            })
-            continue
+    need_action.type:
+      - "choose_item"             -> tampilkan list produk untuk dipilih user
+      - "choose_brand_then_item"  -> user pilih brand dulu, lalu pilih produk (dengan filter tertentu)
 
-        # -----------------------------
-        # FALLBACK: strong alias (kalau ada) / atau pool kosong
-        # -----------------------------
-        if strongs:
-            keys = _uniq(strongs)
-            results.append({
-                "text": text,
-                "chunk": " ".join(chunk_tokens),
-                "kategori": category,
-                "variant": variant,
-                "size_group": size_group,
-                "qty": qty,
-                "has_explicit_qty": has_explicit_qty,
-                "candidates_all": keys,
-                "chosen_key": None,
-                "chosen_item": None,
-                "need_action": {
-                    "type": "choose_item",
-                    "title": "Saya menemukan beberapa kemungkinan. Pilih salah satu:",
-                    "options": _as_options(keys),
-                },
-                "logic": "FALLBACK_STRONG_ALIAS",
-            })
-            continue
+    trace=True → return (results, trace): per chunk jalur keputusan
+    (rule yang dicoba, fitur yang dihitung, waktu per fase dalam µs).
+
+    budget (default PARSE_BUDGET): input terlalu panjang / lambat → hasil
+    sebagian; hasil yang terpotong punya truncated = alasan
+    ("tokens" / "chunks" / "candidates" / "deadline").
 
-        results.append({
-            "text": text,
-            "chunk": " ".join(chunk_tokens),
-            "kategori": category,
-            "variant": variant,
-            "size_group": size_group,
-            "qty": qty,
-            "has_explicit_qty": has_explicit_qty,
-            "candidates_all": [],
-            "chosen_key": None,
-            "chosen_item": None,
-            "need_action": None,
-            "logic": "NO_MATCH",
-        })
+    profile=False → tidak dicatat ke PROFILER (lihat iter_orders_verbose).
 
+    = semua hasil iter_orders_verbose (1 loop parse untuk kedua API).
+    """
+    traces = [] if trace else None
+    results = list(iter_orders_verbose(
+        text, catalog, snapshot=snapshot, budget=budget, trace=traces, profile=profile,
+    ))
+    if trace:
+        return results, traces
     return results
 
 # ================================================================
@@ -1480,17 +1550,38 @@ def main(user_data, text):
     """
     Wrapper utama untuk versi WEB.
 
-    - Menggunakan GLOBAL_CATALOG yang di-set oleh register_catalog()
+    - Menggunakan katalog snapshot ENGINE yang di-set oleh register_catalog()
     - Mengembalikan list hasil parse_orders_verbose (CP12 original).
     """
-    global GLOBAL_CATALOG
+    snap = ENGINE.snapshot
 
-    if not GLOBAL_CATALOG:
+    if not snap.catalog:
         raise RuntimeError(
             "GLOBAL_CATALOG kosong. Pastikan init_nlp() sudah memanggil register_catalog()."
         )
 
-    return parse_orders_verbose(text, GLOBAL_CATALOG)
+    return ENGINE.parse_cached(text, snap.catalog)
+
+
+def _json_default(obj):
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+def catalog_fingerprint(catalog):
+    """Hash isi katalog (sha1) → berubah kalau harga/alias/varian berubah."""
+    blob = json.dumps(dict(catalog or {}), sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def freeze_catalog(catalog):
+    """
+    Katalog read-only untuk dibagi antar session:
+    item → CatalogItem (__slots__, ID integer), aliases jadi tuple.
+    """
+    return freeze(compact_catalog(catalog))
+
 
 def build_variant_numbers_from_catalog(catalog):
     """
@@ -1523,14 +1614,542 @@ def build_variant_numbers_from_catalog(catalog):
 
     return nums
 
-def register_catalog(catalog):
+def file_fingerprint(path):
+    """Fingerprint murah untuk file katalog: path + mtime + size (tanpa baca isi)."""
+    abs_path = resolve_catalog_path(path)
+    st = os.stat(abs_path)
+    return f"file:{abs_path}:{st.st_mtime_ns}:{st.st_size}"
+
+# ================================================================
+#        NLP ENGINE — SNAPSHOT IMMUTABLE + SWAP ATOMIK
+# ================================================================
+# Semua state parser (katalog, alias index, facet, lexer, frasa) ada di
+# 1 snapshot. Reload membangun snapshot BARU di samping, lalu di-swap
+# dengan 1 assignment (atomik di CPython). Parse mengambil snapshot sekali
+# di awal → tidak pernah melihat index setengah jadi, tanpa lock.
+
+NlpSnapshot = namedtuple("NlpSnapshot", [
+    "catalog",            # katalog (read-only)
+    "fingerprint",        # fingerprint katalog (isi / file)
+    "alias_index",        # alias_norm → [keys]
+    "matcher",            # AliasMatcher
+    "index",              # CatalogIndex
+    "variant_numbers",    # set angka varian
+    "lexer",              # ChunkLexer
+    "phrases",            # PhraseTable: {(key, lang): text} read-only + template terkompilasi
+    "phrases_fingerprint",
+    "rules",              # RuleTable L0–L7 (+ statistik hit/waktu)
+    "fuzzy",              # FuzzyIndex (koreksi salah eja/STT, hanya kalau exact gagal)
+    "phonetic",           # PhoneticIndex (kunci fonetik → term, sebelum fuzzy)
+])
+
+
+def catalog_file_fingerprint(path):
+    """Fingerprint snapshot yang dimuat dari file katalog ini (CSV, atau artifact kalau CSV tidak ada)."""
+    abs_path = resolve_catalog_path(path)
+    if not os.path.exists(abs_path) and os.path.exists(artifact_path_for(abs_path)):
+        # deploy hanya dengan artifact
+        return file_fingerprint(artifact_path_for(abs_path))
+    return file_fingerprint(abs_path)
+
+
+def build_snapshot(catalog, fingerprint=None, phrases=None, phrases_fingerprint=None,
+                   compiled=None, rules=None):
+    """
+    Bangun semua tabel parser untuk 1 katalog (tanpa menyentuh state global).
+    `compiled` = payload artifact katalog → tabel yang sudah di-precompute dipakai langsung.
+    `rules`    = RuleTable snapshot lama → statistik rule dilanjutkan (None = mulai nol).
+    """
+    if compiled is not None:
+        normalized = compiled["normalized"]
+        alias_index = compiled["alias_index"]
+        variant_numbers = set(compiled["variant_numbers"])
+        variant_table = compiled["variant_table"]
+    else:
+        normalized = None
+        alias_index = build_alias_index(catalog)
+        variant_numbers = build_variant_numbers_from_catalog(catalog)
+        variant_table = variant_table_from_catalog(catalog, defaults=VARIANT_TO_SIZE_GROUP)
+
+    # facet katalog untuk semua cabang parser
+    index = CatalogIndex(catalog, SIZE_GROUP, normalize, normalized=normalized)
+
+    return NlpSnapshot(
+        catalog=catalog,
+        fingerprint=fingerprint,
+        alias_index=alias_index,
+        matcher=build_alias_matcher(alias_index),
+        index=index,
+        # ✅ penting: angka varian dari dataset/katalog
+        variant_numbers=frozenset(variant_numbers),
+        # lexer chunk: angka polos → varian sesuai kolom `varian` katalog
+        lexer=ChunkLexer(
+            variant_table,
+            variant_numbers,
+            NUM_WORDS,
+            SIZE_GROUP,
+        ),
+        phrases=phrases if phrases is not None else PhraseTable({}, FALLBACK_LANG),
+        phrases_fingerprint=phrases_fingerprint,
+        rules=compile_rules(previous=rules),
+        fuzzy=build_fuzzy_index(index),
+        phonetic=build_phonetic_index(index),
+    )
+
+
+# ------------------------------------------------------------
+# RELOAD INCREMENTAL (edit kecil di CSV → tanpa build ulang semua)
+# ------------------------------------------------------------
+# update incremental hanya kalau perubahan ≤ rasio ini dari jumlah item
+INCREMENTAL_MAX_RATIO = 0.25
+
+CatalogDiff = namedtuple("CatalogDiff", ["changed", "added", "removed", "in_order"])
+
+
+def _same_item(a, b):
+    if isinstance(a, CatalogItem) and len(b) == len(CatalogItem.FIELDS):
+        # jalur cepat: 1x bandingkan tuple
+        try:
+            return (a.kategori, a.varian, a.nama, a.harga, a.brand, a.aliases) == (
+                b["kategori"], b["varian"], b["nama"], b["harga"], b["brand"], tuple(b["aliases"])
+            )
+        except KeyError:
+            return False
+    if set(a) != set(b):
+        return False
+    for f in a:
+        x, y = a[f], b[f]
+        if isinstance(x, (list, tuple)) and isinstance(y, (list, tuple)):
+            if tuple(x) != tuple(y):
+                return False
+        elif x != y:
+            return False
+    return True
+
+
+def diff_catalog(old, new):
     """
-    Dipanggil sekali dari order_engine.init_nlp().
-    Menyimpan catalog ke global + membangun ALIAS_INDEX + VARIANT NUMBERS.
+    Bandingkan katalog aktif vs isi CSV baru (per key).
+    - changed  : key yang isinya berubah (harga/alias/nama/...)
+    - added    : key baru (urut CSV)
+    - removed  : key yang hilang
+    - in_order : urutan key lama tetap & key baru hanya di belakang
+                 (syarat update incremental: ID = urutan katalog)
     """
-    global GLOBAL_CATALOG, CATALOG_VARIANT_NUMBERS
-    GLOBAL_CATALOG = catalog
-    build_alias_index(catalog)
+    old_keys, new_keys = list(old), list(new)
+    removed = [k for k in old_keys if k not in new]
+    added = [k for k in new_keys if k not in old]
+    changed = [k for k in new_keys if k in old and not _same_item(old[k], new[k])]
+    kept_old = [k for k in old_keys if k in new]
+    kept_new = [k for k in new_keys if k in old]
+    in_order = kept_old == kept_new and new_keys[len(kept_new):] == added
+    return CatalogDiff(changed, added, removed, in_order)
+
+
+def _variants_touched(old_idx, new_idx, ids):
+    for i in ids:
+        a = old_idx.entries[i] if i < len(old_idx.entries) else None
+        b = new_idx.entries[i] if i < len(new_idx.entries) else None
+        if (a.varian if a else None) != (b.varian if b else None):
+            return True
+    return False
+
+
+def update_snapshot(snap, new_catalog, fingerprint):
+    """
+    Snapshot baru dari snapshot lama + isi katalog baru, HANYA menyentuh
+    item yang berubah:
+      - item tidak berubah → objek CatalogItem lama dipakai ulang
+      - facet, kolom & label opsi → CatalogIndex.updated (copy-on-write)
+      - alias_index → hanya alias milik item yang berubah
+      - matcher → automaton lama dipakai kalau tidak ada string alias baru
+      - lexer / fuzzy / fonetik → build ulang hanya kalau varian / kosakata berubah
+
+    Return (snapshot, diff). snapshot None → perlu build penuh
+    (urutan baris berubah, perubahan terlalu banyak, atau katalog kosong).
+    """
+    old = snap.catalog
+    diff = diff_catalog(old, new_catalog)
+    n_changes = len(diff.changed) + len(diff.added) + len(diff.removed)
+    if not old or not diff.in_order or n_changes > max(8, len(old) * INCREMENTAL_MAX_RATIO):
+        return None, diff
+
+    idx = snap.index
+    ids = {k: idx.id_of[k] for k in diff.changed}
+    next_id = len(idx.keys)
+    for j, k in enumerate(diff.added):
+        ids[k] = next_id + j
+
+    fields = set(CatalogItem.FIELDS)
+    catalog = {}
+    for k, meta in new_catalog.items():
+        if k not in ids:
+            catalog[k] = old[k]
+        elif set(meta) <= fields:
+            catalog[k] = CatalogItem(ids[k], **meta)
+        else:
+            catalog[k] = meta
+    catalog = freeze(catalog)
+
+    removed_ids = [idx.id_of[k] for k in diff.removed]
+    index = idx.updated(catalog, {i: k for k, i in ids.items()}, removed_ids)
+
+    # alias_index: lepas alias lama item yang berubah/hilang, pasang alias barunya
+    alias_index = dict(snap.alias_index)
+    touched = {}
+
+    def _edit(alias, key, add):
+        if not alias:
+            return
+        keys = touched.get(alias)
+        if keys is None:
+            keys = touched[alias] = list(alias_index.get(alias, ()))
+        if add and key not in keys:
+            keys.append(key)
+        elif not add and key in keys:
+            keys.remove(key)
+
+    for k in diff.removed + diff.changed:
+        for a in idx.entries[idx.id_of[k]].alias_norms:
+            _edit(a, k, add=False)
+    for k in diff.changed + diff.added:
+        for a in index.entries[ids[k]].alias_norms:
+            _edit(a, k, add=True)
+    for alias, keys in touched.items():
+        if keys:
+            keys.sort(key=index.id_of.__getitem__)
+            alias_index[alias] = keys
+        else:
+            alias_index.pop(alias, None)
+
+    new_snap = snap._replace(
+        catalog=catalog,
+        fingerprint=fingerprint,
+        alias_index=alias_index,
+        matcher=snap.matcher.updated(alias_index, touched) if touched else snap.matcher,
+        index=index,
+    )
+
+    if _variants_touched(idx, index, list(ids.values()) + removed_ids):
+        variant_numbers = build_variant_numbers_from_catalog(catalog)
+        new_snap = new_snap._replace(
+            variant_numbers=frozenset(variant_numbers),
+            lexer=ChunkLexer(
+                variant_table_from_catalog(catalog, defaults=VARIANT_TO_SIZE_GROUP),
+                variant_numbers,
+                NUM_WORDS,
+                SIZE_GROUP,
+            ),
+        )
+
+    if index.token_index.keys() != idx.token_index.keys() or index.brands != idx.brands:
+        new_snap = new_snap._replace(
+            fuzzy=build_fuzzy_index(index),
+            phonetic=build_phonetic_index(index),
+        )
+
+    return new_snap, diff
+
+
+def diff_phrases(old, new):
+    """{(key, lang): teks} lama vs baru → (added, changed, removed) list key."""
+    added = [k for k in new if k not in old]
+    changed = [k for k in new if k in old and old[k] != new[k]]
+    removed = [k for k in old if k not in new]
+    return added, changed, removed
+
+
+def _with_text(results, text):
+    # hasil cache dibagi antar input dengan normalisasi sama → text milik pemanggil
+    if not results or results[0].text == text:
+        return results
+    return tuple(r.with_text(text) for r in results)
+
+
+class NlpEngine:
+    def __init__(self, cache=None):
+        self.snapshot = build_snapshot({})
+        self.cache = cache if cache is not None else ParseCache()
+        # ringkasan reload terakhir (mode full/incremental, jumlah item, ms)
+        self.last_reload = {}
+        # file sumber snapshot aktif (None = katalog di-register dari memori)
+        self.catalog_path = None
+        # hanya untuk builder: 2 session yang reload bersamaan tidak build 2x
+        self._build_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # RELOAD (build di samping → swap)
+    # ------------------------------------------------------------
+    def _swap(self, snap, force=False):
+        old = self.snapshot
+        self.snapshot = snap
+        if force or old.fingerprint != snap.fingerprint:
+            # isi katalog berubah → hasil parse lama tidak valid lagi
+            self.cache.clear()
+
+    def register_catalog(self, catalog, fingerprint=None):
+        """
+        No-op kalau katalog tidak berubah:
+        - objek catalog sama dengan snapshot aktif, atau
+        - fingerprint (isi / file) sama dengan snapshot aktif.
+        Return True kalau snapshot dibangun ulang.
+        """
+        snap = self.snapshot
+        if snap.catalog is catalog and snap.fingerprint is not None and fingerprint is None:
+            return False
+
+        fp = fingerprint or catalog_fingerprint(catalog)
+
+        with self._build_lock:
+            snap = self.snapshot
+            if snap.fingerprint == fp:
+                if snap.catalog is not catalog:
+                    # isi sama, objek beda → cukup tunjuk ke objek baru
+                    self.snapshot = snap._replace(catalog=catalog)
+                return False
+
+            new_snap = build_snapshot(
+                catalog, fp,
+                phrases=snap.phrases,
+                phrases_fingerprint=snap.phrases_fingerprint,
+                rules=snap.rules,
+            )
+            self._swap(new_snap)
+            self.catalog_path = None
+            return True
+
+    def load_catalog_file(self, path, force=False):
+        """
+        Muat + register katalog HANYA kalau file berubah (mtime + size).
+        Kalau tidak berubah → kembalikan katalog snapshot aktif tanpa parsing/rebuild.
+
+        Sumber: artifact hasil compile_catalog() kalau ada & segar (1x baca),
+        selain itu parsing CSV (fallback).
+        """
+        abs_path = resolve_catalog_path(path)
+        fp = catalog_file_fingerprint(abs_path)
+        if not force and self.snapshot.fingerprint == fp:
+            return self.snapshot.catalog
+
+        with self._build_lock:
+            snap = self.snapshot
+            if not force and snap.fingerprint == fp:
+                return snap.catalog
+
+            t0 = time.perf_counter()
+            compiled = load_fresh_artifact(abs_path)
+            raw = compiled["catalog"] if compiled is not None else load_catalog_from_csv(abs_path)
+
+            new_snap, diff = (None, None)
+            if not force:
+                # edit kecil (harga / alias) → update incremental
+                new_snap, diff = update_snapshot(snap, raw, fp)
+
+            mode = "incremental"
+            if new_snap is None:
+                mode = "full"
+                new_snap = build_snapshot(
+                    freeze_catalog(raw), fp,
+                    phrases=snap.phrases,
+                    phrases_fingerprint=snap.phrases_fingerprint,
+                    compiled=compiled,
+                    rules=snap.rules,
+                )
+
+            self._swap(new_snap, force=force)
+            self.catalog_path = abs_path
+            self.last_reload = {
+                "what": "catalog",
+                "mode": mode,
+                "items": len(new_snap.catalog),
+                "changed": len(diff.changed) if diff else None,
+                "added": len(diff.added) if diff else None,
+                "removed": len(diff.removed) if diff else None,
+                "ms": (time.perf_counter() - t0) * 1000,
+            }
+            return new_snap.catalog
+
+    def load_phrases(self, path, force=False):
+        fp = file_fingerprint(os.path.abspath(path)) if os.path.exists(path) else None
+        if not force and fp is not None and fp == self.snapshot.phrases_fingerprint:
+            return self.snapshot.phrases
+
+        with self._build_lock:
+            snap = self.snapshot
+            if not force and fp is not None and fp == snap.phrases_fingerprint:
+                return snap.phrases
+
+            t0 = time.perf_counter()
+            new = load_voice_phrases(path)
+            added, changed, removed = diff_phrases(snap.phrases, new)
+            if not (added or changed or removed) and not force:
+                # file disentuh tapi isi sama → tabel lama tetap dipakai
+                self.snapshot = snap._replace(phrases_fingerprint=fp)
+                return snap.phrases
+
+            # kompilasi template (yang teksnya tidak berubah dipakai ulang)
+            phrases = PhraseTable(new, FALLBACK_LANG, previous=snap.phrases)
+            problems = phrases.check(PHRASE_CALL_SITES)
+            # masalah juga ada di last_reload["problems"]
+            for p in problems:
+                log.warning("voice_phrases: %s", p)
+            self.snapshot = snap._replace(phrases=phrases, phrases_fingerprint=fp)
+            self.last_reload = {
+                "what": "phrases",
+                "mode": "full" if force or not snap.phrases else "incremental",
+                "items": len(new),
+                "changed": len(changed),
+                "added": len(added),
+                "removed": len(removed),
+                "problems": problems,
+                "ms": (time.perf_counter() - t0) * 1000,
+            }
+            return phrases
+
+    # ------------------------------------------------------------
+    # PARSE (tanpa lock)
+    # ------------------------------------------------------------
+    def snapshot_for(self, catalog):
+        snap = self.snapshot
+        if catalog is None or snap.catalog is catalog:
+            return snap
+        # catalog ad-hoc (bukan yang di-register) → snapshot sementara
+        return build_snapshot(catalog)
+
+    def parse(self, text, catalog=None):
+        snap = self.snapshot_for(catalog)
+        return parse_orders_verbose(text, snap.catalog, snapshot=snap)
+
+    def parse_iter(self, text, catalog=None, stop_when=None, service=None):
+        """
+        Streaming (lihat iter_orders_verbose) + cache:
+        - cache hit → hasil di-cache di-yield satu per satu
+        - miss + service (ParseService) → parse utuh di worker, hasil di-cache
+        - miss tanpa service / service penuh → parse chunk demi chunk; hasil
+          lengkap masuk cache HANYA kalau semua chunk selesai
+        """
+        snap = self.snapshot
+        if (catalog is not None and catalog is not snap.catalog) or snap.fingerprint is None:
+            snap = self.snapshot_for(catalog)
+            yield from iter_orders_verbose(text, snap.catalog, snapshot=snap, stop_when=stop_when)
+            return
+
+        key = (normalize(text), snap.fingerprint)
+        cached = self.cache.get(key)
+        if cached is None and service is not None:
+            cached = self._parse_remote(service, text, snap, key)
+        if cached is not None:
+            for r in cached:
+                r = r.with_text(text)
+                yield r
+                if stop_when is not None and stop_when(r):
+                    return
+            return
+
+        done = []
+        for r in iter_orders_verbose(text, snap.catalog, snapshot=snap):
+            done.append(r)
+            yield r
+            if stop_when is not None and stop_when(r):
+                return
+        if done and done[-1].truncated == "deadline":
+            return  # hasil sebagian karena mesin sibuk → jangan di-cache
+        self.cache.put(key, tuple(done))
+
+    def parse_cached(self, text, catalog=None, service=None):
+        """
+        parse_orders_verbose dengan cache LRU.
+
+        - Key: teks ternormalisasi + fingerprint katalog snapshot
+          (cache hit → field `text` diisi teks pemanggil, bukan teks pertama)
+        - Hasil read-only (mappingproxy/tuple) → jangan di-mutate
+        - Catalog selain snapshot aktif tidak di-cache
+        - service (ParseService, opsional): cache miss → parse di process pool;
+          pool penuh / timeout → parse inline
+        """
+        snap = self.snapshot
+        if (catalog is not None and catalog is not snap.catalog) or snap.fingerprint is None:
+            return freeze(self.parse(text, catalog))
+
+        key = (normalize(text), snap.fingerprint)
+        cached = self.cache.get(key)
+        if cached is None and service is not None:
+            cached = self._parse_remote(service, text, snap, key)
+        if cached is not None:
+            return _with_text(cached, text)
+
+        result = freeze(parse_orders_verbose(text, snap.catalog, snapshot=snap))
+        if not (result and result[-1].truncated == "deadline"):
+            self.cache.put(key, result)
+        return result
+
+    def _parse_remote(self, service, text, snap, key):
+        result = service.parse(text, snap)
+        if result is not None and not (result and result[-1].truncated == "deadline"):
+            self.cache.put(key, result)
+        return result
+
+    def version(self):
+        """Handle versi tabel NLP (katalog + frasa) yang sedang aktif di proses ini."""
+        snap = self.snapshot
+        return f"{snap.fingerprint}|{snap.phrases_fingerprint}"
+
+
+ENGINE = NlpEngine(cache=PARSE_CACHE)
+
+
+# ------------------------------------------------------------
+# WRAPPER FUNGSI LAMA (dipakai order_engine / kode lama)
+# ------------------------------------------------------------
+def snapshot_for(catalog):
+    return ENGINE.snapshot_for(catalog)
+
+
+def parse_orders_cached(text, catalog=None):
+    return ENGINE.parse_cached(text, catalog)
+
+
+def parse_orders_iter(text, catalog=None, stop_when=None):
+    return ENGINE.parse_iter(text, catalog, stop_when=stop_when)
+
+
+def parse_cache_stats():
+    return PARSE_CACHE.stats()
+
+
+def register_catalog(catalog, fingerprint=None):
+    """
+    Dipanggil dari order_engine.init_nlp() / load_and_register_catalog().
+    Membangun snapshot baru (alias index, facet, varian, lexer) lalu swap.
+    Return True kalau index dibangun ulang.
+    """
+    return ENGINE.register_catalog(catalog, fingerprint=fingerprint)
+
+
+def load_and_register_catalog(path, force=False):
+    return ENGINE.load_catalog_file(path, force=force)
+
+
+def nlp_version():
+    return ENGINE.version()
+
+
+# nama global lama → field snapshot (read-only)
+_SNAPSHOT_ALIASES = {
+    "GLOBAL_CATALOG": "catalog",
+    "CATALOG_FINGERPRINT": "fingerprint",
+    "ALIAS_INDEX": "alias_index",
+    "ALIAS_MATCHER": "matcher",
+    "CATALOG_INDEX": "index",
+    "CATALOG_VARIANT_NUMBERS": "variant_numbers",
+    "CHUNK_LEXER": "lexer",
+    "VOICE_PHRASES": "phrases",
+    "PHRASES_FINGERPRINT": "phrases_fingerprint",
+}
+
 
-    # ✅ penting: angka varian dari dataset/katalog
-    CATALOG_VARIANT_NUMBERS = build_variant_numbers_from_catalog(catalog)
+def __getattr__(name):
+    field = _SNAPSHOT_ALIASES.get(name)
+    if field is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(ENGINE.snapshot, field)
@@ -0,0 +1,406 @@
+# modules/nlp_lexer.py
+
+"""
+Lexer chunk (single pass) untuk parser CP12.
+
+Satu kali scan token chunk → token bertipe + fitur yang dipakai parser:
+  - varian   (3kg, 1.5l, 600ml, 19l, ...)
+  - size word (besar/tanggung/kecil/cup/galon)
+  - kategori (gas / air)
+  - qty      (angka / kata angka, bukan angka varian)
+
+Kata bilangan majemuk ("dua puluh", "lima belas", "seratus", "2 puluh",
+"seribu lima ratus") dibaca mesin status kecil (read_number_words) di
+dalam scan yang sama, lalu diperlakukan persis seperti angka polos.
+
+Tabel angka → varian diambil dari kolom `varian` katalog
+(lihat variant_table_from_catalog), bukan daftar 600/500/330/240 di kode.
+Kalau beberapa angka varian polos disebut dalam 1 chunk, urutan prioritas
+tetap sama dengan parser lama (BARE_VARIANT_PRIORITY: 1.5 → 600 → 500 →
+400 → 330 → 240), angka varian katalog lainnya sesudahnya (urut kemunculan).
+
+Desimal koma: normalize() mengubah "1,5" jadi "1 5". Dua angka polos
+berurutan "a b" digabung lagi jadi "a.b" KALAU "a.b" angka varian katalog
+(1.5 → 1500ml, 5.5 → 5.5kg). Akibatnya (beda dengan parser lama):
+  - "aqua 1 5 liter" / "aqua 1,5 liter" → varian 1.5 L (dulu angka 1 dan 5
+    dibaca terpisah → qty 1, varian tidak ketemu)
+  - "aqua 1 5 botol" → varian 1.5 L tanpa qty (dulu qty 5)
+  - "aqua 1 galon 5 botol" TIDAK digabung (ada kata di antara angka)
+"""
+
+import re
+
+# jenis token hasil lexer
+T_NUMBER = "number"
+T_UNIT = "unit"
+T_VARIANT = "variant"
+T_SIZE = "size"
+T_CONTAINER = "container"
+T_QTY_WORD = "qty_word"
+T_WORD = "word"
+
+# unit varian → unit kanonik
+VARIANT_UNITS = {
+    "kg": "kg", "kilo": "kg", "kilogram": "kg",
+    "l": "l", "liter": "l", "ltr": "l",
+    "ml": "ml", "mililiter": "ml",
+}
+
+# satuan qty ("3 botol", "2 dus")
+QTY_UNITS = {"tabung", "galon", "botol", "dus", "karton", "pack", "buah", "pcs", "pcs.", "cup", "gelas"}
+
+CONTAINER_WORDS = QTY_UNITS | {"kardus", "kerdus", "box"}
+
+GAS_WORDS = {"gas", "elpiji", "lpg", "bright", "tabung", "kg"}
+AIR_WORDS = {"air", "galon", "aqua", "minerale", "mineral", "le", "botol", "dus", "cup", "gelas"}
+
+GALON_VARIANT = "19l"
+
+# tebakan varian dari potongan kata (dipakai kalau tidak ada angka varian)
+# urutan = prioritas (galon → botol → cup)
+FRAGMENT_VARIANTS = (
+    ({"gal", "galon"}, "19l"),
+    ({"bot", "botol"}, "1.5ml"),
+    ({"cup", "gelas"}, "240ml"),
+)
+
+# angka varian polos yang disebut bersamaan → yang dipakai (urutan parser lama)
+BARE_VARIANT_PRIORITY = ("1.5", "600", "500", "400", "330", "240")
+
+# kata skala bilangan → level (urutan dalam 1 bilangan harus turun)
+SCALE_WORDS = {"ribu": 4, "ratus": 3, "puluh": 2, "belas": 1}
+
+_NUM_RE = re.compile(r"(\d+(?:\.\d+)?)([a-z]+\.?)?")
+_VARIANT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]+)")
+
+
+def _fmt_num(raw):
+    # normalisasi "3.0" -> "3"
+    if raw.endswith(".0"):
+        return raw[:-2]
+    return raw
+
+
+def variant_table_from_catalog(catalog, defaults=()):
+    """
+    Bangun tabel angka → varian dari kolom `varian` katalog.
+    Contoh: "600ml" → {"600": "600ml"}, "19l" → {"19": "19l"}.
+
+    Hanya varian ml/liter yang masuk (angka "3" tanpa 'kg' tetap qty).
+    `defaults` (list varian) dipakai untuk angka yang tidak ada di katalog.
+    """
+    table = {}
+
+    for meta in (catalog or {}).values():
+        v = (meta.get("varian") or "").strip().lower()
+        m = _VARIANT_RE.fullmatch(v)
+        if not m:
+            continue
+        unit = VARIANT_UNITS.get(m.group(2))
+        if unit in ("ml", "l"):
+            table.setdefault(_fmt_num(m.group(1)), v)
+
+    for v in defaults:
+        m = _VARIANT_RE.fullmatch(v)
+        if m and VARIANT_UNITS.get(m.group(2)) in ("ml", "l"):
+            table.setdefault(_fmt_num(m.group(1)), v)
+
+    return table
+
+
+# ================================================================
+#        KATA BILANGAN (mesin status): belas / puluh / ratus / ribu
+# ================================================================
+
+def number_word_table(num_words):
+    """
+    Tabel kata bilangan → (koefisien, skala), 1x lookup per token:
+      "dua"      → (2, None)      "puluh"    → (None, "puluh")
+      "sebelas"  → (1, "belas")   "duapuluh" → (2, "puluh")
+    Koefisien = kata angka 1–9 dari NUM_WORDS (satu, sebuah, dua, ...).
+    """
+    units = {w: n for w, n in num_words.items() if " " not in w and 1 <= n <= 9}
+    table = {w: (n, None) for w, n in units.items()}
+    for scale in SCALE_WORDS:
+        table[scale] = (None, scale)
+        table[f"se{scale}"] = (1, scale)
+        for w, n in units.items():
+            table.setdefault(f"{w}{scale}", (n, scale))
+    return table
+
+
+def read_number_words(toks, i, table):
+    """
+    Baca bilangan mulai toks[i] (1 pass, tanpa backtrack).
+
+    Status:
+      total : ribuan yang sudah selesai ("dua ribu ...")
+      group : bagian < 1000 yang sudah selesai
+      unit  : koefisien yang menunggu skala (kata 1–9, atau angka polos
+              HANYA kalau diikuti skala: "2 puluh")
+      level : level skala terakhir di group (ratus → puluh → belas, harus turun);
+              0 = group tertutup (sesudah "belas" / "sepuluh" / "satu puluh"
+              tidak boleh ada satuan: 11–19 hanya lewat "belas")
+
+    Berhenti di token pertama yang tidak sah (kata biasa, 2 koefisien
+    berturut-turut, skala naik). Return (nilai, jumlah_token) atau None.
+    """
+    n = len(toks)
+    total = group = 0
+    unit = None
+    level = SCALE_WORDS["ribu"]
+    j = i
+
+    while j < n:
+        t = toks[j]
+        coef, scale = table.get(t, (None, None))
+        if coef is None and scale is None:
+            if unit is None and t.isdigit() and j + 1 < n and toks[j + 1] in SCALE_WORDS:
+                coef = int(t)
+            else:
+                break
+
+        if coef is not None:
+            if unit is not None or not level:
+                break             # "dua tiga" / "sepuluh tiga" → bilangan kedua mulai di "tiga"
+            unit = coef
+            if scale is None:
+                j += 1
+                continue
+
+        lvl = SCALE_WORDS[scale]
+        if scale == "ribu":
+            base = group + (unit or 0)
+            if total or not base:
+                break
+            total, group, unit, level = base * 1000, 0, None, lvl
+        else:
+            if unit is None or lvl >= level:
+                break
+            group += (10 + unit) if scale == "belas" else unit * (10 ** (lvl - 1))
+            closed = scale == "belas" or (scale == "puluh" and unit == 1)
+            unit, level = None, (0 if closed else lvl)
+        j += 1
+
+    value = total + group + (unit or 0)
+    if j == i or not value:
+        return None
+    return value, j - i
+
+
+class ChunkLexer:
+    def __init__(self, variant_table, variant_numbers, num_words, size_groups):
+        """
+        variant_table   : {"600": "600ml", ...}  (angka polos → varian)
+        variant_numbers : set angka yang dianggap varian (bukan qty)
+        num_words       : NUM_WORDS (kata angka → int)
+        size_groups     : SIZE_GROUP (urutan = prioritas)
+        """
+        self.variant_table = dict(variant_table)
+        self.variant_numbers = set(variant_numbers) | set(self.variant_table)
+        self.size_rank = {g: i for i, g in enumerate(size_groups)}
+        self.bare_rank = {num: i for i, num in enumerate(BARE_VARIANT_PRIORITY)}
+        self.number_words = number_word_table(num_words)
+
+        # tabel peran per kata: 1x lookup dict per token
+        roles = {}
+
+        def _add(word, role):
+            roles.setdefault(word, []).append(role)
+
+        for w, unit in VARIANT_UNITS.items():
+            _add(w, (T_UNIT, unit))
+        for w in CONTAINER_WORDS:
+            _add(w, (T_CONTAINER, w))
+        for group, cfg in size_groups.items():
+            for w in cfg.get("words", []):
+                _add(w, (T_SIZE, group))
+        for w, n in num_words.items():
+            if " " not in w:
+                _add(w, (T_QTY_WORD, n))
+        for w in GAS_WORDS:
+            _add(w, ("category", "gas"))
+        for w in AIR_WORDS:
+            _add(w, ("category", "air"))
+        for level, (words, variant) in enumerate(FRAGMENT_VARIANTS):
+            for w in words:
+                _add(w, ("fragment", level))
+
+        self.word_roles = {w: tuple(r) for w, r in roles.items()}
+
+    def scan(self, tokens):
+        """
+        Scan token chunk SEKALI.
+
+        Return dict:
+          lexemes     : [(jenis, nilai, teks), ...]
+          variant     : varian terdeteksi (atau tebakan dari fragment) / None
+          size_group  : size group dari kata ukuran / None
+          category    : "gas" / "air" / None
+          qty, has_explicit_qty
+          first_int   : angka bulat polos pertama (untuk expand_quantity)
+        """
+        toks = list(tokens)
+        n = len(toks)
+        roles_of = self.word_roles
+        table = self.variant_table
+        number_words = self.number_words
+
+        lexemes = []
+        by_unit = {}          # "kg"/"l"/"ml" → varian pertama dengan unit eksplisit
+        galon = False
+        bare_variant = None
+        bare_rank = None
+        fragment = None
+        has_gas = has_air = False
+        size_group = None
+        unit_qty = None
+        word_qty = None
+        ints = []             # angka bulat polos (kandidat qty)
+
+        i = 0
+        while i < n:
+            t = toks[i]
+            nxt = toks[i + 1] if i + 1 < n else ""
+
+            # kata bilangan majemuk ("dua puluh", "seratus", "2 puluh") → angka polos,
+            # lalu aturan angka di bawah berlaku sama (varian / satuan / qty)
+            if t in number_words or (nxt in SCALE_WORDS and t.isdigit()):
+                read = read_number_words(toks, i, number_words)
+                if read is not None and (read[1] > 1 or read[0] >= 10):
+                    value, used = read
+                    i += used - 1
+                    t = str(value)
+                    nxt = toks[i + 1] if i + 1 < n else ""
+
+            m = _NUM_RE.fullmatch(t) if t[:1].isdigit() else None
+            if m:
+                num, suffix = m.group(1), m.group(2)
+
+                # "1,5" → normalize jadi "1 5": gabungkan lagi kalau itu angka varian
+                # (juga "1 5" yang diketik/diucap terpisah, lihat docstring modul)
+                if suffix is None and nxt.isdigit() and "." not in num and f"{num}.{nxt}" in table:
+                    num = f"{num}.{nxt}"
+                    t = f"{t} {nxt}"
+                    i += 1
+                    nxt = toks[i + 1] if i + 1 < n else ""
+
+                # unit di token berikutnya ("3 kilo", "2 botol") atau menempel ("3kg")
+                glued = suffix is not None
+                if not glued and (nxt in VARIANT_UNITS or nxt in QTY_UNITS):
+                    suffix = nxt
+
+                unit = VARIANT_UNITS.get(suffix) if suffix else None
+                if unit:
+                    raw = _fmt_num(num) if unit == "kg" else num
+                    v = f"{raw}{unit}"
+                    by_unit.setdefault(unit, v)
+                    lexemes.append((T_VARIANT, v, t))
+                elif suffix is None or suffix in QTY_UNITS:
+                    if not glued and num in table:
+                        # "19" polos = galon (prioritas sama dengan kata galon)
+                        if table[num] == GALON_VARIANT:
+                            galon = True
+                        else:
+                            rank = self.bare_rank.get(num, len(BARE_VARIANT_PRIORITY))
+                            if bare_rank is None or rank < bare_rank:
+                                bare_variant, bare_rank = table[num], rank
+                    if suffix in QTY_UNITS:
+                        if unit_qty is None and "." not in num:
+                            unit_qty = int(num)
+                    elif "." not in num:
+                        ints.append(num)
+                    lexemes.append((T_NUMBER, num, t))
+                    if suffix and glued:
+                        lexemes.append((T_CONTAINER, suffix, t))
+                else:
+                    lexemes.append((T_WORD, t, t))
+
+                i += 1
+                continue
+
+            if t == "isi" and nxt == "ulang":
+                galon = True
+
+            roles = roles_of.get(t)
+            if not roles:
+                lexemes.append((T_WORD, t, t))
+                i += 1
+                continue
+
+            kind, value = roles[0]
+            for role, val in roles:
+                if role == T_SIZE:
+                    if size_group is None or self.size_rank[val] < self.size_rank[size_group]:
+                        size_group = val
+                elif role == T_QTY_WORD:
+                    # "dua liter" = varian, bukan qty
+                    if word_qty is None and nxt not in VARIANT_UNITS:
+                        word_qty = val
+                elif role == "category":
+                    if val == "gas":
+                        has_gas = True
+                    else:
+                        has_air = True
+                elif role == "fragment":
+                    if fragment is None or val < fragment:
+                        fragment = val
+                    if t == "galon":
+                        galon = True
+
+            if kind in ("category", "fragment"):
+                kind, value = T_WORD, t
+            lexemes.append((kind, value, t))
+            i += 1
+
+        # prioritas varian: kg → liter → ml → galon → angka polos → fragment
+        detected = (
+            by_unit.get("kg")
+            or by_unit.get("l")
+            or by_unit.get("ml")
+            or (GALON_VARIANT if galon else None)
+            or bare_variant
+        )
+        variant = detected or (FRAGMENT_VARIANTS[fragment][1] if fragment is not None else None)
+
+        category = "gas" if has_gas else ("air" if has_air else None)
+
+        qty, has_explicit = resolve_qty(unit_qty, ints, word_qty, variant, self.variant_numbers)
+
+        return {
+            "lexemes": lexemes,
+            "variant": variant,
+            "detected_variant": detected,
+            "size_group": size_group,
+            "category": category,
+            "qty": qty,
+            "has_explicit_qty": has_explicit,
+            "unit_qty": unit_qty,
+            "ints": ints,
+            "word_qty": word_qty,
+            "first_int": int(ints[0]) if ints else None,
+        }
+
+
+def resolve_qty(unit_qty, ints, word_qty, variant, variant_numbers):
+    """
+    RULE (sama seperti detect_explicit_qty):
+    1) "3 botol" / "2 dus"           → qty eksplisit
+    2) angka polos yang BUKAN varian  → qty
+    3) kata angka (dua, tiga, ...)    → qty
+    """
+    if unit_qty is not None:
+        return (max(1, unit_qty), True)
+
+    m = _NUM_RE.match((variant or "").strip().lower())
+    v_num = m.group(1) if m else None
+
+    for t in ints:
+        if t in variant_numbers or t == v_num:
+            continue
+        return (max(1, int(t)), True)
+
+    if word_qty is not None:
+        return (max(1, int(word_qty)), True)
+
+    return (None, False)
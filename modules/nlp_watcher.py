@@ -0,0 +1,105 @@
+# modules/nlp_watcher.py
+
+"""
+Pemantau file katalog / voice_phrases → hot reload tanpa restart server.
+
+Polling mtime + size (stdlib saja, tanpa inotify/watchdog) di 1 thread daemon:
+  - file berubah → tunggu sampai (mtime, size) SAMA di 2 poll berturut-turut
+    (debounce: editor / export CSV sering menulis file bertahap)
+  - lalu panggil callback(path) → mis. ENGINE.load_catalog_file(path)
+  - callback error (CSV setengah jadi, kolom hilang, ...) → dicatat (logging
+    + errors / last_error), snapshot lama TETAP dipakai, file dicoba lagi
+    saat berubah berikutnya
+
+Contoh:
+    w = FileWatcher(interval=1.0)
+    w.watch("catalog_depo78_clean.csv", ENGINE.load_catalog_file)
+    w.start()
+"""
+
+import logging
+import os
+import threading
+
+DEFAULT_INTERVAL = 1.0
+
+log = logging.getLogger(__name__)
+
+
+def file_signature(path):
+    """(mtime_ns, size) atau None kalau file tidak ada."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileWatcher:
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self._entries = {}          # path → [callback, sig_loaded, sig_pending]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+        self.errors = 0
+        # error reload terakhir: {"path", "error"} (None = belum pernah gagal)
+        self.last_error = None
+
+    def watch(self, path, callback):
+        """Daftarkan file; status awal = versi yang sekarang dianggap sudah dimuat."""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._entries[path] = [callback, file_signature(path), None]
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self):
+        """1 putaran cek semua file. Return: list path yang berhasil di-reload."""
+        reloaded = []
+        with self._lock:
+            entries = list(self._entries.items())
+
+        for path, entry in entries:
+            callback, loaded, pending = entry
+            sig = file_signature(path)
+            if sig is None or sig == loaded:
+                entry[2] = None
+                continue
+            if sig != pending:
+                # baru terlihat berubah → tunggu 1 poll lagi (masih ditulis?)
+                entry[2] = sig
+                continue
+
+            entry[1], entry[2] = sig, None
+            try:
+                callback(path)
+            except Exception as e:  # snapshot lama tetap aktif
+                self.errors += 1
+                self.last_error = {"path": path, "error": f"{type(e).__name__}: {e}"}
+                log.warning("reload %s gagal, tetap pakai versi lama: %s",
+                            os.path.basename(path), self.last_error["error"])
+                continue
+            self.reloads += 1
+            reloaded.append(path)
+        return reloaded
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="nlp-file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -1,15 +1,45 @@
 # modules/order_engine.py
 
 import streamlit as st
+import logging
 import os
-
-from modules.nlp_core import (
-    load_catalog_from_csv,
-    load_voice_phrases,
-    init_voice_phrases_or_exit,
-    register_catalog,
-    parse_orders_verbose,   # pakai engine CP12 langsung
-)
+import threading
+
+from modules.nlp_core import ENGINE, configure_parse_budget, validate_catalog_csv   # engine CP12 (snapshot + cache LRU)
+from modules.catalog_index import option_label
+from modules.nlp_watcher import FileWatcher
+from modules.parse_service import ParseService
+from modules.shadow_parse import ShadowRunner
+
+# hot reload katalog / voice_phrases (1 thread per proses server)
+NLP_WATCHER = FileWatcher(interval=1.0)
+
+# parse di process pool (opsional): NLP_PARSE_WORKERS=4 → 4 proses worker.
+# 0 / tidak di-set → parse inline di thread script seperti biasa.
+NLP_PARSE_WORKERS = int(os.environ.get("NLP_PARSE_WORKERS", "0") or 0)
+NLP_PARSE_TIMEOUT = float(os.environ.get("NLP_PARSE_TIMEOUT", "1.0") or 1.0)
+PARSE_SERVICE = None
+
+# batas parse opt-in (default mati → hasil tidak tergantung beban server):
+# NLP_PARSE_DEADLINE_MS=250 → hasil sebagian kalau parse > 250 ms,
+# NLP_PARSE_MAX_CANDIDATES=200 → opsi per chunk dipotong.
+NLP_PARSE_DEADLINE_MS = int(os.environ.get("NLP_PARSE_DEADLINE_MS", "0") or 0)
+NLP_PARSE_MAX_CANDIDATES = int(os.environ.get("NLP_PARSE_MAX_CANDIDATES", "0") or 0)
+if NLP_PARSE_DEADLINE_MS or NLP_PARSE_MAX_CANDIDATES:
+    configure_parse_budget(deadline_ms=NLP_PARSE_DEADLINE_MS, max_candidates=NLP_PARSE_MAX_CANDIDATES)
+
+# shadow mode (opsional): NLP_SHADOW_PARSER="modul:fungsi" / "file.py:fungsi"
+# → sebagian utterance (NLP_SHADOW_SAMPLE) dibandingkan di thread latar,
+# hasil di NLP_SHADOW_STORE (lihat: python -m modules.shadow_parse report)
+NLP_SHADOW_PARSER = os.environ.get("NLP_SHADOW_PARSER", "").strip()
+NLP_SHADOW_SAMPLE = float(os.environ.get("NLP_SHADOW_SAMPLE", "0.05") or 0.05)
+NLP_SHADOW_STORE = os.environ.get("NLP_SHADOW_STORE", "shadow_parse.sqlite")
+SHADOW_RUNNER = None
+
+log = logging.getLogger(__name__)
+
+# 2 session bisa memanggil ensure_shared_nlp bersamaan → start watcher/service 1x saja
+_START_LOCK = threading.Lock()
 
 # ============================
 # HELPER: RESOLVE PATH
@@ -25,6 +55,121 @@ def resolve_path(filename: str) -> str:
     return abs_path
 
 
+# ============================
+# TABEL NLP BERSAMA (sekali per proses server)
+# ============================
+def ensure_shared_nlp(force=False):
+    """
+    Muat katalog + voice_phrases SEKALI per proses (dibagi semua session).
+    File hanya dibaca ulang kalau berubah (mtime+size) atau force=True.
+    Return: handle versi (string) untuk disimpan di session_state.
+    """
+    if NLP_WATCHER.running and not force and ENGINE.snapshot.catalog:
+        # watcher yang reload saat file berubah → tidak perlu stat per command
+        return ENGINE.version()
+
+    catalog_path = resolve_path("catalog_depo78_clean.csv")
+    phrases_path = resolve_path("voice_phrases.csv")
+
+    # Reload dibangun di samping lalu di-swap atomik oleh ENGINE;
+    # session lain tetap parse pakai snapshot lama selama build.
+    ENGINE.load_phrases(phrases_path, force=force)
+    ENGINE.load_catalog_file(catalog_path, force=force)
+    start_nlp_watcher(catalog_path, phrases_path)
+    start_parse_service(catalog_path)
+    start_shadow_parser()
+    return ENGINE.version()
+
+
+def start_nlp_watcher(catalog_path, phrases_path):
+    """
+    Hot reload: edit CSV katalog / voice_phrases → snapshot baru tanpa restart.
+    Perubahan kecil (harga, alias) di-update incremental oleh ENGINE;
+    file rusak → snapshot lama tetap dipakai.
+    """
+    with _START_LOCK:
+        if NLP_WATCHER.running:
+            return
+        NLP_WATCHER.watch(phrases_path, ENGINE.load_phrases)
+        NLP_WATCHER.watch(catalog_path, _hot_reload_catalog)
+        NLP_WATCHER.start()
+
+
+def start_parse_service(catalog_path):
+    """
+    Process pool parse bersama semua session (kalau NLP_PARSE_WORKERS > 0).
+    Worker memuat katalog yang sama & ikut reload lewat fingerprint.
+    """
+    global PARSE_SERVICE
+    if PARSE_SERVICE is not None or NLP_PARSE_WORKERS <= 0:
+        return
+    with _START_LOCK:
+        if PARSE_SERVICE is not None:
+            return
+        service = ParseService(catalog_path, workers=NLP_PARSE_WORKERS, timeout=NLP_PARSE_TIMEOUT)
+        try:
+            service.start()
+        except (OSError, ValueError) as e:
+            log.warning("parse service tidak bisa dijalankan, parse inline: %s", e)
+            return
+        PARSE_SERVICE = service
+
+
+def start_shadow_parser():
+    """Shadow parser (kalau NLP_SHADOW_PARSER di-set); gagal dimuat → log warning, app jalan terus."""
+    global SHADOW_RUNNER
+    if SHADOW_RUNNER is not None or not NLP_SHADOW_PARSER:
+        return
+    with _START_LOCK:
+        if SHADOW_RUNNER is not None:
+            return
+        try:
+            runner = ShadowRunner.from_spec(
+                NLP_SHADOW_PARSER,
+                store_path=resolve_path(NLP_SHADOW_STORE),
+                sample_rate=NLP_SHADOW_SAMPLE,
+            )
+        except (ImportError, FileNotFoundError, ValueError) as e:
+            log.warning("shadow parser tidak aktif: %s", e)
+            return
+        runner.start()
+        SHADOW_RUNNER = runner
+
+
+def _shadow(text):
+    # sampling + antrian non-blok: user tidak pernah menunggu shadow parser
+    if SHADOW_RUNNER is not None:
+        SHADOW_RUNNER.submit(text, ENGINE.snapshot, ENGINE.version())
+
+
+def _hot_reload_catalog(path):
+    # CSV setengah jadi / rusak → tolak sebelum menggantikan snapshot yang sehat
+    errors, _ = validate_catalog_csv(path)
+    if errors:
+        raise ValueError(f"[ERROR] katalog tidak valid ({len(errors)} error), contoh: {errors[0]}")
+    ENGINE.load_catalog_file(path)
+
+
+def item_option_label(key):
+    """Label pilihan item ("Nama — Rp 12,000"), dibangun sekali per snapshot."""
+    label = ENGINE.snapshot.index.option_label(key)
+    return label if label is not None else option_label({})
+
+
+def reload_nlp():
+    """Hook reload: paksa baca ulang katalog + voice_phrases untuk semua session."""
+    version = ensure_shared_nlp(force=True)
+    st.session_state["nlp_version"] = version
+    return version
+
+
+def get_catalog():
+    """Katalog bersama (read-only) milik proses ini."""
+    if not ENGINE.snapshot.catalog:
+        ensure_shared_nlp()
+    return ENGINE.snapshot.catalog
+
+
 # ============================
 # INIT NLP CP12 (sekali per session)
 # ============================
@@ -34,29 +179,15 @@ def init_nlp():
     - voice_phrases (untuk say_phrase di CP12)
     - alias index (lewat register_catalog)
     CATATAN:
-    - Di sini kita TIDAK lagi menyimpan catalog ke session_state;
-      catalog akan dimuat ulang di process_command() setiap kali dipanggil
-      supaya tidak tergantung state yang bisa kosong.
+    - Katalog & frasa disimpan SEKALI per proses (bukan per session).
+    - session_state hanya menyimpan handle versi ("nlp_version").
     """
 
     # Jangan double-init
     if st.session_state.get("nlp_initialized"):
         return
 
-    catalog_path = resolve_path("catalog_depo78_clean.csv")
-    phrases_path = resolve_path("voice_phrases.csv")
-
-    # Inisialisasi VOICE_PHRASES global untuk say_phrase()
-    init_voice_phrases_or_exit(phrases_path)
-
-    # (optional) kalau mau tetap simpan ke session_state:
-    # voice_phrases = load_voice_phrases(phrases_path)
-    # st.session_state["voice_phrases"] = voice_phrases
-
-    catalog = load_catalog_from_csv(catalog_path)
-    st.session_state["catalog"] = catalog
-
-    register_catalog(catalog)
+    st.session_state["nlp_version"] = ensure_shared_nlp()
     st.session_state["nlp_initialized"] = True
 
 # ============================
@@ -64,35 +195,59 @@ def init_nlp():
 # ============================
 # modules/order_engine.py
 
-def process_command(user, text: str):
+def _command_item(info, text):
+    return {
+        "chunk": info.chunk or info.text or text,
+        "qty": info.qty,  # bisa None kalau user belum sebut qty
+        "has_explicit_qty": info.has_explicit_qty,
+        "chosen_item": info.chosen_item,
+        "need_action": info.need_action,   # NeedAction (read-only)
+        "meta": info,                      # ParseResult (referensi, bukan salinan)
+    }
+
+
+def _prepare_command():
     # Pastikan NLP sudah ter-init
     if not st.session_state.get("nlp_initialized"):
         init_nlp()
 
-    # Pakai catalog yang sama dengan yang dipakai register_catalog()
-    catalog = st.session_state.get("catalog")
+    # Cek CSV berubah atau tidak (cukup os.stat); rebuild index hanya kalau berubah
+    st.session_state["nlp_version"] = ensure_shared_nlp()
+    # 1 snapshot untuk seluruh request (konsisten walau ada reload)
+    catalog = ENGINE.snapshot.catalog
     if not catalog:
-        st.error("Catalog belum ada di session_state. Jalankan init_nlp() dulu.")
-        return []
+        st.error("Catalog belum termuat. Jalankan init_nlp() dulu.")
+    return catalog
+
+
+def process_command_iter(user, text: str, stop_when=None):
+    """
+    Versi streaming process_command: yield 1 item per chunk SEGERA setelah
+    chunk itu di-resolve. Item yang sudah jelas bisa langsung masuk keranjang
+    (dan diucapkan) sebelum chunk berikutnya diproses.
 
-    # (OPSIONAL tapi aman) rebuild index jika kamu sering edit CSV saat app hidup
-    register_catalog(catalog)
+    Berhenti di tengah (break / st.rerun() di dalam loop) → chunk sisanya
+    tidak di-parse. stop_when(ParseResult) → stop setelah hasil itu.
+    """
+    catalog = _prepare_command()
+    if not catalog:
+        return
+
+    _shadow(text)
+    for info in ENGINE.parse_iter(text, catalog, stop_when=stop_when, service=PARSE_SERVICE):
+        yield _command_item(info, text)
+
+
+def process_command(user, text: str):
+    catalog = _prepare_command()
+    if not catalog:
+        return []
 
-    parsed_raw = parse_orders_verbose(text, catalog)
+    _shadow(text)
+    # PARSE_SERVICE aktif → parse di worker (timeout / pool penuh → inline)
+    parsed_raw = ENGINE.parse_cached(text, catalog, service=PARSE_SERVICE)
 
     # DEBUG (hapus kalau sudah normal)
     # st.write("DEBUG parsed_raw:", parsed_raw)
 
-    results = []
-    for info in parsed_raw or []:
-        results.append(
-            {
-                "chunk": info.get("chunk") or info.get("text") or text,
-                "qty": info.get("qty"),  # bisa None kalau user belum sebut qty
-                "has_explicit_qty": info.get("has_explicit_qty", False),
-                "chosen_item": info.get("chosen_item"),
-                "need_action": info.get("need_action"),   # ✅ tambahan
-                "meta": info,
-            }
-        )
-    return results
+    return [_command_item(info, text) for info in parsed_raw or []]
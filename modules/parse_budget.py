@@ -0,0 +1,94 @@
+# modules/parse_budget.py
+
+"""
+Batas biaya 1 kali parse (input panjang / suara latar / teks tempelan).
+
+Biaya parse ~ panjang teks × jumlah alias; transkrip STT panjang bisa
+jadi puluhan chunk. ParseBudget membatasi:
+  - max_tokens     : token (setelah normalize) yang ikut di-parse
+  - max_chunks     : jumlah chunk yang di-resolve
+  - max_candidates : ukuran candidates_all / options per chunk
+  - deadline_ms    : batas waktu wall-clock per parse (dicek antar chunk)
+
+Batas tercapai → parser TIDAK error / blokir: hasil sebagian dikembalikan,
+hasil terakhir (atau chunk yang kandidatnya dipotong) diberi
+`truncated` = alasan ("tokens" / "chunks" / "candidates" / "deadline").
+
+Nilai 0 / None = tanpa batas. Tiap alasan punya counter (stats()).
+
+Default hanya batas deterministik (max_tokens, max_chunks): teks yang sama
+→ hasil yang sama. max_candidates (opsi yang tampil berkurang) dan
+deadline_ms (hasil tergantung beban server) opt-in lewat configure() /
+configure_parse_budget() / env NLP_PARSE_MAX_CANDIDATES, NLP_PARSE_DEADLINE_MS.
+"""
+
+import threading
+import time
+
+TRUNCATE_REASONS = ("tokens", "chunks", "candidates", "deadline")
+
+
+class ParseBudget:
+    def __init__(self, max_tokens=80, max_chunks=12, max_candidates=None, deadline_ms=None):
+        self._lock = threading.Lock()
+        self.configure(
+            max_tokens=max_tokens,
+            max_chunks=max_chunks,
+            max_candidates=max_candidates,
+            deadline_ms=deadline_ms,
+        )
+        self.reset()
+
+    def configure(self, **caps):
+        """Ubah batas (nama = atribut di atas); nama tidak dikenal → ValueError."""
+        for name, value in caps.items():
+            if name not in ("max_tokens", "max_chunks", "max_candidates", "deadline_ms"):
+                raise ValueError(f"[ERROR] batas parse tidak dikenal: {name}")
+            if value is not None and value < 0:
+                raise ValueError(f"[ERROR] batas parse {name} tidak boleh negatif: {value}")
+            setattr(self, name, value or None)
+
+    def caps(self):
+        return {
+            "max_tokens": self.max_tokens,
+            "max_chunks": self.max_chunks,
+            "max_candidates": self.max_candidates,
+            "deadline_ms": self.deadline_ms,
+        }
+
+    # ---------- dipakai parser ----------
+    def deadline(self, t_start=None):
+        """perf_counter() batas akhir parse, atau None kalau tanpa deadline."""
+        if not self.deadline_ms:
+            return None
+        if t_start is None:
+            t_start = time.perf_counter()
+        return t_start + self.deadline_ms / 1000.0
+
+    def count_parse(self):
+        with self._lock:
+            self.parses += 1
+
+    def hit(self, reason, first=True):
+        """1 hasil dipotong karena `reason`; first = potongan pertama di parse ini."""
+        with self._lock:
+            self.counters[reason] += 1
+            if first:
+                self.truncated_parses += 1
+
+    # ---------- statistik ----------
+    def reset(self):
+        with self._lock:
+            self.parses = 0
+            self.truncated_parses = 0
+            self.counters = dict.fromkeys(TRUNCATE_REASONS, 0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.caps(),
+                "parses": self.parses,
+                "truncated_parses": self.truncated_parses,
+                "truncated_rate": (self.truncated_parses / self.parses) if self.parses else 0.0,
+                **{f"hit_{r}": n for r, n in self.counters.items()},
+            }
@@ -0,0 +1,73 @@
+# modules/parse_cache.py
+
+"""
+Cache LRU untuk hasil parse_orders_verbose.
+
+- Key   : (teks ternormalisasi, fingerprint katalog)
+- Value : hasil parse yang sudah dibekukan (read-only) → aman dibagi antar session
+- Cache dikosongkan otomatis saat katalog di-register ulang dengan isi berbeda
+"""
+
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+
+def freeze(obj):
+    """dict → mappingproxy (read-only), list/set → tuple, rekursif."""
+    if isinstance(obj, MappingProxyType):
+        return obj
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+class ParseCache:
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
@@ -0,0 +1,140 @@
+# modules/parse_profiler.py
+
+"""
+Instrumentasi parser (opt-in).
+
+- lazy_feature      : property lazy untuk ChunkAnalysis; kalau chunk sedang
+                      di-profile/trace, waktu hitung fitur dicatat
+- LatencyHistogram  : histogram latensi (bucket log2, mikrodetik)
+- ParseProfiler     : per label logic (L0_DIRECT_ALIAS_SINGLE, NO_MATCH, ...)
+                      → jumlah panggilan + histogram per fase:
+                        features   (ekstraksi fitur chunk)
+                        candidates (predikat + generator kandidat)
+                        options    (aksi: bangun hasil / opsi)
+                        total
+
+Saat profiler mati (default), parser tidak memanggil clock sama sekali
+selain statistik rule bawaan RuleTable.
+"""
+
+import threading
+import time
+
+
+class lazy_feature:
+    """
+    Seperti functools.cached_property (nilai disimpan di __dict__ instance,
+    akses berikutnya tanpa overhead), plus pencatatan waktu opsional:
+    instance.timing = True → waktu fitur top-level ditambahkan ke
+    instance.feature_ns dan dicatat di instance.feature_log.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+
+        if not obj.timing:
+            value = self.func(obj)
+        else:
+            obj.feature_depth += 1
+            t0 = time.perf_counter_ns()
+            try:
+                value = self.func(obj)
+            finally:
+                obj.feature_depth -= 1
+            if obj.feature_depth == 0:
+                dt = time.perf_counter_ns() - t0
+                obj.feature_ns += dt
+                obj.feature_log.append((self.name, dt))
+
+        obj.__dict__[self.name] = value
+        return value
+
+
+class LatencyHistogram:
+    # batas atas bucket (µs): 1, 2, 4, ... ~1 detik, + overflow
+    BOUNDS_US = tuple(2 ** i for i in range(21))
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_US) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns):
+        us = ns / 1000
+        i = 0
+        bounds = self.BOUNDS_US
+        while i < len(bounds) and us > bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile_us(self, q):
+        """Perkiraan persentil (batas atas bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                if i < len(self.BOUNDS_US):
+                    return min(float(self.BOUNDS_US[i]), self.max_ns / 1000)
+                return self.max_ns / 1000
+        return self.max_ns / 1000
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_us": (self.total_ns / self.count / 1000) if self.count else 0.0,
+            "p50_us": self.percentile_us(0.50),
+            "p95_us": self.percentile_us(0.95),
+            "p99_us": self.percentile_us(0.99),
+            "max_us": self.max_ns / 1000,
+        }
+
+
+class ParseProfiler:
+    PHASES = ("features", "candidates", "options", "total")
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._labels = {}
+
+    def record(self, label, features_ns, candidates_ns, options_ns, total_ns):
+        with self._lock:
+            entry = self._labels.get(label)
+            if entry is None:
+                entry = self._labels[label] = {p: LatencyHistogram() for p in self.PHASES}
+            entry["features"].add(features_ns)
+            entry["candidates"].add(candidates_ns)
+            entry["options"].add(options_ns)
+            entry["total"].add(total_ns)
+
+    def stats(self):
+        """{label: {"calls": n, "features": {...}, "candidates": {...}, ...}}"""
+        with self._lock:
+            out = {}
+            for label, entry in self._labels.items():
+                row = {"calls": entry["total"].count}
+                for p in self.PHASES:
+                    row[p] = entry[p].summary()
+                out[label] = row
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._labels = {}
@@ -0,0 +1,156 @@
+# modules/parse_result.py
+
+"""
+Tipe hasil parse yang ringkas & immutable (__slots__, frozen).
+
+- ParseResult : hasil 1 chunk dari parse_orders_verbose
+- NeedAction  : pertanyaan lanjutan ke user (choose_item / choose_brand_then_item)
+
+Item katalog direferensikan lewat key (chosen_key, options) + referensi ke
+record katalog bersama (chosen_item), bukan salinan dict. Kandidat disimpan
+sebagai tuple.
+
+Keduanya tetap bisa dibaca seperti dict (r.get("qty"), r["chosen_item"])
+supaya order_engine & halaman Streamlit tidak perlu diubah banyak.
+"""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+class _FrozenRecord(Mapping):
+    """Basis record read-only: field = __slots__, akses gaya dict."""
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, **values):
+        set_ = object.__setattr__
+        for f in self.FIELDS:
+            set_(self, f, values.get(f))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} read-only")
+
+    def __getitem__(self, field):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        values = tuple(
+            dict(v) if isinstance(v, MappingProxyType) else v
+            for v in (getattr(self, f) for f in self.FIELDS)
+        )
+        return (_rebuild, (type(self), values))
+
+    def __repr__(self):
+        body = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.FIELDS)
+        return f"{type(self).__name__}({body})"
+
+
+def _rebuild(cls, values):
+    return cls(**dict(zip(cls.FIELDS, values)))
+
+
+class NeedAction(_FrozenRecord):
+    """
+    type          : "choose_item" / "choose_brand_then_item"
+    title         : teks pertanyaan
+    options       : tuple key katalog (choose_item)
+    brand_options : tuple brand (choose_brand_then_item)
+    filter        : mapping read-only {mode, variant, category} untuk UI
+    """
+    FIELDS = ("type", "title", "options", "brand_options", "filter")
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        values["options"] = tuple(values.get("options") or ())
+        values["brand_options"] = tuple(values.get("brand_options") or ())
+        flt = values.get("filter")
+        values["filter"] = MappingProxyType(dict(flt)) if flt else None
+        super().__init__(**values)
+
+    @classmethod
+    def from_dict(cls, d):
+        if d is None or isinstance(d, NeedAction):
+            return d
+        return cls(**d)
+
+    def to_dict(self):
+        out = {"type": self.type, "title": self.title}
+        if self.type == "choose_brand_then_item":
+            out["brand_options"] = list(self.brand_options)
+            out["filter"] = dict(self.filter or {})
+        else:
+            out["options"] = list(self.options)
+        return out
+
+
+class ParseResult(_FrozenRecord):
+    FIELDS = (
+        "text",
+        "chunk",
+        "kategori",
+        "variant",
+        "size_group",
+        "qty",
+        "has_explicit_qty",
+        "candidates_all",
+        "chosen_key",
+        "chosen_item",
+        "need_action",
+        "logic",
+        "truncated",         # None, atau alasan parse dipotong (lihat parse_budget.py)
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        values["candidates_all"] = tuple(values.get("candidates_all") or ())
+        values["has_explicit_qty"] = bool(values.get("has_explicit_qty"))
+        values["need_action"] = NeedAction.from_dict(values.get("need_action"))
+        super().__init__(**values)
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, ParseResult):
+            return d
+        return cls(**d)
+
+    def with_text(self, text):
+        """Salinan dengan `text` lain (hasil cache dipakai untuk input lain yang normalisasinya sama)."""
+        if text == self.text:
+            return self
+        values = {f: getattr(self, f) for f in self.FIELDS}
+        values["text"] = text
+        return ParseResult(**values)
+
+    def to_dict(self):
+        out = {f: getattr(self, f) for f in self.FIELDS}
+        out["candidates_all"] = list(self.candidates_all)
+        out["need_action"] = self.need_action.to_dict() if self.need_action else None
+        return out
+
+    def resume_handle(self):
+        """
+        State minimal untuk melanjutkan disambiguasi di session:
+        need_action + qty + chunk (tanpa kandidat / item katalog).
+        """
+        return {
+            "need": self.need_action,
+            "qty": self.qty,
+            "has_explicit_qty": self.has_explicit_qty,
+            "chunk": self.chunk or self.text,
+        }
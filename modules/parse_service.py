@@ -0,0 +1,275 @@
+# modules/parse_service.py
+
+"""
+Layanan parse di luar thread script Streamlit (opsional).
+
+Parse yang berat (katalog besar, kalimat panjang) berebut GIL dengan render
+halaman semua session. ParseService memindahkan parse ke process pool:
+
+  - tiap worker memegang snapshot katalog sendiri (dimuat dari file yang
+    sama; fingerprint dicek per batch → ikut hot reload)
+  - permintaan dari banyak session dikumpulkan jadi 1 batch
+    (tunggu maks batch_window_ms atau sampai max_batch teks)
+  - pemanggil menunggu maks `timeout` detik
+  - pool penuh (antrian ≥ max_pending) / timeout / error / fingerprint beda
+    → parse() return None → pemanggil parse inline seperti biasa
+
+Hasil dari worker dikirim sebagai dict ringan (tanpa chosen_item) lalu
+dibangun ulang jadi ParseResult dengan chosen_item = record katalog
+bersama milik proses induk (referensi, bukan salinan).
+
+Dipakai lewat NlpEngine.parse_cached(..., service=...) / parse_iter(...).
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from functools import partial
+
+from modules.nlp_core import ENGINE, PARSE_BUDGET, catalog_file_fingerprint, parse_orders_verbose
+from modules.parse_result import ParseResult
+
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_MAX_BATCH = 16
+DEFAULT_BATCH_WINDOW_MS = 2.0
+
+log = logging.getLogger(__name__)
+
+
+# ================================================================
+#                     WORKER (PROSES TERPISAH)
+# ================================================================
+
+_WORKER_CATALOG_PATH = None
+
+
+def _init_worker(catalog_path):
+    global _WORKER_CATALOG_PATH
+    _WORKER_CATALOG_PATH = catalog_path
+    ENGINE.load_catalog_file(catalog_path)
+
+
+def _result_row(r):
+    row = r.to_dict()
+    del row["chosen_item"]      # dibangun ulang di induk dari chosen_key
+    return row
+
+
+def _parse_batch(fingerprint, caps, texts):
+    """
+    1 batch teks → list (list dict hasil per chunk, atau None = parse inline saja).
+    Snapshot worker disamakan dulu dengan induk (fingerprint + batas parse).
+    """
+    if ENGINE.snapshot.fingerprint != fingerprint and _WORKER_CATALOG_PATH:
+        ENGINE.load_catalog_file(_WORKER_CATALOG_PATH)
+    snap = ENGINE.snapshot
+    if snap.fingerprint != fingerprint:
+        return [None] * len(texts)
+    if PARSE_BUDGET.caps() != caps:
+        PARSE_BUDGET.configure(**caps)
+
+    out = []
+    for text in texts:
+        try:
+            out.append([_result_row(r) for r in parse_orders_verbose(text, snap.catalog, snapshot=snap)])
+        except Exception:  # 1 teks rusak → induk parse inline (error tampil di sana)
+            out.append(None)
+    return out
+
+
+# ================================================================
+#                       SERVICE (PROSES INDUK)
+# ================================================================
+
+class ParseService:
+    def __init__(self, catalog_path, workers=None, timeout=DEFAULT_TIMEOUT,
+                 max_batch=DEFAULT_MAX_BATCH, batch_window_ms=DEFAULT_BATCH_WINDOW_MS,
+                 max_pending=None):
+        """
+        catalog_path    : CSV katalog yang sama dengan ENGINE (worker memuat sendiri)
+        workers         : jumlah proses (default cpu_count)
+        timeout         : detik maksimal menunggu hasil worker
+        max_batch       : teks per batch ke worker
+        batch_window_ms : waktu tunggu permintaan lain sebelum batch dikirim
+        max_pending     : permintaan yang belum selesai; lebih dari ini → inline
+        """
+        self.catalog_path = catalog_path
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_pending = max_pending or self.workers * max_batch
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pool = None
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.requests = 0
+        self.completed = 0
+        self.batches = 0
+        self.saturated = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.stale = 0
+        self.last_error = None      # "TipeError: pesan" batch gagal terakhir
+
+    # ---------- lifecycle ----------
+    @property
+    def running(self):
+        return self._pool is not None and not self._stop.is_set()
+
+    def start(self):
+        """
+        Jalankan pool. Snapshot ENGINE harus dimuat dari catalog_path (fingerprint
+        sama) — katalog yang di-register dari memori tidak pernah cocok dengan
+        snapshot worker → semua permintaan jadi stale → ValueError.
+        """
+        if self._pool is not None:
+            return
+        expected = catalog_file_fingerprint(self.catalog_path)
+        if ENGINE.snapshot.fingerprint != expected:
+            raise ValueError(
+                f"[ERROR] snapshot ENGINE tidak dimuat dari {self.catalog_path} "
+                f"(fingerprint {ENGINE.snapshot.fingerprint!r} != {expected!r}); "
+                f"panggil ENGINE.load_catalog_file dulu"
+            )
+        # spawn: aman walau proses server sudah punya banyak thread
+        ctx = multiprocessing.get_context("spawn")
+        self._pool = ctx.Pool(self.workers, initializer=_init_worker, initargs=(self.catalog_path,))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="nlp-parse-service", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        # permintaan yang masih antri → pemanggil fallback inline
+        while True:
+            try:
+                _, _, fut = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._resolve([fut], [None])
+
+    # ---------- API ----------
+    def parse(self, text, snapshot, timeout=None):
+        """
+        Tuple ParseResult hasil worker, atau None → pemanggil parse inline
+        (service mati, pool penuh, timeout, error, snapshot worker beda).
+        """
+        if not self.running:
+            return None
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.saturated += 1
+                return None
+            self._pending += 1
+            self.requests += 1
+
+        fut = Future()
+        self._queue.put((text, snapshot.fingerprint, fut))
+        try:
+            rows = fut.result(self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+            return None
+        if rows is None:
+            return None
+
+        catalog = snapshot.catalog
+        return tuple(
+            ParseResult(**row, chosen_item=catalog.get(row["chosen_key"]) if row["chosen_key"] is not None else None)
+            for row in rows
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "requests": self.requests,
+                "completed": self.completed,
+                "batches": self.batches,
+                "avg_batch": (self.completed / self.batches) if self.batches else 0.0,
+                "saturated": self.saturated,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "stale": self.stale,
+            }
+
+    # ---------- internal ----------
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return None
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            # kelompokkan per fingerprint (saat reload bisa campur)
+            groups = {}
+            for text, fp, fut in batch:
+                groups.setdefault(fp, []).append((text, fut))
+            caps = PARSE_BUDGET.caps()
+            for fp, items in groups.items():
+                futs = [f for _, f in items]
+                with self._lock:
+                    self.batches += 1
+                try:
+                    self._pool.apply_async(
+                        _parse_batch, (fp, caps, [t for t, _ in items]),
+                        callback=partial(self._finish, futs),
+                        error_callback=partial(self._fail, futs),
+                    )
+                except Exception as e:  # pool sudah ditutup
+                    self._fail(futs, e)
+
+    def _finish(self, futs, results):
+        with self._lock:
+            self.completed += len(futs)
+            self.stale += sum(1 for r in results if r is None)
+        self._resolve(futs, results)
+
+    def _fail(self, futs, exc):
+        with self._lock:
+            self.errors += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+        log.warning("parse service: batch gagal, parse inline (%s: %s)", type(exc).__name__, exc)
+        self._resolve(futs, [None] * len(futs))
+
+    def _resolve(self, futs, results):
+        with self._lock:
+            self._pending -= len(futs)
+        for fut, rows in zip(futs, results):
+            if not fut.done():
+                fut.set_result(rows)
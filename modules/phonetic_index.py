@@ -0,0 +1,107 @@
+# modules/phonetic_index.py
+
+"""
+Kunci fonetik (gaya Soundex/Metaphone) untuk ejaan Indonesia + nama brand asing.
+
+STT sering menulis kata sesuai BUNYI, bukan ejaan brand:
+    "akua"    ~ "aqua"       (qu → ku)
+    "brait"   ~ "bright"     (ght → t, ai → i)
+    "brite"   ~ "bright"     (e di akhir kata tidak dibaca)
+    "kleo"    ~ "cleo"       (c → k)
+    "mineral" ~ "minerale"
+
+phonetic_key(word) menyeragamkan bunyi yang mirip; PhoneticIndex menyimpan
+kunci → term katalog (hash), jadi lookup O(1) per token.
+"""
+
+import re
+
+# urutan penting: pola panjang dulu
+_REPLACEMENTS = (
+    ("ght", "t"),
+    ("gh", "g"),
+    ("ph", "f"),
+    ("qu", "ku"),
+    ("q", "k"),
+    ("ck", "k"),
+    ("kh", "h"),
+    ("sy", "s"),
+    ("sh", "s"),
+    ("dj", "j"),
+    ("tj", "c"),       # ejaan lama
+    ("ch", "c"),
+    ("oe", "u"),       # ejaan lama
+    ("ee", "i"),
+    ("oo", "u"),
+    ("ai", "i"),
+    ("ay", "i"),
+    ("x", "ks"),
+    ("z", "s"),
+    ("v", "f"),
+    ("y", "i"),
+)
+
+# c sebelum vokal depan dibaca "s" (nestle/ceria tetap), selain itu "k" (cleo, club)
+_C_SOFT = re.compile(r"c(?=[ei])")
+_VOWEL_CLASS = str.maketrans({"e": "i", "o": "u"})
+_NON_ALPHA = re.compile(r"[^a-z]")
+
+
+def phonetic_key(word):
+    """Kunci fonetik 1 kata (huruf saja); "" kalau tidak ada huruf."""
+    w = _NON_ALPHA.sub("", (word or "").lower())
+    if not w:
+        return ""
+
+    if len(w) > 3 and w.endswith("e") and w[-2] not in "aeiou":
+        w = w[:-1]        # e akhir tidak dibaca: brite, minerale, nestle
+
+    for old, new in _REPLACEMENTS:
+        if old in w:
+            w = w.replace(old, new)
+    w = _C_SOFT.sub("s", w).replace("c", "k")
+
+    # h setelah konsonan tidak terdengar ("thai" → "tai")
+    w = re.sub(r"(?<=[^aeiou])h", "", w)
+    w = w.translate(_VOWEL_CLASS)
+
+    # huruf dobel → tunggal
+    out = [w[0]]
+    for ch in w[1:]:
+        if ch != out[-1]:
+            out.append(ch)
+    return "".join(out)
+
+
+class PhoneticIndex:
+    def __init__(self, terms, preferred=()):
+        """
+        terms     : kata katalog (sudah dinormalisasi), urutan = prioritas
+        preferred : kata yang didahulukan kalau 1 kunci punya banyak term (brand)
+        """
+        preferred = frozenset(preferred)
+        buckets = {}
+        for t in dict.fromkeys(terms):
+            key = phonetic_key(t)
+            if len(key) >= 3:
+                buckets.setdefault(key, []).append(t)
+
+        self.vocab = frozenset(t for ts in buckets.values() for t in ts)
+        # kunci → term terbaik (brand dulu, lalu urutan katalog)
+        self.best = {
+            key: sorted(ts, key=lambda t: t not in preferred)[0]
+            for key, ts in buckets.items()
+        }
+        self.terms_by_key = {key: tuple(ts) for key, ts in buckets.items()}
+
+    def __len__(self):
+        return len(self.best)
+
+    def lookup(self, word):
+        """Term katalog yang bunyinya sama, atau None."""
+        if word in self.vocab:
+            return word
+        key = phonetic_key(word)
+        if len(key) < 3:
+            return None
+        return self.best.get(key)
@@ -0,0 +1,167 @@
+# modules/phrase_table.py
+
+"""
+Tabel voice phrase terkompilasi (dibangun SEKALI saat voice_phrases.csv dimuat).
+
+Per entri (key, lang):
+  - template diurai sekali jadi segmen: teks statis + placeholder {nama}
+  - render = lookup dict + join (tanpa str.format / try-except per panggilan)
+
+Per key disiapkan rantai fallback O(1):
+    lang diminta → FALLBACK_LANG → lang apa saja (baris pertama di CSV)
+
+check() mencocokkan tabel dengan pemanggil say_phrase (key + argumen yang
+dikirim) → key hilang / placeholder tanpa argumen ketahuan saat load,
+bukan saat checkout.
+
+PhraseTable tetap Mapping {(key, lang): teks} (read-only) supaya kode lama
+(VOICE_PHRASES, diff_phrases) tidak berubah.
+"""
+
+from collections.abc import Mapping
+from string import Formatter
+
+_FORMATTER = Formatter()
+
+
+class PhraseTemplate:
+    __slots__ = ("text", "segments", "fields", "simple")
+
+    def __init__(self, text):
+        """
+        segments : tuple; str = teks statis, (nama, conversion, format_spec) = placeholder
+        fields   : frozenset nama placeholder
+        simple   : False kalau ada placeholder posisi/atribut ({0}, {a.b}) →
+                   render lewat str.format (jarang dipakai)
+        """
+        self.text = text
+        segments = []
+        fields = set()
+        simple = True
+        try:
+            parsed = list(_FORMATTER.parse(text))
+        except ValueError:            # kurung kurawal tidak seimbang → teks apa adanya
+            parsed, simple = [(text, None, None, None)], False
+        for literal, name, spec, conv in parsed:
+            if literal:
+                segments.append(literal)
+            if name is None:
+                continue
+            if not name.isidentifier():
+                simple = False
+            fields.add(name)
+            segments.append((name, conv, spec or ""))
+        self.segments = tuple(segments)
+        self.fields = frozenset(fields)
+        self.simple = simple
+
+    def render(self, kwargs):
+        """
+        Teks final; argumen kurang / format_spec tidak cocok dengan nilai →
+        teks mentah (perilaku lama say_phrase). Tanpa kwargs → teks apa adanya
+        ("{{" tidak di-unescape, sama seperti say_phrase lama).
+        """
+        if not kwargs:
+            return self.text
+        if not self.simple:
+            try:
+                return self.text.format(**kwargs)
+            except (KeyError, IndexError, AttributeError, ValueError, TypeError):
+                return self.text
+        if not self.fields <= kwargs.keys():
+            return self.text
+        out = []
+        try:
+            for seg in self.segments:
+                if seg.__class__ is str:
+                    out.append(seg)
+                    continue
+                name, conv, spec = seg
+                value = kwargs[name]
+                if conv == "s":
+                    value = str(value)
+                elif conv == "r":
+                    value = repr(value)
+                elif conv == "a":
+                    value = ascii(value)
+                out.append(format(value, spec))
+        except (ValueError, TypeError):   # mis. "{harga:,}" dengan str
+            return self.text
+        return "".join(out)
+
+
+class PhraseTable(Mapping):
+    def __init__(self, phrases=None, fallback_lang="id", previous=None):
+        """
+        phrases  : {(key, lang): teks} (hasil load_voice_phrases)
+        previous : opsional PhraseTable lama → template yang teksnya sama dipakai ulang
+        """
+        phrases = dict(phrases or {})
+        old = previous._templates if previous is not None else {}
+
+        self._raw = phrases
+        self.fallback_lang = fallback_lang
+        self._templates = {}
+        self._by_key = {}             # key → [(template, lang), ...] urutan CSV
+        for (key, lang), text in phrases.items():
+            tpl = old.get((key, lang))
+            if tpl is None or tpl.text != text:
+                tpl = PhraseTemplate(text)
+            self._templates[(key, lang)] = tpl
+            self._by_key.setdefault(key, []).append((tpl, lang))
+        # fallback terakhir: lang apa saja = baris pertama key tsb
+        self._any_lang = {key: entries[0] for key, entries in self._by_key.items()}
+
+    # --- Mapping (read-only) ---
+    def __getitem__(self, item):
+        return self._raw[item]
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __contains__(self, item):
+        return item in self._raw
+
+    # --- lookup / render ---
+    def resolve(self, key, lang):
+        """(PhraseTemplate, lang terpakai) atau (None, None)."""
+        tpl = self._templates.get((key, lang))
+        if tpl is not None:
+            return tpl, lang
+        tpl = self._templates.get((key, self.fallback_lang))
+        if tpl is not None:
+            return tpl, self.fallback_lang
+        return self._any_lang.get(key, (None, None))
+
+    def render(self, key, lang, kwargs):
+        tpl, _ = self.resolve(key, lang)
+        if tpl is None:
+            return None
+        return tpl.render(kwargs)
+
+    def check(self, call_sites):
+        """
+        call_sites : {key: set nama argumen yang dikirim pemanggil}
+        Return list masalah (kosong = aman):
+          - key tidak ada di lang mana pun
+          - placeholder di template yang tidak dikirim pemanggil (teks tampil mentah)
+          - teks kosong
+        """
+        problems = []
+        for key, args in call_sites.items():
+            if key not in self._by_key:
+                problems.append(f"key {key!r} tidak ada di voice_phrases")
+                continue
+            for tpl, lang in self._by_key[key]:
+                if not tpl.text:
+                    problems.append(f"key {key!r} ({lang}): teks kosong")
+                missing = sorted(tpl.fields - set(args))
+                if missing:
+                    problems.append(
+                        f"key {key!r} ({lang}): placeholder {missing} tidak dikirim pemanggil "
+                        f"(argumen: {sorted(args)})"
+                    )
+        return problems
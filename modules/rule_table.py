@@ -0,0 +1,156 @@
+# modules/rule_table.py
+
+"""
+Tabel keputusan (rule table) untuk resolusi chunk L0–L7.
+
+Setiap rule = 3 bagian:
+  - when(ca)               : predikat murah (flag/fitur chunk)
+  - candidates(ca)         : generator kandidat (key katalog / data lain)
+  - action(ca, candidates) : bangun hasil (dict) atau None = lanjut rule berikutnya
+
+RuleTable dikompilasi SEKALI per snapshot katalog. Urutan evaluasi bisa
+diatur lewat `order` (list nama rule) tanpa mengubah kode parser.
+
+evaluate() = jalur panas: TANPA counter / lock / jam.
+
+evaluate_traced() = versi terinstrumentasi (profiler / trace=True):
+waktu dipecah per fase (features / candidates / options) dan jalur
+keputusan (rule yang dicoba + fitur yang dihitung) dikembalikan.
+Hanya di sini statistik per rule dicatat: berapa kali dievaluasi, berapa
+kali menang (hit), dan total waktu (predikat + kandidat + aksi). Fitur
+lazy ChunkAnalysis yang pertama dibaca sebuah rule ikut terhitung di rule
+tsb. Jadi stats() hanya terisi selama profiling / trace aktif.
+
+Tabel baru mulai dari nol; `previous` = tabel lama → statistik rule
+yang namanya sama dibawa (dipakai saat snapshot dibangun ulang).
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+Rule = namedtuple("Rule", ["name", "when", "candidates", "action"])
+
+
+class RuleTable:
+    def __init__(self, rules, order=None, previous=None):
+        """
+        rules    : list Rule (urutan default)
+        order    : opsional list nama rule → urutan evaluasi baru.
+                   Rule yang tidak disebut tetap jalan, di belakang (urutan default).
+        previous : opsional RuleTable lama → statistik per nama rule dilanjutkan
+        """
+        rules = list(rules)
+        if order:
+            by_name = {r.name: r for r in rules}
+            unknown = [n for n in order if n not in by_name]
+            if unknown:
+                raise ValueError(f"[ERROR] rule tidak dikenal di order: {unknown}")
+            head = [by_name[n] for n in order]
+            rules = head + [r for r in rules if r.name not in set(order)]
+
+        self.rules = tuple(rules)
+        self.names = tuple(r.name for r in self.rules)
+        n = len(self.rules)
+        self._evals = [0] * n
+        self._hits = [0] * n
+        self._time_ns = [0] * n
+        self._lock = threading.Lock()
+        if previous is not None:
+            old = previous._counts()
+            for i, name in enumerate(self.names):
+                if name in old:
+                    self._evals[i], self._hits[i], self._time_ns[i] = old[name]
+
+    def evaluate(self, ca):
+        """Jalankan rule berurutan; hasil rule pertama yang tidak None (tanpa statistik)."""
+        for rule in self.rules:
+            if rule.when(ca):
+                result = rule.action(ca, rule.candidates(ca))
+                if result is not None:
+                    return result
+        return None
+
+    def evaluate_traced(self, ca, profiler=None, trace=None):
+        """
+        Seperti evaluate(), tapi ca.timing harus True (fitur lazy dicatat).
+        - profiler : ParseProfiler → catat per label logic hasil
+        - trace    : list → diisi 1 step per rule yang dievaluasi
+        """
+        clock = time.perf_counter_ns
+        features = candidates = options = 0
+        t_start = clock()
+        result = None
+
+        for i, rule in enumerate(self.rules):
+            f0, log0 = ca.feature_ns, len(ca.feature_log)
+            t0 = clock()
+            matched = bool(rule.when(ca))
+            t1 = t2 = clock()
+            f1 = f2 = ca.feature_ns
+            if matched:
+                cands = rule.candidates(ca)
+                t2, f2 = clock(), ca.feature_ns
+                result = rule.action(ca, cands)
+            t3, f3 = clock(), ca.feature_ns
+
+            step_features = f3 - f0
+            step_candidates = (t2 - t0) - (f2 - f0)
+            step_options = (t3 - t2) - (f3 - f2)
+            features += step_features
+            candidates += step_candidates
+            options += step_options
+
+            with self._lock:
+                self._evals[i] += 1
+                self._time_ns[i] += t3 - t0
+                if result is not None:
+                    self._hits[i] += 1
+
+            if trace is not None:
+                trace.append({
+                    "rule": rule.name,
+                    "matched": matched,
+                    "logic": result["logic"] if result is not None else None,
+                    "when_us": (t1 - t0 - (f1 - f0)) / 1e3,
+                    "features_us": step_features / 1e3,
+                    "candidates_us": step_candidates / 1e3,
+                    "options_us": step_options / 1e3,
+                    "features": [(name, ns / 1e3) for name, ns in ca.feature_log[log0:]],
+                })
+
+            if result is not None:
+                break
+
+        if profiler is not None and result is not None:
+            profiler.record(result["logic"], features, candidates, options, clock() - t_start)
+        return result
+
+    def _counts(self):
+        """{nama rule: (evals, hits, time_ns)} — urutan evaluasi."""
+        with self._lock:
+            return {
+                name: (self._evals[i], self._hits[i], self._time_ns[i])
+                for i, name in enumerate(self.names)
+            }
+
+    def stats(self):
+        """Statistik per rule (urutan evaluasi); hanya dari evaluate_traced()."""
+        rows = []
+        for name, (evals, hits, ns) in self._counts().items():
+            rows.append({
+                "rule": name,
+                "evals": evals,
+                "hits": hits,
+                "hit_rate": (hits / evals) if evals else 0.0,
+                "time_ms": ns / 1e6,
+                "avg_us": (ns / evals / 1e3) if evals else 0.0,
+            })
+        return rows
+
+    def reset_stats(self):
+        with self._lock:
+            n = len(self.rules)
+            self._evals = [0] * n
+            self._hits = [0] * n
+            self._time_ns = [0] * n
@@ -0,0 +1,368 @@
+# modules/shadow_parse.py
+
+"""
+Shadow mode parser: bandingkan parser alternatif dengan parser aktif
+di trafik asli, TANPA memengaruhi user.
+
+- process_command mengirim sebagian utterance (sample_rate) ke antrian
+  (put_nowait; antrian penuh → dibuang, user tidak pernah menunggu)
+- 1 thread latar mem-parse teks itu dengan parser aktif (nlp_core, snapshot
+  yang sama dengan request user) DAN parser alternatif, bergantian di thread
+  yang sama → latensi bisa dibandingkan adil. Parse ulang parser aktif
+  memakai RuleTable & ParseBudget sendiri tanpa PROFILER → statistik
+  rule / profiling / budget tetap hanya dari request user
+- beda per chunk (chosen_key, logic, need_action.type) + latensi kedua
+  parser disimpan ke SQLite lokal (stdlib)
+- report(store) / CLI → ringkasan: % sama, beda per field, contoh teks,
+  p50/p95 latensi + delta
+
+Parser alternatif = callable(text, catalog) → list hasil per chunk (mapping
+dengan chosen_key / logic / need_action), dimuat dari spec:
+    "paket.modul:fungsi"              (mis. "modules.nlp_core:parse_orders_verbose")
+    "/path/nlp_core_lama.py:fungsi"   (file lepas, dimuat sebagai modul terpisah)
+Kalau modulnya punya register_catalog(catalog), fungsi itu dipanggil sekali
+per katalog (index parser alternatif dibangun 1x, bukan per utterance).
+
+Contoh bandingkan dengan versi nlp_core sebelumnya:
+    git show HEAD~1:modules/nlp_core.py > /tmp/nlp_core_lama.py
+    NLP_SHADOW_PARSER=/tmp/nlp_core_lama.py:parse_orders_verbose streamlit run streamlit_app.py
+    python -m modules.shadow_parse report
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from modules.nlp_core import PARSE_BUDGET, parse_orders_verbose
+from modules.parse_budget import ParseBudget
+from modules.rule_table import RuleTable
+
+DEFAULT_STORE = "shadow_parse.sqlite"
+DEFAULT_SAMPLE_RATE = 0.05
+COMPARED_FIELDS = ("chosen_key", "logic", "need_action")
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shadow_runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts          REAL    NOT NULL,
+    text        TEXT    NOT NULL,
+    version     TEXT,
+    shadow      TEXT,
+    same        INTEGER NOT NULL,
+    diff_fields TEXT,
+    primary_out TEXT,
+    shadow_out  TEXT,
+    primary_us  REAL,
+    shadow_us   REAL,
+    error       TEXT
+)
+"""
+
+
+# ================================================================
+#                   MEMUAT PARSER ALTERNATIF
+# ================================================================
+
+def load_parser(spec):
+    """
+    "modul:fungsi" / "file.py:fungsi" → (callable, modul).
+    Spec salah → ValueError; file tidak ada → FileNotFoundError.
+    """
+    target, sep, func_name = spec.rpartition(":")
+    if not sep or not target or not func_name:
+        raise ValueError(f"[ERROR] spec shadow parser harus 'modul:fungsi' atau 'file.py:fungsi': {spec!r}")
+
+    if target.endswith(".py"):
+        path = os.path.abspath(target)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"[ERROR] file shadow parser tidak ditemukan: {path}")
+        name = "shadow_" + os.path.splitext(os.path.basename(path))[0]
+        mod_spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(mod_spec)
+        mod_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+
+    fn = getattr(module, func_name, None)
+    if not callable(fn):
+        raise ValueError(f"[ERROR] {func_name!r} tidak ada / bukan fungsi di {target}")
+    return fn, module
+
+
+# ================================================================
+#                        PERBANDINGAN
+# ================================================================
+
+def _need_type(need):
+    if not need:
+        return None
+    return need.get("type") if hasattr(need, "get") else getattr(need, "type", None)
+
+
+def summarize_results(results):
+    """List hasil parse → list (chosen_key, logic, need_action.type) per chunk."""
+    return [(r.get("chosen_key"), r.get("logic"), _need_type(r.get("need_action"))) for r in results or ()]
+
+
+def diff_results(primary, shadow):
+    """Field yang berbeda (urutan COMPARED_FIELDS); "chunks" kalau jumlah chunk beda."""
+    fields = set()
+    if len(primary) != len(shadow):
+        fields.add("chunks")
+    for a, b in zip(primary, shadow):
+        for name, x, y in zip(COMPARED_FIELDS, a, b):
+            if x != y:
+                fields.add(name)
+    return [f for f in ("chunks",) + COMPARED_FIELDS if f in fields]
+
+
+# ================================================================
+#                       RUNNER (THREAD LATAR)
+# ================================================================
+
+class ShadowRunner:
+    def __init__(self, parser, name="shadow", store_path=DEFAULT_STORE,
+                 sample_rate=DEFAULT_SAMPLE_RATE, max_queue=64, module=None):
+        """
+        parser      : callable(text, catalog) → list hasil per chunk
+        module      : modul parser (opsional) → register_catalog dipanggil 1x per katalog
+        sample_rate : bagian utterance yang ikut dibandingkan (0..1)
+        max_queue   : antrian penuh → utterance dibuang (dihitung di `dropped`)
+        """
+        self.parser = parser
+        self.module = module
+        self.name = name
+        self.store_path = store_path
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._registered = None
+        # tanpa deadline: thread latar bisa lebih lambat, hasil tetap harus lengkap
+        self._budget = ParseBudget()
+        # salinan RuleTable snapshot (urutan sama, counter sendiri)
+        self._rules = None
+        self._rules_of = None
+
+        self.submitted = 0
+        self.dropped = 0
+        self.recorded = 0
+        self.errors = 0
+        self.last_error = None
+
+    @classmethod
+    def from_spec(cls, spec, **kwargs):
+        fn, module = load_parser(spec)
+        return cls(fn, name=spec, module=module, **kwargs)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._loop, name="nlp-shadow-parser", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        if self.running:
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, text, snapshot, version=None):
+        """Dipanggil di jalur request user: O(1), tidak pernah blok."""
+        if not self.running or not text or random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((text, snapshot, version))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def stats(self):
+        return {
+            "shadow": self.name,
+            "sample_rate": self.sample_rate,
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "recorded": self.recorded,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+    # ---------- internal ----------
+    def _loop(self):
+        conn = sqlite3.connect(self.store_path)
+        conn.execute(_SCHEMA)
+        conn.commit()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                try:
+                    row = self.compare(*item)
+                except Exception as e:  # jangan sampai thread mati
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    log.warning("shadow parser: %s", self.last_error)
+                    continue
+                conn.execute(
+                    "INSERT INTO shadow_runs (ts, text, version, shadow, same, diff_fields, primary_out,"
+                    " shadow_out, primary_us, shadow_us, error) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                    row,
+                )
+                conn.commit()
+                self.recorded += 1
+        finally:
+            conn.close()
+
+    def compare(self, text, snapshot, version=None):
+        """Parse dengan kedua parser (thread ini) → 1 baris untuk shadow_runs."""
+        catalog = snapshot.catalog
+        self._budget.configure(**{**PARSE_BUDGET.caps(), "deadline_ms": None})
+
+        if self._rules_of is not snapshot.rules:
+            self._rules = RuleTable(snapshot.rules.rules)
+            self._rules_of = snapshot.rules
+        private = snapshot._replace(rules=self._rules)
+
+        t0 = time.perf_counter_ns()
+        primary = parse_orders_verbose(text, catalog, snapshot=private, budget=self._budget, profile=False)
+        primary_us = (time.perf_counter_ns() - t0) / 1e3
+        primary = summarize_results(primary)
+
+        error = None
+        shadow, shadow_us = [], None
+        try:
+            register = getattr(self.module, "register_catalog", None)
+            if register is not None and self._registered is not catalog:
+                register(catalog)
+                self._registered = catalog
+            t0 = time.perf_counter_ns()
+            shadow = summarize_results(self.parser(text, catalog))
+            shadow_us = (time.perf_counter_ns() - t0) / 1e3
+        except Exception as e:
+            self.errors += 1
+            error = self.last_error = f"{type(e).__name__}: {e}"
+
+        fields = diff_results(primary, shadow) if error is None else ["error"]
+        return (
+            time.time(), text, version, self.name, int(not fields), ",".join(fields),
+            json.dumps(primary, ensure_ascii=False), json.dumps(shadow, ensure_ascii=False),
+            primary_us, shadow_us, error,
+        )
+
+
+# ================================================================
+#                          RINGKASAN
+# ================================================================
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(q * len(values) + 0.5)) - 1))]
+
+
+def report(store_path=DEFAULT_STORE, shadow=None, examples=5):
+    """Ringkasan isi store (dict). shadow = filter nama parser alternatif."""
+    if not os.path.exists(store_path):
+        raise FileNotFoundError(f"[ERROR] store shadow tidak ditemukan: {store_path}")
+
+    conn = sqlite3.connect(store_path)
+    try:
+        where, args = ("WHERE shadow = ?", (shadow,)) if shadow else ("", ())
+        rows = conn.execute(
+            f"SELECT text, same, diff_fields, primary_us, shadow_us, error FROM shadow_runs {where}"
+            " ORDER BY id", args,
+        ).fetchall()
+    finally:
+        conn.close()
+
+    total = len(rows)
+    by_field = {}
+    diff_examples = []
+    deltas, primary_lat, shadow_lat = [], [], []
+    errors = 0
+    for text, same, fields, p_us, s_us, error in rows:
+        if error:
+            errors += 1
+        if not same:
+            for f in (fields or "").split(","):
+                if f:
+                    by_field[f] = by_field.get(f, 0) + 1
+            if len(diff_examples) < examples:
+                diff_examples.append({"text": text, "fields": fields})
+        if p_us is not None and s_us is not None:
+            primary_lat.append(p_us)
+            shadow_lat.append(s_us)
+            deltas.append(s_us - p_us)
+
+    same = sum(1 for r in rows if r[1])
+    return {
+        "runs": total,
+        "same": same,
+        "same_rate": (same / total) if total else 0.0,
+        "diff_by_field": dict(sorted(by_field.items(), key=lambda kv: -kv[1])),
+        "errors": errors,
+        "primary_p50_us": _pct(primary_lat, 0.50),
+        "primary_p95_us": _pct(primary_lat, 0.95),
+        "shadow_p50_us": _pct(shadow_lat, 0.50),
+        "shadow_p95_us": _pct(shadow_lat, 0.95),
+        "delta_p50_us": _pct(deltas, 0.50),
+        "delta_mean_us": (sum(deltas) / len(deltas)) if deltas else 0.0,
+        "examples": diff_examples,
+    }
+
+
+def print_report(summary):
+    print(f"run: {summary['runs']}   sama: {summary['same']} ({summary['same_rate']:.1%})"
+          f"   error: {summary['errors']}")
+    if summary["diff_by_field"]:
+        print("beda per field: " + ", ".join(f"{k} {v}" for k, v in summary["diff_by_field"].items()))
+    print(f"latensi aktif  : p50 {summary['primary_p50_us']:.0f} µs   p95 {summary['primary_p95_us']:.0f} µs")
+    print(f"latensi shadow : p50 {summary['shadow_p50_us']:.0f} µs   p95 {summary['shadow_p95_us']:.0f} µs")
+    print(f"delta (shadow − aktif): p50 {summary['delta_p50_us']:+.0f} µs   rata-rata {summary['delta_mean_us']:+.0f} µs")
+    for ex in summary["examples"]:
+        print(f"  - [{ex['fields']}] {ex['text']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ringkasan perbandingan shadow parser")
+    ap.add_argument("command", choices=["report"])
+    ap.add_argument("--store", default=DEFAULT_STORE)
+    ap.add_argument("--shadow", help="filter nama/spec parser alternatif")
+    ap.add_argument("--examples", type=int, default=5, help="contoh teks yang berbeda")
+    ap.add_argument("--json", action="store_true", help="cetak JSON")
+    args = ap.parse_args(argv)
+
+    try:
+        summary = report(args.store, shadow=args.shadow, examples=args.examples)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        print_report(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
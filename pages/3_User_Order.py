@@ -9,7 +9,7 @@ st.set_page_config(
 )
 from modules.listen_web import listen_web
 from modules.tts_web import speak, tts_reset_queue, tts_flush
-from modules.order_engine import init_nlp, process_command
+from modules.order_engine import init_nlp, process_command_iter, get_catalog, item_option_label
 from modules.db import get_db
 from modules.admin_api import get_order_items  # biarkan saja
 from modules.nlp_core import say_phrase
@@ -566,17 +566,13 @@ if pa:
 
     if pa["type"] == "choose_item":
         options_keys = pa.get("options") or []
-        # tampilkan nama produk
-        catalog = st.session_state.get("catalog", {})
-        labels = []
-        for k in options_keys:
-            meta = catalog.get(k, {})
-            labels.append(f"{meta.get('nama','(unknown)')} — Rp {int(meta.get('harga',0)):,}")
+        # tampilkan nama produk (label sudah dibangun per snapshot katalog)
+        labels = [item_option_label(k) for k in options_keys]
 
         picked = st.selectbox("Pilih produk:", list(range(len(options_keys))), format_func=lambda i: labels[i] if i < len(labels) else str(i))
 
         if st.button("✅ Tambahkan"):
-            catalog = st.session_state.get("catalog", {})
+            catalog = get_catalog()
             chosen_key = options_keys[picked]
             chosen_item = catalog[chosen_key]
             tts_reset_queue()
@@ -593,7 +589,7 @@ if pa:
 
         if st.button("➡ Lanjut pilih produk"):
             # bangun options item berdasarkan brand + variant
-            catalog = st.session_state.get("catalog", {})
+            catalog = get_catalog()
             opts = []
             for k, meta in catalog.items():
                 if (meta.get("brand") or "").strip().lower() == (brand or "").strip().lower() and (meta.get("varian") or "").strip().lower() == (variant or "").strip().lower():
@@ -629,44 +625,47 @@ if trigger and text:
         clear_pending()
         st.session_state.last_command_text = text
 
-    parsed = process_command(user, text)
+    # streaming: item yang sudah jelas langsung masuk keranjang + diucapkan;
+    # st.rerun() di chunk yang perlu pilihan → chunk sisanya tidak di-parse
+    parsed_any = False
+    truncated = False
+    for p in process_command_iter(user, text):
+        parsed_any = True
+        # batas parse (kalimat terlalu panjang / terlalu lama) → hanya sebagian yang diproses
+        if p["meta"].truncated in ("tokens", "chunks", "deadline"):
+            truncated = True
+        chosen = p.get("chosen_item")
+        need = p.get("need_action")
+
+        # ✅ kalau butuh pilihan (brand / item), jangan break
+        #    langsung rerun supaya UI pilihan muncul sekarang juga
+        if (not chosen) and need:
+            # simpan handle minimal saja (need + qty + chunk), bukan seluruh hasil parse
+            st.session_state.pending_choice = p["meta"].resume_handle()
+
+            # ✅ penting untuk mode voice: hentikan listening agar tidak ketimpa audio berikutnya
+            st.session_state.pause_voice = True
 
-    if not parsed:
-        st.error("Saya tidak memahami pesanan Anda.")
-    else:
-        for p in parsed:
-            chosen = p.get("chosen_item")
-            need = p.get("need_action")
-
-            # ✅ kalau butuh pilihan (brand / item), jangan break
-            #    langsung rerun supaya UI pilihan muncul sekarang juga
-            if (not chosen) and need:
-                st.session_state.pending_choice = {
-                    "need": need,
-                    "qty": p.get("qty"),  # bisa None
-                    "has_explicit_qty": p.get("has_explicit_qty", False),
-                    "chunk": p.get("chunk", text),
-                    "meta": p.get("meta", {}),
-                }
-
-                # ✅ penting untuk mode voice: hentikan listening agar tidak ketimpa audio berikutnya
-                st.session_state.pause_voice = True
+            st.rerun()
 
-                st.rerun()
+        if chosen:
+            qty = p.get("qty")
+            if qty is None:
+                # tahan → wajib tanya qty
+                st.session_state.pending_action = {
+                    "type": "ask_qty",
+                    "title": "Berapa jumlah yang ingin Anda pesan?",
+                    "chosen_item": chosen,
+                }
+                st.session_state.pause_voice = True  # ✅ konsisten: stop listening saat menunggu jawaban
+                st.rerun()   # ✅ PENTING: supaya UI ask_qty langsung muncul sekarang juga
+            else:
+                _add_item_to_cart(chosen, int(qty))
 
-            if chosen:
-                qty = p.get("qty")
-                if qty is None:
-                    # tahan → wajib tanya qty
-                    st.session_state.pending_action = {
-                        "type": "ask_qty",
-                        "title": "Berapa jumlah yang ingin Anda pesan?",
-                        "chosen_item": chosen,
-                    }
-                    st.session_state.pause_voice = True  # ✅ konsisten: stop listening saat menunggu jawaban
-                    st.rerun()   # ✅ PENTING: supaya UI ask_qty langsung muncul sekarang juga
-                else:
-                    _add_item_to_cart(chosen, int(qty))
+    if not parsed_any:
+        st.error("Saya tidak memahami pesanan Anda.")
+    elif truncated:
+        st.warning("Kalimat terlalu panjang — hanya bagian awal yang diproses. Silakan sebutkan sisanya lagi.")
 
 # ============================================================
 #   PENDING CHOICE (FLOW CLI) - BRAND -> VARIANT -> QTY
@@ -675,7 +674,7 @@ pc = st.session_state.get("pending_choice")
 if pc:
     need = pc["need"] or {}
     need_type = need.get("type")
-    catalog = st.session_state.get("catalog", {})
+    catalog = get_catalog()
 
     # ambil info qty
     has_explicit_qty = bool(pc.get("has_explicit_qty", False))
@@ -692,7 +691,6 @@ if pc:
             "qty": qty_from_text if keep_qty else None,
             "has_explicit_qty": has_explicit_qty,
             "chunk": pc.get("chunk", ""),
-            "meta": pc.get("meta", {}),
         }
 
     def _finalize_add(chosen_item: dict):
@@ -936,10 +934,7 @@ if pc:
 
         if is_key_list:
             option_keys = options
-            labels = []
-            for k in option_keys:
-                m = catalog.get(k, {})
-                labels.append(f"{m.get('nama','(unknown)')} — Rp {int(m.get('harga',0)):,}")
+            labels = [item_option_label(k) for k in option_keys]
 
             idx = st.selectbox(
                 "Pilih produk:",
@@ -0,0 +1,43 @@
+# tests/conftest.py
+
+"""
+Fixture bersama: katalog kecil (tests/data/catalog_small.csv, format katalog
+asli) + pemulihan state ENGINE global setelah tiap test.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from modules import nlp_core  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@pytest.fixture
+def catalog_path():
+    return os.path.join(DATA_DIR, "catalog_small.csv")
+
+
+@pytest.fixture
+def catalog(catalog_path):
+    return nlp_core.freeze_catalog(nlp_core.load_catalog_from_csv(catalog_path))
+
+
+@pytest.fixture
+def snapshot(catalog):
+    return nlp_core.build_snapshot(catalog, fingerprint="test:small")
+
+
+@pytest.fixture(autouse=True)
+def restore_engine():
+    engine = nlp_core.ENGINE
+    saved = (engine.snapshot, engine.catalog_path, engine.last_reload)
+    yield engine
+    engine.snapshot, engine.catalog_path, engine.last_reload = saved
+    engine.cache.clear()
@@ -0,0 +1,37 @@
+# tests/test_batch_parse.py
+
+from modules.batch_parse import parse_orders_batch
+from modules.nlp_core import ENGINE, parse_orders_verbose
+
+TEXTS = [
+    "aqua galon dua",
+    "gas 3 kilo",
+    "le minerale 600 tiga dan cleo galon",
+    "vit cup lima",
+]
+
+
+def _serial(texts):
+    snap = ENGINE.snapshot
+    return [parse_orders_verbose(t, snap.catalog, snapshot=snap) for t in texts]
+
+
+def test_spawn_workers_use_catalog_file_of_engine(catalog_path):
+    ENGINE.load_catalog_file(catalog_path, force=True)
+    expected = _serial(TEXTS)
+
+    got = list(parse_orders_batch(TEXTS, workers=2, context="spawn"))
+
+    assert got == expected
+    assert got[0][0].chosen_key == "Galon Aqua 19L"
+
+
+def test_spawn_workers_use_catalog_registered_in_memory(catalog):
+    ENGINE.register_catalog(catalog)
+    assert ENGINE.catalog_path is None
+    expected = _serial(TEXTS)
+
+    got = list(parse_orders_batch(TEXTS, workers=2, context="spawn"))
+
+    assert got == expected
+    assert got[1][0].chosen_key == "Gas Elpiji 3kg"
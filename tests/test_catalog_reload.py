@@ -0,0 +1,67 @@
+# tests/test_catalog_reload.py
+
+import os
+import shutil
+
+import pytest
+
+from modules.nlp_core import ENGINE, build_snapshot, freeze_catalog, load_catalog_from_csv, parse_orders_verbose
+
+CORPUS = [
+    "aqua galon dua",
+    "gas 3 kilo",
+    "gas melon satu",
+    "elpiji 3kg dua",
+    "cleo cup lima",
+    "cleo gelas",
+    "club 600 tiga",
+    "klub botol",
+    "le minerale 600 tiga dan cleo galon",
+    "air galon",
+    "bright gas",
+]
+
+
+def _edit(path, old, new):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert old in text
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace(old, new))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _outcome(snap):
+    return [
+        [(r.logic, r.chosen_key, tuple(r.candidates_all), r.need_action, r.qty,
+          r.chosen_item["harga"] if r.chosen_item is not None else None)
+         for r in parse_orders_verbose(t, snap.catalog, snapshot=snap)]
+        for t in CORPUS
+    ]
+
+
+@pytest.mark.parametrize("old, new", [
+    ("Gas Elpiji 3kg,22000", "Gas Elpiji 3kg,23000"),                                 # harga
+    ("elpiji 3kg|gas melon|gas 3 kilo", "elpiji 3kg|gas 3 kilo"),                     # alias dihapus
+    ('"cup,220ml,Cleo Cup 220ml,900,cleo cup|cleo gelas,cup,,cleo"\n', ""),           # item dihapus
+    ('"botol,600ml,Club Botol 600ml,2500,club 600|club botol|klub,botol,,club"\n', ""),
+])
+def test_incremental_reload_equals_full_rebuild(catalog_path, tmp_path, old, new):
+    path = str(tmp_path / "catalog.csv")
+    shutil.copyfile(catalog_path, path)
+    ENGINE.load_catalog_file(path, force=True)
+
+    _edit(path, old, new)
+    ENGINE.load_catalog_file(path)
+    assert ENGINE.last_reload["mode"] == "incremental"
+
+    inc = ENGINE.snapshot
+    full = build_snapshot(freeze_catalog(load_catalog_from_csv(path)), "full")
+    assert {k: dict(v) for k, v in inc.catalog.items()} == {k: dict(v) for k, v in full.catalog.items()}
+    assert len(full.catalog) == (20 if not new else 21)
+    assert [k for k in inc.index.keys if k is not None] == full.index.keys
+    assert dict(inc.alias_index) == dict(full.alias_index)
+    assert inc.index.brands == full.index.brands
+    assert inc.variant_numbers == full.variant_numbers
+    assert _outcome(inc) == _outcome(full)
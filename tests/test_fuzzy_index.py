@@ -0,0 +1,50 @@
+# tests/test_fuzzy_index.py
+
+import pytest
+
+from modules.fuzzy_index import max_distance
+from modules.nlp_core import parse_orders_verbose
+
+
+def _keys(snapshot, text):
+    return [r.chosen_key for r in parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot)]
+
+
+@pytest.mark.parametrize("heard, term", [("akua", "aqua"), ("clep", "cleo"), ("kleo", "cleo")])
+def test_fuzzy_corrects_misspelling(snapshot, heard, term):
+    assert snapshot.fuzzy.lookup(heard) == term
+
+
+@pytest.mark.parametrize("text, brand", [("akua galon dua", "aqua"), ("kleo galon", "cleo")])
+def test_misheard_brand_asks_before_picking(snapshot, text, brand):
+    # hasil koreksi hanya tebakan → tanya brand dulu, tebakan di urutan pertama
+    (r,) = parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot)
+    assert r.chosen_key is None
+    assert r.need_action.type == "choose_brand_then_item"
+    assert r.need_action.brand_options[0] == brand
+
+
+@pytest.mark.parametrize("text", ["galon lima belas", "galon dua langsung antar", "cup dua belas"])
+def test_ordinary_words_not_corrected_into_brand(snapshot, text):
+    # "belas" ≠ "gelas", "langsung" ≠ "tanggung" → size group tanpa brand, tidak auto pick
+    (r,) = parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot)
+    assert r.logic == "L2_SIZE_GROUP_MULTI"
+    assert r.chosen_key is None
+
+
+@pytest.mark.parametrize("word", ["belas", "puluh", "langsung", "gelas", "galon", "tanggung", "botol"])
+def test_size_and_container_words_are_not_targets(snapshot, word):
+    assert snapshot.fuzzy.lookup(word) in (None, word)
+    assert word not in snapshot.fuzzy.vocab
+
+
+@pytest.mark.parametrize("word", ["aku", "vid", "ga", "dan"])
+def test_short_tokens_not_corrected(snapshot, word):
+    assert max_distance(word) == 0
+    assert snapshot.fuzzy.lookup(word) is None
+
+
+def test_no_false_positive_in_order(snapshot):
+    # "aku" bukan "aqua", "vid" bukan "vit" → tidak ada item yang dipilih diam-diam
+    assert _keys(snapshot, "aku mau galon") == [None]
+    assert _keys(snapshot, "vid cup lima") == [None]
@@ -0,0 +1,73 @@
+# tests/test_nlp_lexer.py
+
+import pytest
+
+from modules.nlp_core import parse_orders_verbose
+from modules.nlp_lexer import read_number_words
+
+
+def _parse(snapshot, text):
+    return [(r.chosen_key, r.qty) for r in parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot)]
+
+
+@pytest.mark.parametrize("text", ["aqua 1 5 liter", "aqua 1,5 liter", "aqua 1.5 liter"])
+def test_split_decimal_joined_to_variant(snapshot, text):
+    # "1 5" → 1.5 L (varian katalog), bukan qty 1 + angka 5
+    assert _parse(snapshot, text) == [("Aqua Botol 1500ml", None)]
+
+
+def test_split_decimal_before_qty_unit(snapshot):
+    # digabung juga sebelum satuan qty → qty 5 hilang (perilaku yang didokumentasikan)
+    assert _parse(snapshot, "aqua 1 5 botol") == [("Aqua Botol 1500ml", None)]
+
+
+def test_numbers_separated_by_word_not_joined(snapshot):
+    assert _parse(snapshot, "aqua 1 galon 5 botol") == [("Galon Aqua 19L", 1)]
+
+
+def test_non_variant_pair_not_joined(snapshot):
+    # 2.5 bukan angka varian → tetap dibaca qty 2
+    assert _parse(snapshot, "aqua 2 5 liter")[0][1] == 2
+
+
+@pytest.mark.parametrize("text, variant", [
+    ("330 minerale 1.5", "1.5ml"),
+    ("1500 600 minerale", "600ml"),
+    ("240 330", "330ml"),
+    ("1500 550", "1500ml"),           # di luar daftar prioritas → urut kemunculan
+])
+def test_bare_variant_priority(snapshot, text, variant):
+    # beberapa angka varian polos: urutan tetap 1.5 → 600 → 500 → 400 → 330 → 240
+    assert snapshot.lexer.scan(text.split())["variant"] == variant
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("dua ribu lima ratus", (2500, 4)),
+    ("lima belas", (15, 2)),
+    ("seratus dua puluh", (120, 3)),
+    ("dua puluh lima ribu", (25000, 4)),
+    ("2 puluh botol", (20, 2)),
+    ("dua tiga", (2, 1)),              # 2 koefisien berturut-turut → bilangan kedua terpisah
+    ("sepuluh tiga", (10, 1)),         # 11–19 hanya lewat "belas"
+    ("satu puluh dua", (10, 2)),
+    ("sebelas dua", (11, 1)),
+])
+def test_read_number_words(snapshot, text, expected):
+    assert read_number_words(text.split(), 0, snapshot.lexer.number_words) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("gas 3 kilo lima belas", ("Gas Elpiji 3kg", 15)),
+    ("aqua galon seratus dua puluh", ("Galon Aqua 19L", 120)),
+    ("aqua cup dua ribu lima ratus", ("Aqua Cup 240ml", 2500)),
+    ("le minerale 600 dua puluh", ("Le Minerale Botol 600ml", 20)),
+    ("aqua galon sepuluh dua", ("Galon Aqua 19L", 10)),
+])
+def test_number_words_as_qty(snapshot, text, expected):
+    assert _parse(snapshot, text) == [expected]
+
+
+def test_sepuluh_does_not_take_unit_word(snapshot):
+    # "sepuluh tiga" bukan 13 → qty 10 tetap terbaca
+    (r,) = parse_orders_verbose("gas sepuluh tiga kilo", snapshot.catalog, snapshot=snapshot)
+    assert r.logic == "L1_GAS_MULTI" and r.qty == 10
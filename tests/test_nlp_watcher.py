@@ -0,0 +1,46 @@
+# tests/test_nlp_watcher.py
+
+import logging
+import os
+
+from modules.nlp_watcher import FileWatcher
+
+
+def _touch(path, text):
+    path.write_text(text, encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_reload_after_stable_signature(tmp_path):
+    path = tmp_path / "katalog.csv"
+    path.write_text("a", encoding="utf-8")
+    seen = []
+    w = FileWatcher()
+    w.watch(str(path), seen.append)
+
+    _touch(path, "ab")
+    assert w.poll() == []                  # baru berubah → tunggu 1 poll
+    assert w.poll() == [str(path)]
+    assert seen == [str(path)] and w.reloads == 1
+
+
+def test_failed_reload_is_logged_and_kept(tmp_path, caplog):
+    path = tmp_path / "katalog.csv"
+    path.write_text("a", encoding="utf-8")
+
+    def broken(p):
+        raise ValueError("kolom hilang")
+
+    w = FileWatcher()
+    w.watch(str(path), broken)
+    _touch(path, "ab")
+
+    with caplog.at_level(logging.WARNING, logger="modules.nlp_watcher"):
+        w.poll()
+        assert w.poll() == []
+
+    assert w.errors == 1
+    assert w.last_error == {"path": str(path), "error": "ValueError: kolom hilang"}
+    assert "kolom hilang" in caplog.text
+    assert w.poll() == []                  # file belum berubah lagi → tidak dicoba ulang
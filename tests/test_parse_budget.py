@@ -0,0 +1,40 @@
+# tests/test_parse_budget.py
+
+import pytest
+
+from modules.nlp_core import parse_orders_verbose
+from modules.parse_budget import ParseBudget
+
+
+def test_default_caps_are_deterministic_only():
+    caps = ParseBudget().caps()
+
+    assert caps["deadline_ms"] is None
+    assert caps["max_candidates"] is None
+    assert caps["max_tokens"] and caps["max_chunks"]
+
+
+def test_token_cap_marks_last_result(snapshot):
+    text = " dan ".join(["aqua galon dua"] * 30)
+
+    results = parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot, budget=ParseBudget())
+
+    assert results[-1].truncated in ("tokens", "chunks")
+    assert all(r.truncated is None for r in results[:-1])
+
+
+def test_deadline_is_opt_in(snapshot):
+    budget = ParseBudget(deadline_ms=1e-6)
+    text = " dan ".join(["aqua galon dua", "gas 3 kilo", "vit cup lima"])
+
+    results = parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot, budget=budget)
+
+    assert results[-1].truncated == "deadline"
+    assert len(results) < 3
+
+
+def test_unknown_or_negative_cap_rejected():
+    with pytest.raises(ValueError):
+        ParseBudget().configure(max_rules=3)
+    with pytest.raises(ValueError):
+        ParseBudget().configure(max_tokens=-1)
@@ -0,0 +1,34 @@
+# tests/test_parse_orders.py
+
+from modules.nlp_core import iter_orders_verbose, parse_orders_verbose
+from modules.parse_budget import ParseBudget
+
+TEXT = "aqua galon dua dan gas 3 kilo dan le minerale 600 tiga"
+
+
+def test_verbose_equals_iter(snapshot):
+    assert parse_orders_verbose(TEXT, snapshot.catalog, snapshot=snapshot) == list(
+        iter_orders_verbose(TEXT, snapshot.catalog, snapshot=snapshot)
+    )
+
+
+def test_trace_has_one_entry_per_result(snapshot):
+    results, traces = parse_orders_verbose(TEXT, snapshot.catalog, snapshot=snapshot, trace=True)
+
+    assert results == parse_orders_verbose(TEXT, snapshot.catalog, snapshot=snapshot)
+    assert [t["logic"] for t in traces] == [r.logic for r in results]
+    assert all(t["steps"] for t in traces)
+
+
+def test_trace_stops_with_budget(snapshot):
+    budget = ParseBudget(max_chunks=2)
+
+    results, traces = parse_orders_verbose(TEXT, snapshot.catalog, snapshot=snapshot, trace=True, budget=budget)
+
+    assert len(results) == len(traces) == 2
+    assert results[-1].truncated == "chunks"
+
+
+def test_empty_text(snapshot):
+    assert parse_orders_verbose("  ", snapshot.catalog, snapshot=snapshot) == []
+    assert parse_orders_verbose("  ", snapshot.catalog, snapshot=snapshot, trace=True) == ([], [])
@@ -0,0 +1,75 @@
+# tests/test_parse_result.py
+
+import json
+import pickle
+
+import pytest
+
+from modules.nlp_core import ENGINE, parse_orders_cached, parse_orders_iter, parse_orders_verbose
+from modules.parse_result import NeedAction, ParseResult
+
+TEXTS = ["aqua galon dua", "aqua", "galon dua", "gas 3 kilo dan botol"]
+
+
+def _results(snapshot):
+    return [r for t in TEXTS for r in parse_orders_verbose(t, snapshot.catalog, snapshot=snapshot)]
+
+
+def test_result_is_read_only(snapshot):
+    r = parse_orders_verbose("aqua galon dua", snapshot.catalog, snapshot=snapshot)[0]
+
+    with pytest.raises(AttributeError):
+        r.qty = 5
+    with pytest.raises(TypeError):
+        r["qty"] = 5
+    assert isinstance(r.candidates_all, tuple)
+    assert r["qty"] == r.get("qty") == 2
+
+
+def test_need_action_is_read_only(snapshot):
+    need = parse_orders_verbose("aqua", snapshot.catalog, snapshot=snapshot)[0].need_action
+
+    assert need.type == "choose_item"
+    assert isinstance(need.options, tuple)
+    with pytest.raises(AttributeError):
+        need.options = ()
+
+
+def test_to_dict_round_trip(snapshot):
+    for r in _results(snapshot):
+        d = r.to_dict()
+        assert isinstance(d["candidates_all"], list)
+        assert ParseResult.from_dict(d) == r
+        # tanpa item katalog, dict hasil bisa di-JSON-kan (session / log)
+        json.dumps({k: v for k, v in d.items() if k != "chosen_item"})
+
+
+def test_pickle_round_trip(snapshot):
+    for r in _results(snapshot):
+        assert pickle.loads(pickle.dumps(r)) == r
+
+
+def test_brand_then_item_filter_round_trip():
+    need = NeedAction(
+        type="choose_brand_then_item", title="Pilih brand",
+        brand_options=["aqua", "cleo"], filter={"mode": "size_group", "variant": None, "category": "air"},
+    )
+
+    with pytest.raises(TypeError):
+        need.filter["mode"] = "x"
+    assert NeedAction.from_dict(need.to_dict()) == need
+    assert pickle.loads(pickle.dumps(need)) == need
+
+
+def test_cache_hit_keeps_callers_text(catalog):
+    ENGINE.register_catalog(catalog, fingerprint="test:small")
+    first = parse_orders_cached("Aqua  GALON dua")
+
+    hit = parse_orders_cached("aqua galon dua")
+    streamed = list(parse_orders_iter("AQUA galon dua"))
+
+    assert [r.text for r in first] == ["Aqua  GALON dua"]
+    assert [r.text for r in hit] == ["aqua galon dua"]
+    assert [r.text for r in streamed] == ["AQUA galon dua"]
+    assert hit[0].chosen_key == first[0].chosen_key == "Galon Aqua 19L"
+    assert ENGINE.cache.stats()["hits"] == 2
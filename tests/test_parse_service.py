@@ -0,0 +1,47 @@
+# tests/test_parse_service.py
+
+import logging
+from concurrent.futures import Future
+
+import pytest
+
+from modules.nlp_core import ENGINE, parse_orders_verbose
+from modules.parse_service import ParseService
+
+
+def test_failed_batch_resolves_callers_and_is_counted(catalog_path, caplog):
+    service = ParseService(catalog_path, workers=1)
+    futs = [Future(), Future()]
+    service._pending = len(futs)
+
+    with caplog.at_level(logging.WARNING, logger="modules.parse_service"):
+        service._fail(futs, OSError("pipe putus"))
+
+    assert [f.result(0) for f in futs] == [None, None]     # pemanggil → parse inline
+    stats = service.stats()
+    assert stats["errors"] == 1 and stats["pending"] == 0
+    assert stats["last_error"] == "OSError: pipe putus"
+    assert "pipe putus" in caplog.text
+
+
+def test_start_refuses_snapshot_not_loaded_from_catalog_path(catalog, catalog_path):
+    ENGINE.register_catalog(catalog)
+    service = ParseService(catalog_path, workers=1)
+
+    with pytest.raises(ValueError):
+        service.start()
+    assert not service.running
+
+
+def test_worker_results_match_inline(catalog_path):
+    ENGINE.load_catalog_file(catalog_path, force=True)
+    snap = ENGINE.snapshot
+    service = ParseService(catalog_path, workers=1, timeout=60)
+    service.start()
+    try:
+        got = service.parse("aqua galon dua dan gas 3 kilo", snap)
+    finally:
+        service.stop()
+
+    assert got == tuple(parse_orders_verbose("aqua galon dua dan gas 3 kilo", snap.catalog, snapshot=snap))
+    assert service.stats()["stale"] == 0
@@ -0,0 +1,25 @@
+# tests/test_phonetic_index.py
+
+import pytest
+
+from modules.nlp_core import correct_unknown_tokens, parse_orders_verbose
+from modules.phonetic_index import phonetic_key
+
+
+@pytest.mark.parametrize("heard, term", [("akua", "aqua"), ("brite", "bright"), ("brait", "bright"), ("kleo", "cleo")])
+def test_phonetic_key_matches_brand(snapshot, heard, term):
+    assert phonetic_key(heard) == phonetic_key(term)
+    assert snapshot.phonetic.lookup(heard) == term
+
+
+@pytest.mark.parametrize("text", ["brite gas satu", "brait gas"])
+def test_misheard_brand_asks_before_picking(snapshot, text):
+    (r,) = parse_orders_verbose(text, snapshot.catalog, snapshot=snapshot)
+    assert r.chosen_key is None
+    assert r.need_action.type == "choose_brand_then_item"
+    assert r.need_action.brand_options[0] == "bright"
+
+
+@pytest.mark.parametrize("word", ["aku", "vid", "ga", "dan"])
+def test_short_tokens_not_corrected(snapshot, word):
+    assert correct_unknown_tokens([word], snapshot.fuzzy, snapshot.phonetic) == [word]
@@ -0,0 +1,63 @@
+# tests/test_rule_table.py
+
+from modules.nlp_core import ENGINE, build_snapshot, parse_orders_verbose, rule_stats
+from modules.rule_table import Rule, RuleTable
+
+
+def _rule(name, result=None):
+    return Rule(name, lambda ca: True, lambda ca: (), lambda ca, cands: result)
+
+
+class _TimedChunk:
+    """ChunkAnalysis minimal untuk evaluate_traced (tanpa fitur lazy)."""
+    feature_ns = 0
+    feature_log = ()
+
+
+def _evals(rows):
+    return {row["rule"]: (row["evals"], row["hits"]) for row in rows}
+
+
+def test_plain_evaluate_does_not_count(snapshot):
+    parse_orders_verbose("aqua galon dua", snapshot.catalog, snapshot=snapshot)
+
+    assert all(row["evals"] == 0 for row in snapshot.rules.stats())
+
+
+def test_traced_evaluate_counts(snapshot):
+    parse_orders_verbose("aqua galon dua", snapshot.catalog, snapshot=snapshot, trace=True)
+
+    stats = _evals(snapshot.rules.stats())
+    assert stats["L0_DIRECT_ALIAS"] == (1, 1)
+
+
+def test_previous_table_carries_stats_by_rule_name():
+    old = RuleTable([_rule("A"), _rule("B", {"logic": "B"})])
+    old.evaluate_traced(ca=_TimedChunk())
+
+    new = RuleTable([_rule("B", {"logic": "B"}), _rule("C")], previous=old)
+
+    assert _evals(new.stats()) == {"B": (1, 1), "C": (0, 0)}
+
+
+def test_full_rebuild_keeps_rule_stats(catalog, catalog_path):
+    ENGINE.snapshot = build_snapshot({})
+    ENGINE.register_catalog(catalog)
+    parse_orders_verbose("aqua galon dua", catalog, snapshot=ENGINE.snapshot, trace=True)
+    before = _evals(rule_stats())
+
+    ENGINE.load_catalog_file(catalog_path, force=True)
+
+    assert _evals(rule_stats()) == before
+
+
+def test_variant_only_uses_snapshot_index(snapshot, monkeypatch):
+    # snapshot di luar ENGINE → L3 tetap memakai index snapshot (tidak bangun CatalogIndex baru)
+    def rebuilt(*args, **kwargs):
+        raise AssertionError("CatalogIndex dibangun ulang")
+
+    monkeypatch.setattr("modules.nlp_core.CatalogIndex", rebuilt)
+
+    (r,) = parse_orders_verbose("550 ml", snapshot.catalog, snapshot=snapshot)
+
+    assert (r.logic, r.chosen_key) == ("L3_VARIAN_ONLY_SINGLE", "Cleo Botol 550ml")
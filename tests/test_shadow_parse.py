@@ -0,0 +1,47 @@
+# tests/test_shadow_parse.py
+
+import json
+
+import pytest
+
+from modules import nlp_core
+from modules.parse_budget import ParseBudget
+from modules.shadow_parse import ShadowRunner
+
+
+@pytest.fixture
+def profiling():
+    nlp_core.reset_profiling()
+    nlp_core.enable_profiling(True)
+    yield
+    nlp_core.enable_profiling(False)
+    nlp_core.reset_profiling()
+
+
+def test_compare_does_not_touch_shared_stats(snapshot, profiling, tmp_path):
+    def shadow(text, catalog):
+        return nlp_core.parse_orders_verbose(text, catalog, snapshot=snapshot, budget=ParseBudget(), profile=False)
+
+    runner = ShadowRunner(shadow, store_path=str(tmp_path / "s.sqlite"))
+    budget_before = nlp_core.parse_budget_stats()
+
+    row = runner.compare("aqua galon dua dan gas 3 kilo", snapshot)
+
+    assert row[4] == 1                                  # same
+    assert len(json.loads(row[6])) == 2                 # primary_out
+    assert nlp_core.profiling_stats() == nlp_core.ParseProfiler().stats()
+    assert all(r["evals"] == 0 for r in snapshot.rules.stats())
+    assert nlp_core.parse_budget_stats()["parses"] == budget_before["parses"]
+
+
+def test_compare_records_shadow_error(snapshot, tmp_path):
+    def broken(text, catalog):
+        raise KeyError("x")
+
+    runner = ShadowRunner(broken, store_path=str(tmp_path / "s.sqlite"))
+
+    row = runner.compare("aqua galon dua", snapshot)
+
+    assert row[4] == 0 and row[5] == "error"
+    assert runner.stats()["errors"] == 1
+    assert runner.stats()["last_error"] == "KeyError: 'x'"
@@ -0,0 +1,55 @@
+# tests/test_voice_phrases.py
+
+import logging
+
+import pytest
+
+from modules.nlp_core import ENGINE, say_phrase
+from modules.phrase_table import PhraseTemplate
+
+
+def _write(path, rows):
+    path.write_text("key,text,lang\n" + "".join(f"{k},{t},{lang}\n" for k, t, lang in rows), encoding="utf-8")
+
+
+def test_render_with_fallback_lang(tmp_path):
+    path = tmp_path / "voice_phrases.csv"
+    _write(path, [("welcome_user", "Halo {nama}", "id"), ("item_added", "{qty} {name} masuk", "id")])
+
+    ENGINE.load_phrases(str(path), force=True)
+
+    assert say_phrase("welcome_user", lang="en", nama="Budi") == "Halo Budi"
+
+
+def test_problems_reported_via_last_reload_and_log(tmp_path, caplog):
+    path = tmp_path / "voice_phrases.csv"
+    _write(path, [("welcome_user", "Halo {nama} {kota}", "id")])
+
+    with caplog.at_level(logging.WARNING, logger="modules.nlp_core"):
+        ENGINE.load_phrases(str(path), force=True)
+
+    problems = ENGINE.last_reload["problems"]
+    assert any("kota" in p for p in problems)
+    assert any("item_added" in p for p in problems)
+    assert [r.getMessage() for r in caplog.records] == [f"voice_phrases: {p}" for p in problems]
+
+
+def _old_say_phrase(text, kwargs):
+    # perilaku say_phrase lama: str.format, gagal apa pun → teks mentah
+    try:
+        return text.format(**kwargs) if kwargs else text
+    except Exception:
+        return text
+
+
+@pytest.mark.parametrize("text, kwargs", [
+    ("Total {harga:,}", {"harga": "abc"}),      # format_spec tidak cocok dengan str
+    ("Total {harga:,}", {"harga": 12000}),
+    ("Stok {n:d}", {"n": None}),
+    ("{x!s:>5}", {"x": None}),
+    ("Pakai {{kode}}", {"nama": "Budi"}),       # tanpa placeholder, ada kwargs → unescape
+    ("Pakai {{kode}}", {}),
+    ("Halo {nama}", {"kota": "Bogor"}),
+])
+def test_template_matches_old_say_phrase(text, kwargs):
+    assert PhraseTemplate(text).render(kwargs) == _old_say_phrase(text, kwargs)